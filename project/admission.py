@@ -0,0 +1,239 @@
+from typing import Any, Callable, Dict, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from functools import wraps
+import logging
+import math
+import threading
+import time
+from flask import jsonify
+import config
+
+logger = logging.getLogger(__name__)
+
+SERVICE_TIME_SMOOTHING = 0.2
+MAX_RETRY_AFTER_SECONDS = 120
+
+class StageTimeout(Exception):
+    """Raised when an OCR, LLM or translation stage runs past its configured timeout."""
+
+    def __init__(self, stage: str, timeout: float) -> None:
+        super().__init__(f"{stage} stage timed out after {timeout:g} seconds")
+        self.stage = stage
+        self.timeout = timeout
+
+class StageBusy(Exception):
+    """Raised when a stage run inside a request of another class finds no free slot in time."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Too many concurrent {stage} requests, please retry later")
+        self.stage = stage
+
+class AdmissionController:
+    """Bound the number of concurrent requests of one class, with a short wait queue.
+
+    Requests beyond the limit wait up to `queue_timeout` seconds for a slot. When
+    `queue_size` requests are already waiting, or the wait runs out, the request is
+    rejected so it does not tie up a worker that cheap endpoints need.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue_size = max(queue_size, 0)
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timeouts_total = 0
+        self.service_seconds = 1.0
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed.
+
+        Returns:
+            bool: True if admitted; False if the queue is full or the wait timed out.
+        """
+        with self._condition:
+            if self.active >= self.limit:
+                if self.waiting >= self.queue_size:
+                    self.rejected_total += 1
+                    return False
+                self.waiting += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.limit, self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.rejected_total += 1
+                    return False
+            self.active += 1
+            self.admitted_total += 1
+            return True
+
+    def release(self, elapsed: float) -> None:
+        """Free a slot and fold the request's duration into the service time estimate.
+
+        Args:
+            elapsed: Seconds the admitted request took.
+        """
+        with self._condition:
+            self.active -= 1
+            self.service_seconds += SERVICE_TIME_SMOOTHING * (elapsed - self.service_seconds)
+            self._condition.notify()
+
+    def record_timeout(self) -> None:
+        """Count a call of this class aborted by its stage timeout."""
+        with self._condition:
+            self.timeouts_total += 1
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when a slot is likely to be free."""
+        with self._condition:
+            backlog = self.active + self.waiting
+        seconds = math.ceil(self.service_seconds * max(backlog, 1) / self.limit)
+        return min(max(seconds, 1), MAX_RETRY_AFTER_SECONDS)
+
+    def stats(self) -> Dict[str, float]:
+        """Current queue depth and counters."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted_total": self.admitted_total,
+                "rejected_total": self.rejected_total,
+                "timeouts_total": self.timeouts_total,
+                "service_seconds": self.service_seconds
+            }
+
+CONTROLLERS: Dict[str, AdmissionController] = {
+    name: AdmissionController(name, limit, config.ADMISSION_QUEUE_SIZE, config.ADMISSION_QUEUE_TIMEOUT)
+    for name, limit in (
+        ("upload", config.UPLOAD_CONCURRENCY),
+        ("ocr", config.OCR_CONCURRENCY),
+        ("llm", config.LLM_CONCURRENCY),
+        ("translation", config.TRANSLATION_CONCURRENCY)
+    )
+}
+STAGE_TIMEOUTS: Dict[str, float] = {
+    "ocr": config.OCR_TIMEOUT,
+    "llm": config.LLM_TIMEOUT,
+    "translation": config.TRANSLATION_TIMEOUT
+}
+_stage_executors: Dict[str, ThreadPoolExecutor] = {}
+_stage_executors_lock = threading.Lock()
+
+def admission_controlled(name: str) -> Callable:
+    """Decorate a view so it runs only when its admission class has a free slot.
+
+    Rejected requests get 429 Too Many Requests with a Retry-After estimate; a StageTimeout
+    escaping the view becomes 504 Gateway Timeout.
+
+    Args:
+        name: Admission class, a key of CONTROLLERS.
+
+    Returns:
+        Callable: Decorator for the view function.
+    """
+    controller = CONTROLLERS[name]
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not controller.acquire():
+                retry_after = controller.retry_after()
+                logger.warning(f"Rejected {name} request: {controller.active} active, {controller.waiting} waiting; retry after {retry_after}s")
+                response = jsonify({"error": f"Too many concurrent {name} requests, please retry later"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(retry_after)
+                return response
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            except StageTimeout as e:
+                logger.error(f"{name} request aborted: {str(e)}")
+                return jsonify({"error": str(e)}), 504
+            finally:
+                controller.release(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+@contextmanager
+def stage_slot(name: str) -> Iterator[None]:
+    """Hold a slot of an admission class for work done inside a request of another class.
+
+    E.g. the OCR of scanned PDF pages during /upload-jobs counts against OCR_CONCURRENCY,
+    not only against the upload class.
+
+    Args:
+        name: Admission class, a key of CONTROLLERS.
+
+    Raises:
+        StageBusy: If no slot frees up within the class's queue limits.
+    """
+    controller = CONTROLLERS[name]
+    if not controller.acquire():
+        logger.warning(f"Rejected {name} stage: {controller.active} active, {controller.waiting} waiting")
+        raise StageBusy(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        controller.release(time.perf_counter() - start)
+
+def record_stage_timeout(stage: str, timeout: float) -> StageTimeout:
+    """Count a stage timeout and build the exception to raise for it."""
+    CONTROLLERS[stage].record_timeout()
+    return StageTimeout(stage, timeout)
+
+def _stage_executor(stage: str) -> ThreadPoolExecutor:
+    """Return the worker pool of a stage, sized like its admission class."""
+    with _stage_executors_lock:
+        if stage not in _stage_executors:
+            controller = CONTROLLERS.get(stage)
+            _stage_executors[stage] = ThreadPoolExecutor(
+                max_workers=controller.limit if controller else 4,
+                thread_name_prefix=f"stage-{stage}"
+            )
+        return _stage_executors[stage]
+
+def run_with_timeout(stage: str, function: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call with the stage's timeout.
+
+    The call runs on a pool sized like the stage's admission class. Python threads cannot be
+    killed, so a call that times out keeps its pool thread until the remote side answers; the
+    bounded pool keeps such calls from piling up.
+
+    Args:
+        stage: Stage name, a key of STAGE_TIMEOUTS; a timeout of 0 waits indefinitely.
+        function: Callable to run.
+        *args: Positional arguments for the callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        Any: The callable's result.
+
+    Raises:
+        StageTimeout: If the call does not finish in time.
+    """
+    timeout = STAGE_TIMEOUTS.get(stage, 0)
+    if not timeout:
+        return function(*args, **kwargs)
+    future = _stage_executor(stage).submit(function, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise record_stage_timeout(stage, timeout)
+
+def admission_stats() -> Tuple[Dict[str, Dict[str, float]], Dict[str, int]]:
+    """Snapshot of every admission class and the stage timeout counters.
+
+    Returns:
+        Tuple[Dict[str, Dict[str, float]], Dict[str, int]]: Per-class stats and timeouts per stage.
+    """
+    classes = {name: controller.stats() for name, controller in CONTROLLERS.items()}
+    return classes, {stage: classes[stage]["timeouts_total"] for stage in STAGE_TIMEOUTS}
@@ -2,7 +2,15 @@ from typing import Optional
 from flask import Flask
 import config
 from db.models import db
+from db.migrations import run_migrations
+from db.routing import init_read_routing
 import routes
+from commands import register_commands
+from http_cache import init_http_cache
+from memory_diagnostics import init_memory_diagnostics
+from metrics import metrics_bp
+from profiling import init_profiling
+from sharding import init_sharding
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,11 +30,20 @@ def create_app() -> Flask:
 
     config.configure_dependencies()
 
+    init_read_routing(app)
     db.init_app(app)
+    # Registered before the HTTP cache so the profile also covers response compression.
+    init_profiling(app)
+    init_memory_diagnostics(app)
+    init_http_cache(app)
     app.register_blueprint(routes.api_bp)
+    app.register_blueprint(metrics_bp)
+    init_sharding(app)
+    register_commands(app)
 
     with app.app_context():
         db.create_all()
+        run_migrations()
         logger.info("Database and application initialized successfully")
 
     return app
@@ -0,0 +1,266 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from http.cookies import SimpleCookie
+import logging
+import math
+import time
+from urllib.parse import parse_qs
+import httpx
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+import config
+from admission import MAX_RETRY_AFTER_SECONDS, SERVICE_TIME_SMOOTHING, StageTimeout
+from app import create_app
+from db.routing import READ_YOUR_WRITES_COOKIE, replica_reads
+from memory_diagnostics import finish_request_memory, memory_tracking_enabled, start_request_memory
+from metrics import Metric, register_collector
+from routes import JsonResponse, find_llm_analysis_cv, find_translation_text, llm_analysis_response, translation_response
+from utils.llm_analyzer import analyze_with_llm_async
+from utils.translator import translate_to_english_async
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class _PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """One request of PooledWsgiToAsgi, run on the shared thread pool."""
+
+    def __init__(self, wsgi_application: Callable, duplicate_header_limit: int, executor: ThreadPoolExecutor) -> None:
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body: Any) -> None:
+        run = WsgiToAsgiInstance.run_wsgi_app.__wrapped__
+        await sync_to_async(run, thread_sensitive=False, executor=self.executor)(self, body)
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi running WSGI requests on a thread pool.
+
+    asgiref's adapter runs every request on the single thread-sensitive thread, so a slow
+    Flask view would hold up all the others of the worker. Here up to `threads` requests run
+    at once, like a threaded WSGI server.
+
+    Raises:
+        RuntimeError: If asgiref no longer exposes the synchronous run_wsgi_app this relies on.
+    """
+
+    def __init__(self, wsgi_application: Callable, threads: int) -> None:
+        # run_wsgi_app is asgiref-private: it must still be a sync_to_async wrapper of a plain function.
+        if not callable(getattr(WsgiToAsgiInstance.run_wsgi_app, "__wrapped__", None)):
+            raise RuntimeError(
+                "asgiref's WsgiToAsgiInstance.run_wsgi_app no longer wraps a synchronous function; "
+                "PooledWsgiToAsgi does not support this asgiref version"
+            )
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=max(threads, 1), thread_name_prefix="wsgi")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await _PooledWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit, self.executor)(scope, receive, send)
+
+flask_app = create_app()
+wsgi_application = PooledWsgiToAsgi(flask_app, config.ASYNC_WSGI_THREADS)
+_http_client: Optional[httpx.AsyncClient] = None
+
+class AsyncStageLimiter:
+    """Bound the calls of one stage in flight on the event loop.
+
+    A request waits up to ADMISSION_QUEUE_TIMEOUT seconds for a slot and is then rejected,
+    like the synchronous admission classes, but waiting costs a coroutine instead of a thread.
+    Durations feed the same Retry-After estimate as AdmissionController.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = max(limit, 1)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.service_seconds = 1.0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting for one if needed.
+
+        Returns:
+            bool: True if admitted; False if no slot freed up in time.
+        """
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), config.ADMISSION_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.rejected_total += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted_total += 1
+        return True
+
+    def release(self, elapsed: float) -> None:
+        """Free a slot and fold the request's duration into the service time estimate.
+
+        Args:
+            elapsed: Seconds the admitted request took.
+        """
+        self.active -= 1
+        self.service_seconds += SERVICE_TIME_SMOOTHING * (elapsed - self.service_seconds)
+        self._semaphore.release()
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds when a slot is likely to be free."""
+        seconds = math.ceil(self.service_seconds * max(self.active + self.waiting, 1) / self.limit)
+        return min(max(seconds, 1), MAX_RETRY_AFTER_SECONDS)
+
+LIMITERS: Dict[str, AsyncStageLimiter] = {
+    "llm": AsyncStageLimiter("llm", config.ASYNC_LLM_CONCURRENCY),
+    "translation": AsyncStageLimiter("translation", config.ASYNC_TRANSLATION_CONCURRENCY)
+}
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client, created on first use inside the event loop.
+
+    Stage timeouts are applied per call, so the client itself never times out.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=config.ASYNC_MAX_CONNECTIONS, max_keepalive_connections=config.ASYNC_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(None)
+        )
+    return _http_client
+
+def _read_database(read_primary_until: Optional[str], function: Callable, *args: Any) -> Any:
+    """Run a database read in an application context, on the replica like a read_only view."""
+    with flask_app.app_context(), replica_reads(read_primary_until):
+        return function(*args)
+
+async def analyze_llm(query: Dict[str, str], read_primary_until: Optional[str]) -> JsonResponse:
+    """Async counterpart of the /analyze-llm view: analyze LLM_ANALYSIS_FILENAME's CV with Gemini."""
+    target_cv, error = await asyncio.to_thread(_read_database, read_primary_until, find_llm_analysis_cv)
+    if error:
+        return error
+    extracted_data = await analyze_with_llm_async([target_cv["text"]], _get_http_client())
+    return llm_analysis_response(target_cv["filename"], extracted_data)
+
+async def translate_job(query: Dict[str, str], read_primary_until: Optional[str]) -> JsonResponse:
+    """Async counterpart of the /translate-to-english view."""
+    job_id = query.get("job_id")
+    job_text, error = await asyncio.to_thread(_read_database, read_primary_until, find_translation_text, job_id)
+    if error:
+        return error
+    return translation_response(await translate_to_english_async(job_text, _get_http_client()), job_id)
+
+ASYNC_ROUTES: Dict[str, Tuple[str, Callable[[Dict[str, str], Optional[str]], Awaitable[JsonResponse]]]] = {
+    "/analyze-llm": ("llm", analyze_llm),
+    "/translate-to-english": ("translation", translate_job)
+}
+
+async def _send_json(send: Send, status: int, payload: Dict[str, Any], headers: Iterable[Tuple[bytes, bytes]] = ()) -> None:
+    """Send a JSON response serialized like the Flask views' jsonify."""
+    body = flask_app.json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii")), *headers]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+def _cookie(scope: Scope, name: str) -> Optional[str]:
+    """Read a cookie from an ASGI request scope."""
+    for key, value in scope.get("headers", []):
+        if key == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(name)
+            if morsel is not None:
+                return morsel.value
+    return None
+
+async def _handle_async_route(scope: Scope, send: Send, stage: str, handler: Callable[[Dict[str, str], Optional[str]], Awaitable[JsonResponse]]) -> None:
+    """Run an async view, counting it in the memory diagnostics as the Flask request hooks would.
+
+    With MEMORY_DIAGNOSTICS_ENABLED, WORKER_MAX_REQUESTS or WORKER_MAX_RSS_MB set, the request's
+    RSS growth is recorded and counts towards recycling the worker.
+    """
+    memory_start = start_request_memory() if memory_tracking_enabled() else None
+    try:
+        await _run_async_route(scope, send, stage, handler)
+    finally:
+        if memory_start is not None:
+            finish_request_memory(f"{scope['method']} {scope['path']}", f"async:{scope['path']}", memory_start)
+
+async def _run_async_route(scope: Scope, send: Send, stage: str, handler: Callable[[Dict[str, str], Optional[str]], Awaitable[JsonResponse]]) -> None:
+    """Run an async view under its stage limiter, mapping rejections and timeouts like admission_controlled."""
+    limiter = LIMITERS[stage]
+    if not await limiter.acquire():
+        logger.warning(f"Rejected async {stage} request: {limiter.active} active, {limiter.waiting} waiting")
+        await _send_json(send, 429, {"error": f"Too many concurrent {stage} requests, please retry later"},
+                         [(b"retry-after", str(limiter.retry_after()).encode("ascii"))])
+        return
+    start = time.perf_counter()
+    try:
+        query = {key: values[0] for key, values in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+        status, payload = await handler(query, _cookie(scope, READ_YOUR_WRITES_COOKIE))
+    except StageTimeout as e:
+        logger.error(f"{stage} request aborted: {str(e)}")
+        status, payload = 504, {"error": str(e)}
+    except Exception as e:
+        logger.error(f"Error during async {stage} request: {str(e)}")
+        status, payload = 500, {"error": f"Error during {stage} request: {str(e)}"}
+    finally:
+        limiter.release(time.perf_counter() - start)
+    logger.debug(f"Async {scope['path']} answered {status} in {time.perf_counter() - start:.3f}s")
+    await _send_json(send, status, payload)
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    """Handle server start-up and shutdown, closing the HTTP client's connections on exit."""
+    global _http_client
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def application(scope: Scope, receive: Receive, send: Send) -> None:
+    """ASGI application serving /analyze-llm and /translate-to-english without blocking a worker.
+
+    Both endpoints spend nearly all their time waiting on Gemini or Google Translate, so here
+    they run as coroutines sharing one httpx client and a worker keeps hundreds of calls in
+    flight. Every other route goes to the Flask application on a pool of ASYNC_WSGI_THREADS
+    threads. Serve it with e.g. `uvicorn asgi:application --workers 4`.
+
+    Args:
+        scope: Connection scope.
+        receive: Awaitable returning the next event from the client.
+        send: Awaitable sending an event to the client.
+    """
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    route = ASYNC_ROUTES.get(scope.get("path")) if scope["type"] == "http" and scope.get("method") == "GET" else None
+    if route is None:
+        await wsgi_application(scope, receive, send)
+        return
+    await _handle_async_route(scope, send, *route)
+
+def _async_stage_metrics() -> Iterable[Metric]:
+    """Calls in flight, waiting and rejected per async stage."""
+    yield ("async_stage_active_requests", "gauge", "Async LLM and translation calls in flight.",
+           [({"stage": name}, limiter.active) for name, limiter in LIMITERS.items()])
+    yield ("async_stage_queued_requests", "gauge", "Async requests waiting for a stage slot.",
+           [({"stage": name}, limiter.waiting) for name, limiter in LIMITERS.items()])
+    yield ("async_stage_admitted_total", "counter", "Async requests admitted per stage.",
+           [({"stage": name}, limiter.admitted_total) for name, limiter in LIMITERS.items()])
+    yield ("async_stage_rejected_total", "counter", "Async requests rejected with 429 per stage.",
+           [({"stage": name}, limiter.rejected_total) for name, limiter in LIMITERS.items()])
+    yield ("async_stage_service_seconds", "gauge", "Smoothed async request duration per stage.",
+           [({"stage": name}, limiter.service_seconds) for name, limiter in LIMITERS.items()])
+
+register_collector(_async_stage_metrics)
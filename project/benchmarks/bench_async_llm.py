@@ -0,0 +1,135 @@
+"""Benchmark the ASGI /analyze-llm and /translate-to-english against fake upstreams with injected latency.
+
+Starts a local fake of the Gemini REST API and of the Google Translate page that answer
+after --latency seconds, points GEMINI_API_BASE_URL and TRANSLATION_BASE_URL at it, serves
+asgi:application with uvicorn and fires --requests concurrent requests at each endpoint.
+The fake records how many upstream calls were in flight at once: with async views it
+approaches the number of concurrent requests, while a synchronous deployment is capped
+at its worker thread count.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_async_llm.py --requests 500 --latency 1 --workers 1
+"""
+from typing import Any, Awaitable, Callable, Dict
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UPSTREAM_PORT = 5390
+APP_PORT = 5391
+
+class FakeUpstream:
+    """ASGI app answering like Gemini's generateContent and the Translate page, after a delay."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[[], Awaitable[Dict[str, Any]]], send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        if scope["type"] != "http":
+            return
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if scope["path"].endswith(":generateContent"):
+            text = "Skills: litigation, contracts\nExperiences: 5 years\nQualifications: Master of Laws"
+            body, content_type = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode("utf-8"), b"application/json"
+        else:
+            body, content_type = b'<html><body><div class="result-container">Hello</div></body></html>', b"text/html"
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": body})
+
+def start_upstream(upstream: FakeUpstream) -> None:
+    """Serve the fake upstream on a background thread."""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(upstream, host="127.0.0.1", port=UPSTREAM_PORT, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+async def fire(path: str, total: int) -> Dict[str, float]:
+    """Send total concurrent GET requests and summarize status codes and wall time."""
+    import httpx
+    limits = httpx.Limits(max_connections=total, max_keepalive_connections=total)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{APP_PORT}", limits=limits, timeout=None) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(path) for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    statuses: Dict[str, int] = {}
+    for response in responses:
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    return {"seconds": round(elapsed, 2), "requests_per_second": round(total / elapsed, 1), "statuses": statuses}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Concurrent requests per endpoint")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds the fake upstream takes to answer")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_async_llm_")
+    os.environ.update({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(work_dir, 'bench.sqlite')}",
+        "GEMINI_API_BASE_URL": f"http://127.0.0.1:{UPSTREAM_PORT}",
+        "TRANSLATION_BASE_URL": f"http://127.0.0.1:{UPSTREAM_PORT}",
+        "ASYNC_LLM_CONCURRENCY": str(args.requests),
+        "ASYNC_TRANSLATION_CONCURRENCY": str(args.requests),
+        "ASYNC_MAX_CONNECTIONS": str(args.requests)
+    })
+    from app import create_app
+    from db.database import add_cv, batch_transaction
+    import config
+
+    app = create_app()
+    with app.app_context(), batch_transaction():
+        add_cv(config.LLM_ANALYSIS_FILENAME, "Avocat, master en droit, contentieux et contrats.", ["master"], ["litigation"], ["years"])
+
+    upstream = FakeUpstream(args.latency)
+    start_upstream(upstream)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "asgi:application", "--port", str(APP_PORT), "--workers", str(args.workers), "--log-level", "warning", "--backlog", "4096"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=os.environ.copy()
+    )
+    try:
+        import httpx
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{APP_PORT}/metrics")
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.5)
+        results = {}
+        for path in ("/analyze-llm", "/translate-to-english"):
+            upstream.peak_in_flight = 0
+            results[path] = {**asyncio.run(fire(path, args.requests)), "upstream_peak_in_flight": upstream.peak_in_flight}
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(json.dumps({
+        "requests": args.requests,
+        "upstream_latency_seconds": args.latency,
+        "workers": args.workers,
+        "results": results
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark DOCX text extraction: streaming iterparse engine versus python-docx.
+
+Generates a DOCX with body paragraphs, tables, a header and a footer, then reports time,
+peak resident memory growth, extracted length and which parts of the document each engine
+covered. Each engine runs in a fresh process so memory figures include native (lxml) allocations.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_docx_extraction.py --paragraphs 5000 --tables 200
+"""
+from typing import Dict, Union
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MARKERS = {
+    "header": "headermarker",
+    "footer": "footermarker",
+    "table": "tablemarker",
+    "body": "bodymarker"
+}
+SENTENCE = "Experienced counsel to negotiate commercial contracts and manage litigation for the company"
+
+def build_document(path: str, paragraphs: int, tables: int) -> None:
+    """Write a DOCX with the given number of body paragraphs and 3x4 tables.
+
+    Args:
+        path: Output path.
+        paragraphs: Number of body paragraphs.
+        tables: Number of tables, spread evenly through the body.
+    """
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = f"Acme Legal {MARKERS['header']}"
+    document.sections[0].footer.paragraphs[0].text = f"Confidential {MARKERS['footer']}"
+    table_every = max(1, paragraphs // max(tables, 1))
+    added_tables = 0
+    for index in range(paragraphs):
+        document.add_paragraph(f"{SENTENCE} {MARKERS['body']} {index}")
+        if added_tables < tables and index % table_every == 0:
+            table = document.add_table(rows=3, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"{MARKERS['table']} requirement"
+            added_tables += 1
+    document.save(path)
+
+def run_engine(path: str, engine: str, repeat: int) -> Dict[str, Union[int, float, Dict[str, bool]]]:
+    """Time an extraction engine and measure how much it grows the peak resident set size.
+
+    Args:
+        path: DOCX file to extract.
+        engine: Engine passed to extract_docx_text.
+        repeat: Number of timed runs.
+
+    Returns:
+        Dict[str, Union[int, float, Dict[str, bool]]]: Median and best time, peak RSS growth, text length and coverage.
+    """
+    from utils.docx_extractor import extract_docx_text
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract_docx_text(path, engine=engine)
+        timings.append((time.perf_counter() - start) * 1000)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "best_ms": round(min(timings), 2),
+        "peak_rss_growth_kb": peak_kb - baseline_kb,
+        "characters": len(text),
+        "covers": {part: marker in text for part, marker in MARKERS.items()}
+    }
+
+def run_engine_isolated(path: str, engine: str, repeat: int) -> Dict[str, Union[int, float, Dict[str, bool]]]:
+    """Run run_engine in a fresh process so one engine's memory does not affect the other."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_engine, (path, engine, repeat))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, default=5000, help="Body paragraphs in the generated document")
+    parser.add_argument("--tables", type=int, default=200, help="Tables in the generated document")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per engine")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_docx_"), "bench.docx")
+    build_document(path, args.paragraphs, args.tables)
+    results = {
+        "paragraphs": args.paragraphs,
+        "tables": args.tables,
+        "file_bytes": os.path.getsize(path),
+        "streaming": run_engine_isolated(path, "streaming", args.repeat),
+        "python-docx": run_engine_isolated(path, "python-docx", args.repeat)
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark keyword matching of one job against every CV: Python sets versus packed bitsets.
+
+Fills a SQLite database with CVs carrying random keywords from the configured vocabulary,
+then times the per-CV approach (split the comma-joined columns, build a set per CV and
+compute Jaccard pair by pair) against /match-cvs, which ANDs and popcounts the packed
+keyword bitsets of all CVs at once. The first /match-cvs request also loads the matrix.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_keyword_match.py --documents 100000
+"""
+from typing import Callable, Dict
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSERT_BATCH_SIZE = 5000
+
+def time_call(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Time repeated calls and return median and best latency in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 2), "best_ms": round(min(timings), 2)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000, help="Number of CVs")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed matches per approach")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_keyword_match_")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(work_dir, 'bench.sqlite')}"
+    from app import create_app
+    from db.models import db, CV, CVKeyword
+    from db.keywords import get_or_create_keyword_ids
+    from db.keyword_bitsets import index_cv_keyword_bitsets
+    import config
+
+    app = create_app()
+    client = app.test_client()
+    rng = random.Random(0)
+    vocabulary = {
+        "qualifications": sorted(config.QUALIFICATIONS_KEYWORDS),
+        "skills": sorted(config.SKILLS_KEYWORDS),
+        "experience": sorted(config.EXPERIENCE_KEYWORDS)
+    }
+
+    with app.app_context():
+        keyword_ids = {category: get_or_create_keyword_ids(category, terms) for category, terms in vocabulary.items()}
+        db.session.commit()
+        for start in range(0, args.documents, INSERT_BATCH_SIZE):
+            count = min(INSERT_BATCH_SIZE, args.documents - start)
+            keywords = [
+                {category: rng.sample(terms, rng.randint(0, min(4, len(terms)))) for category, terms in vocabulary.items()}
+                for _ in range(count)
+            ]
+            db.session.execute(db.insert(CV), [
+                {"filename": f"cv_{start + i}.png", "text": "", **{category: ",".join(terms) for category, terms in keywords[i].items()}}
+                for i in range(count)
+            ])
+            db.session.execute(db.insert(CVKeyword), [
+                {"cv_id": start + i + 1, "keyword_id": keyword_ids[category][term]}
+                for i in range(count) for category, terms in keywords[i].items() for term in terms
+            ])
+            index_cv_keyword_bitsets(list(range(start + 1, start + count + 1)))
+            db.session.commit()
+
+        required = {category: terms[:2] for category, terms in vocabulary.items()}
+        required_set = {(category, term) for category, terms in required.items() for term in terms}
+
+        def python_sets() -> list:
+            scores = []
+            for row in db.session.query(CV.id, CV.qualifications, CV.skills, CV.experience):
+                cv_set = {(category, term) for category in vocabulary for term in getattr(row, category).split(",") if term}
+                union = len(required_set | cv_set)
+                scores.append((len(required_set & cv_set) / union if union else 0.0, row.id))
+            scores.sort(reverse=True)
+            return scores[:50]
+
+        sets_timing = time_call(python_sets, args.repeat)
+
+    query = {category: ",".join(terms) for category, terms in required.items()}
+    start = time.perf_counter()
+    cold = client.get("/match-cvs", query_string=query)
+    cold_ms = (time.perf_counter() - start) * 1000
+    bitsets_timing = time_call(lambda: client.get("/match-cvs", query_string=query), args.repeat)
+    print(json.dumps({
+        "documents": args.documents,
+        "vocabulary": sum(len(terms) for terms in vocabulary.values()),
+        "python_sets": sets_timing,
+        "bitsets_first_request_ms": round(cold_ms, 2),
+        "bitsets_warm": bitsets_timing,
+        "top": [(cv["filename"], cv["jaccard"]) for cv in cold.get_json()["cvs"][:3]]
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
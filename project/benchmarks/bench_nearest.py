@@ -0,0 +1,102 @@
+"""Benchmark the local embedding index: ingest embedding cost and /nearest latency.
+
+Embeds a sample of generated documents to measure embedding throughput, fills a SQLite
+database with that many CVs (the rest get random unit vectors, which cost the search the
+same), then times the first /nearest request, which builds the memory-mapped matrix, and
+warm requests against it.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_nearest.py --documents 100000 --embedded 2000
+"""
+from typing import Callable, Dict
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSERT_BATCH_SIZE = 5000
+
+def time_call(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Time repeated calls and return median and best latency in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 2), "best_ms": round(min(timings), 2)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100000, help="Number of CVs in the index")
+    parser.add_argument("--embedded", type=int, default=2000, help="Number of CVs embedded from generated text")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed requests per scenario")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_nearest_")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(work_dir, 'bench.sqlite')}"
+    os.environ["EMBEDDING_INDEX_DIR"] = os.path.join(work_dir, "embedding_index")
+    import numpy as np
+    from app import create_app
+    from db.models import db, CV, DocumentEmbedding
+    from benchmarks.corpus_generator import LANGUAGES, generate_cv
+    from utils.embeddings import embed_tokens, embedding_to_bytes
+    from utils.similarity_calculator import preprocess_text, calculate_similarities
+    import config
+
+    app = create_app()
+    client = app.test_client()
+    languages = list(LANGUAGES)
+    texts = ["\n".join(generate_cv(i, languages[i % len(languages)], 0)["lines"]) for i in range(args.embedded)]
+    start = time.perf_counter()
+    vectors = [embed_tokens(preprocess_text(text)) for text in texts]
+    embed_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    with app.app_context():
+        for start in range(0, args.documents, INSERT_BATCH_SIZE):
+            count = min(INSERT_BATCH_SIZE, args.documents - start)
+            random_vectors = rng.standard_normal((count, config.EMBEDDING_DIM)).astype(np.float32)
+            random_vectors /= np.linalg.norm(random_vectors, axis=1, keepdims=True)
+            db.session.execute(db.insert(CV), [
+                {"filename": f"cv_{start + i}.png", "text": texts[start + i] if start + i < len(texts) else "", "qualifications": "", "skills": "", "experience": ""}
+                for i in range(count)
+            ])
+            db.session.execute(db.insert(DocumentEmbedding), [
+                {"doc_type": "cv", "doc_id": start + i + 1, "vector": embedding_to_bytes(vectors[start + i] if start + i < len(vectors) else random_vectors[i])}
+                for i in range(count)
+            ])
+            db.session.commit()
+
+    lawyer = "Experienced lawyer handling disputes and agreements"
+    attorney = "Attorney with litigation and contracts practice"
+    pair = calculate_similarities(lawyer, attorney, ["cosine_similarity", "jaccard_index", "embedding_cosine_similarity"])
+    start = time.perf_counter()
+    cold = client.get("/nearest", query_string={"q": "attorney litigation contracts", "doc_type": "cv", "k": args.k})
+    cold_ms = (time.perf_counter() - start) * 1000
+    queries = ["attorney litigation contracts", "avocat contentieux", "compliance officer", "paralegal negotiation"]
+    warm = time_call(
+        lambda: client.get("/nearest", query_string={"q": random.choice(queries), "doc_type": "cv", "k": args.k}),
+        args.repeat
+    )
+    by_id = time_call(lambda: client.get("/nearest", query_string={"cv_id": random.randint(1, args.documents), "doc_type": "cv", "k": args.k}), args.repeat)
+    print(json.dumps({
+        "documents": args.documents,
+        "dimensions": config.EMBEDDING_DIM,
+        "matrix_bytes": args.documents * config.EMBEDDING_DIM * 4,
+        "embedding_docs_per_second": round(args.embedded / embed_seconds, 1),
+        "lawyer_vs_attorney": {name: round(value, 3) for name, value in pair.items()},
+        "first_request_ms": round(cold_ms, 2),
+        "first_request_top": [(r["filename"], r["score"]) for r in cold.get_json()["results"][:3]],
+        "warm_text_query": warm,
+        "warm_document_query": by_id
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
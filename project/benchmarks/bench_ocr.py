@@ -0,0 +1,133 @@
+"""Benchmark OCR time and word recall of the two OCR_PREPROCESSING pipelines.
+
+"enhance" (the default) is PIL contrast enhancement and sharpening at the original
+resolution and colour, then Tesseract with its default options. "normalize" is grayscale,
+DPI normalization, deskew, binarization and an explicit page segmentation mode. Run it
+before making "normalize" the default.
+
+By default generated CVs are rendered as clean scans and as phone photos (large RGB images
+with uneven lighting, sensor noise and a few degrees of rotation). Pass --fixtures for a
+directory of PNG/JPEG images; an image's ground truth is read from a .txt file with the
+same name when present.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_ocr.py --documents 12
+    python benchmarks/bench_ocr.py --fixtures /path/to/images
+"""
+from typing import Callable, Dict, List, Optional, Set
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import numpy as np
+import pytesseract
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus_generator import generate_cv, write_cv_png
+
+PHOTO_WIDTH = 3024
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"\w+", text.lower()))
+
+def photograph(scan: Image.Image, rng: np.random.Generator) -> Image.Image:
+    """Turn a clean scan into a phone-photo-like image.
+
+    Args:
+        scan: Grayscale scan.
+        rng: Random generator for rotation, lighting and noise.
+
+    Returns:
+        Image.Image: Large RGB image.
+    """
+    rotated = scan.rotate(float(rng.uniform(-4, 4)), resample=Image.BICUBIC, expand=True, fillcolor=255)
+    height = round(rotated.height * PHOTO_WIDTH / rotated.width)
+    pixels = np.asarray(rotated.resize((PHOTO_WIDTH, height), Image.BICUBIC).convert("RGB")).astype(np.float32)
+    light = np.linspace(float(rng.uniform(0.5, 0.7)), 1.0, PHOTO_WIDTH)[None, :, None]
+    tint = np.array([1.0, 0.96, 0.9], dtype=np.float32)
+    pixels = pixels * light * tint + rng.normal(0, 8, pixels.shape)
+    return Image.fromarray(pixels.clip(0, 255).astype(np.uint8))
+
+def generate_fixtures(directory: str, documents: int, seed: int = 0) -> Dict[str, Set[str]]:
+    """Write scan and photo versions of generated CVs and return their ground-truth words."""
+    rng = np.random.default_rng(seed)
+    truth = {}
+    for index in range(documents):
+        cv = generate_cv(index, "en", seed)
+        scan_path = os.path.join(directory, f"cv_{index}_scan.png")
+        write_cv_png(scan_path, cv)
+        photo_path = os.path.join(directory, f"cv_{index}_photo.png")
+        photograph(Image.open(scan_path), rng).save(photo_path)
+        words = _words(" ".join(cv["lines"]))
+        truth[scan_path] = truth[photo_path] = words
+    return truth
+
+def run(paths: List[str], ocr: Optional[Callable[[Image.Image], str]], preprocess: Callable[[Image.Image], object], truth: Dict[str, Set[str]]) -> Dict[str, float]:
+    """Time preprocessing and OCR over the images and measure word recall per image kind."""
+    preprocess_seconds = ocr_seconds = 0.0
+    recall: Dict[str, List[float]] = {}
+    for path in paths:
+        with Image.open(path) as image:
+            image.load()
+            start = time.perf_counter()
+            preprocess(image)
+            preprocess_seconds += time.perf_counter() - start
+            if ocr is None:
+                continue
+            start = time.perf_counter()
+            text = ocr(image)
+            ocr_seconds += time.perf_counter() - start
+        if path in truth and truth[path]:
+            kind = "photo" if "_photo" in path else "scan"
+            recall.setdefault(kind, []).append(len(_words(text) & truth[path]) / len(truth[path]))
+    result = {"preprocess_seconds": round(preprocess_seconds, 3)}
+    if ocr is not None:
+        result["total_seconds"] = round(ocr_seconds, 3)
+        result["seconds_per_image"] = round(ocr_seconds / max(len(paths), 1), 3)
+        result.update({f"word_recall_{kind}": round(sum(values) / len(values), 4) for kind, values in sorted(recall.items())})
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory of PNG/JPEG images to use instead of generated CVs")
+    parser.add_argument("--documents", type=int, default=12, help="Generated CVs (each as a scan and a photo)")
+    args = parser.parse_args()
+
+    from utils.cv_processor import ocr_image
+    from utils.ocr_preprocessing import enhance_for_ocr, preprocess_for_ocr
+
+    if args.fixtures:
+        paths = sorted(p for p in glob.glob(os.path.join(args.fixtures, "*")) if p.lower().endswith((".png", ".jpg", ".jpeg")))
+        truth = {}
+        for path in paths:
+            truth_path = os.path.splitext(path)[0] + ".txt"
+            if os.path.exists(truth_path):
+                with open(truth_path, encoding="utf-8") as f:
+                    truth[path] = _words(f.read())
+    else:
+        truth = generate_fixtures(tempfile.mkdtemp(prefix="bench_ocr_"), args.documents)
+        paths = sorted(truth)
+
+    try:
+        pytesseract.get_tesseract_version()
+        tesseract = True
+    except (pytesseract.TesseractNotFoundError, EnvironmentError):
+        tesseract = False
+
+    results = {
+        "images": len(paths),
+        "enhance": run(paths, (lambda image: ocr_image(image, preprocessing="enhance")) if tesseract else None, enhance_for_ocr, truth),
+        "normalize": run(paths, (lambda image: ocr_image(image, preprocessing="normalize")) if tesseract else None, preprocess_for_ocr, truth)
+    }
+    if not tesseract:
+        results["note"] = "Tesseract is not installed; only preprocessing time was measured"
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
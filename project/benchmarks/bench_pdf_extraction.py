@@ -0,0 +1,119 @@
+"""Benchmark the tiered PDF engine against pdfplumber-only extraction on a fixture corpus.
+
+By default a corpus is generated with pdf_fixtures: multi-page text documents, some with a
+ruled table page and some with a scanned (image-only) page. Pass --fixtures to run on a
+directory of real PDFs instead; word recall is only reported for generated documents.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_pdf_extraction.py --documents 40 --pages 5
+    python benchmarks/bench_pdf_extraction.py --fixtures /path/to/pdfs
+"""
+from typing import Dict, List, Optional, Set, Tuple
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import pdfplumber
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.pdf_fixtures import text_page, table_page, scanned_page_image, write_pdf
+
+VOCABULARY_SIZE = 5000
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z]+", text.lower()))
+
+def generate_corpus(directory: str, documents: int, pages: int, seed: int = 0) -> Dict[str, Set[str]]:
+    """Write generated PDFs and return the words each one contains.
+
+    Every third document gets a table page and every fifth a scanned page.
+
+    Args:
+        directory: Output directory.
+        documents: Number of PDFs.
+        pages: Text pages per PDF.
+        seed: Random seed.
+
+    Returns:
+        Dict[str, Set[str]]: Ground-truth words per PDF path.
+    """
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10))) for _ in range(VOCABULARY_SIZE)]
+    truth = {}
+    for number in range(documents):
+        content: List[Tuple[bytes, object]] = []
+        words: Set[str] = set()
+        for _ in range(pages):
+            lines = [" ".join(rng.choices(vocabulary, k=12)) for _ in range(45)]
+            content.append((text_page(lines), None))
+            words |= _words(" ".join(lines))
+        if number % 3 == 0:
+            rows = [[rng.choice(vocabulary) for _ in range(3)] for _ in range(20)]
+            content.append((table_page(rows), None))
+            words |= _words(" ".join(" ".join(row) for row in rows))
+        if number % 5 == 0:
+            lines = [" ".join(rng.choices(vocabulary, k=8)) for _ in range(20)]
+            content.append((b"", scanned_page_image(lines)))
+            words |= _words(" ".join(lines))
+        path = os.path.join(directory, f"job_{number:04d}.pdf")
+        write_pdf(path, content)
+        truth[path] = words
+    return truth
+
+def pdfplumber_only(path: str) -> str:
+    """Extraction as done before the tiered engine: pdfplumber on every page, no OCR."""
+    with pdfplumber.open(path) as pdf:
+        return " ".join(filter(None, (page.extract_text() or "" for page in pdf.pages))).strip()
+
+def run(paths: List[str], engine: Optional[str], truth: Dict[str, Set[str]]) -> Dict[str, object]:
+    """Extract every file with one engine (None for pdfplumber_only) and summarize."""
+    from utils.pdf_extractor import extract_pdf_pages
+
+    methods: Dict[str, int] = {}
+    recalls = []
+    start = time.perf_counter()
+    for path in paths:
+        if engine is None:
+            text = pdfplumber_only(path)
+        else:
+            pages = extract_pdf_pages(path, engine)
+            text = " ".join(entry["text"] for entry in pages)
+            for entry in pages:
+                methods[entry["method"]] = methods.get(entry["method"], 0) + 1
+        if path in truth and truth[path]:
+            recalls.append(len(truth[path] & _words(text)) / len(truth[path]))
+    elapsed = time.perf_counter() - start
+    result = {"seconds": round(elapsed, 3), "files_per_second": round(len(paths) / elapsed, 2)}
+    if methods:
+        result["pages_by_method"] = methods
+    if recalls:
+        result["mean_word_recall"] = round(sum(recalls) / len(recalls), 4)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory of PDFs to use instead of a generated corpus")
+    parser.add_argument("--documents", type=int, default=40, help="Generated PDFs")
+    parser.add_argument("--pages", type=int, default=5, help="Text pages per generated PDF")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "*.pdf")))
+        truth: Dict[str, Set[str]] = {}
+    else:
+        truth = generate_corpus(tempfile.mkdtemp(prefix="bench_pdf_"), args.documents, args.pages)
+        paths = sorted(truth)
+
+    results = {"files": len(paths), "pdfplumber_only": run(paths, None, truth)}
+    for engine in ("fast", "auto", "layout"):
+        results[engine] = run(paths, engine, truth)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark scatter-gather /nearest over local shard workers against a single process.
+
+Fills a SQLite database with CVs carrying random unit embeddings, starts --shards
+`flask serve-shard` processes on this machine, and measures /nearest throughput with
+--clients concurrent clients, first with the application searching its own matrix and
+then with SHARD_URLS pointing at the workers. Both rankings are compared for equality.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_shards.py --documents 20000 --shards 4 --clients 8
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INSERT_BATCH_SIZE = 5000
+BASE_PORT = 5300
+
+def wait_for_shards(urls: List[str], timeout: float = 600) -> None:
+    """Poll /health of every shard worker until all answer."""
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        while True:
+            try:
+                with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+                    json.loads(response.read())
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Shard worker at {url} did not start")
+                time.sleep(0.5)
+
+def measure_throughput(request: Callable[[int], object], total: int, clients: int) -> Dict[str, float]:
+    """Send total requests from concurrent clients and return requests per second."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(request, range(total)))
+    elapsed = time.perf_counter() - start
+    return {"requests_per_second": round(total / elapsed, 1), "seconds": round(elapsed, 2)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000, help="Number of CVs")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 2, help="Number of shard worker processes")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_shards_")
+    urls = [f"http://127.0.0.1:{BASE_PORT + shard}" for shard in range(args.shards)]
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(work_dir, 'bench.sqlite')}"
+    os.environ["EMBEDDING_INDEX_DIR"] = os.path.join(work_dir, "embedding_index")
+    os.environ["SHARD_URLS"] = ",".join(urls)
+    import numpy as np
+    from app import create_app
+    from db.models import db, CV, DocumentEmbedding
+    from db.migrations import run_migrations
+    from db.table_versions import bump_table_versions
+    from utils.embeddings import embedding_to_bytes
+    import config
+
+    app = create_app()
+    client = app.test_client()
+    rng = np.random.default_rng(0)
+    with app.app_context():
+        for start in range(0, args.documents, INSERT_BATCH_SIZE):
+            count = min(INSERT_BATCH_SIZE, args.documents - start)
+            vectors = rng.standard_normal((count, config.EMBEDDING_DIM)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            db.session.execute(db.insert(CV), [
+                {"filename": f"cv_{start + i}.png", "text": "", "qualifications": "", "skills": "", "experience": ""}
+                for i in range(count)
+            ])
+            db.session.execute(db.insert(DocumentEmbedding), [
+                {"doc_type": "cv", "doc_id": start + i + 1, "vector": embedding_to_bytes(vectors[i])}
+                for i in range(count)
+            ])
+            db.session.commit()
+        # Backfill the raw rows once here rather than in every worker at start-up.
+        run_migrations()
+        bump_table_versions(db.session, [CV.__tablename__])
+        db.session.commit()
+
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "flask", "--app", "app", "serve-shard", "--shard", str(shard), "--shards", str(args.shards), "--port", str(BASE_PORT + shard)],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env={**os.environ, "SHARD_URLS": ""},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        for shard in range(args.shards)
+    ]
+    try:
+        wait_for_shards(urls)
+
+        def nearest(i: int) -> List[int]:
+            response = client.get("/nearest", query_string={"cv_id": i % args.documents + 1, "doc_type": "cv", "k": args.k})
+            return [result["id"] for result in response.get_json()["results"]]
+
+        config.SHARD_URLS = []
+        nearest(0)
+        single_results = [nearest(i) for i in range(20)]
+        single = measure_throughput(nearest, args.requests, args.clients)
+        config.SHARD_URLS = urls
+        sharded_results = [nearest(i) for i in range(20)]
+        sharded = measure_throughput(nearest, args.requests, args.clients)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+    print(json.dumps({
+        "documents": args.documents,
+        "shards": args.shards,
+        "clients": args.clients,
+        "cpus": os.cpu_count(),
+        "single_process": single,
+        "sharded": sharded,
+        "identical_rankings": single_results == sharded_results
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark compressed text storage: database size and /view-data latency.
+
+Loads the same documents into a SQLite database as it was before text compression:
+uncompressed rows and an FTS5 search index that stores its own copy of every text.
+Measures the whole database file, the document tables, the search index and /view-data
+latency, then runs the compression migration, rebuilds the index as a contentless table
+and measures again, with and without text in the listing.
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/bench_text_storage.py --documents 2000 --words 1500
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VOCABULARY_SIZE = 3000
+
+def generate_texts(count: int, words: int, seed: int = 0) -> List[str]:
+    """Generate document texts drawn from a fixed vocabulary with a Zipf-like distribution.
+
+    Args:
+        count: Number of documents.
+        words: Number of words per document.
+        seed: Random seed.
+
+    Returns:
+        List[str]: Generated texts.
+    """
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 11))) for _ in range(VOCABULARY_SIZE)]
+    weights = [1.0 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    return [" ".join(rng.choices(vocabulary, weights, k=words)) for _ in range(count)]
+
+def vacuumed_size(path: str) -> int:
+    """Return the database file size after VACUUM, so freed pages are not counted."""
+    connection = sqlite3.connect(path)
+    connection.execute("VACUUM")
+    connection.close()
+    return os.path.getsize(path)
+
+def table_bytes(path: str, tables: List[str]) -> Optional[int]:
+    """Return the pages used by the given tables and their shadow tables, or None if SQLite lacks the dbstat table."""
+    connection = sqlite3.connect(path)
+    try:
+        return sum(
+            connection.execute("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = ? OR name LIKE ? ESCAPE '\\'", (table, f"{table}\\_%")).fetchone()[0]
+            for table in tables
+        )
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        connection.close()
+
+def measure(path: str, tables: List[str], search_table: str) -> Dict[str, Optional[int]]:
+    """Measure the whole database, the document tables and the search index after VACUUM."""
+    connection = sqlite3.connect(path)
+    connection.execute("VACUUM")
+    connection.close()
+    return {
+        "database_bytes": os.path.getsize(path),
+        "document_table_bytes": table_bytes(path, tables),
+        "search_index_bytes": table_bytes(path, [search_table])
+    }
+
+def time_call(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Time repeated calls and return median and best latency in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 2), "best_ms": round(min(timings), 2)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000, help="Number of documents (half jobs, half CVs)")
+    parser.add_argument("--words", type=int, default=1500, help="Words per document")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed requests per scenario")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_text_storage_")
+    path = os.path.join(work_dir, "bench.sqlite")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    from sqlalchemy import text
+    from app import create_app
+    from db.models import db, SchemaMigration
+    from db.migrations import compress_document_texts
+    from db.search import ensure_search_index
+    import config
+
+    app = create_app()
+    client = app.test_client()
+    tables = [config.JOB_DESCRIPTIONS_TABLE, config.CVS_TABLE]
+    texts = generate_texts(args.documents, args.words)
+    half = len(texts) // 2
+    with app.app_context():
+        # Raw inserts keep the text uncompressed, exactly like rows written before the migration.
+        db.session.execute(
+            text(f"INSERT INTO {tables[0]} (filename, text) VALUES (:filename, :text)"),
+            [{"filename": f"job_{i}.pdf", "text": t} for i, t in enumerate(texts[:half])]
+        )
+        db.session.execute(
+            text(f"INSERT INTO {tables[1]} (filename, text, qualifications, skills, experience) VALUES (:filename, :text, '', '', '')"),
+            [{"filename": f"cv_{i}.png", "text": t} for i, t in enumerate(texts[half:])]
+        )
+        # The search index as it was before: an FTS5 table keeping its own copy of the text.
+        db.session.execute(text(f"DROP TABLE {config.SEARCH_INDEX_TABLE}"))
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE {config.SEARCH_INDEX_TABLE} "
+            "USING fts5(doc_type UNINDEXED, doc_id UNINDEXED, filename, text, tokenize='unicode61 remove_diacritics 2')"
+        ))
+        for doc_type, table in (("job", tables[0]), ("cv", tables[1])):
+            db.session.execute(text(
+                f"INSERT INTO {config.SEARCH_INDEX_TABLE} (doc_type, doc_id, filename, text) "
+                f"SELECT '{doc_type}', id, filename, text FROM {table}"
+            ))
+        db.session.commit()
+
+    results = {"documents": args.documents, "words_per_document": args.words}
+    results["uncompressed"] = dict(
+        measure(path, tables, config.SEARCH_INDEX_TABLE),
+        view_data=time_call(lambda: client.get("/view-data"), args.repeat)
+    )
+
+    with app.app_context():
+        SchemaMigration.query.filter_by(name="compress_document_texts").delete()
+        db.session.commit()
+        compress_document_texts()
+        ensure_search_index()
+    results["compressed"] = dict(
+        measure(path, tables, config.SEARCH_INDEX_TABLE),
+        view_data=time_call(lambda: client.get("/view-data"), args.repeat),
+        view_data_without_text=time_call(lambda: client.get("/view-data?include_text=false"), args.repeat)
+    )
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""Generate synthetic job descriptions and CVs for benchmarks and load tests.
+
+Job descriptions are written as PDF and DOCX files, CVs as PNG images with rendered text, and
+both as SQL fixtures. Content draws on the configured QUALIFICATIONS_KEYWORDS, SKILLS_KEYWORDS
+and EXPERIENCE_KEYWORDS so keyword parsing, filtering and similarity have realistic matches,
+and every document can be produced in English, French, German or Spanish. Documents are
+deterministic for a given seed and index, so runs at 1k, 10k or 100k documents are comparable.
+
+Output layout:
+    jobs/job_000000.pdf, jobs/job_000001.docx, ...
+    cvs/cv_000000.png, ...
+    fixtures_<dialect>.sql      INSERT statements for the job and CV tables
+    manifest.jsonl              one line per document with its language and keywords
+
+SQL fixtures hold the compressed text like the application writes it, as INSERT statements
+only: the tables are created by the application. Start it once against an empty database
+(any Flask command does, e.g. `flask --app app routes`), load the fixtures, then start it
+again; the startup migrations then backfill the derived indexes (keywords, MinHash, search,
+embeddings, corpus statistics).
+
+Usage (from the project directory, with the usual .env in place):
+    python benchmarks/corpus_generator.py --output /tmp/corpus --jobs 1000 --cvs 1000
+    python benchmarks/corpus_generator.py --output /tmp/corpus --jobs 100000 --cvs 100000 \
+        --formats sql --dialect postgresql --languages en,fr
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from benchmarks.pdf_fixtures import text_page, table_page, write_pdf
+
+FORMATS = ("pdf", "docx", "png", "sql")
+DIALECTS = ("sqlite", "postgresql")
+BATCH_SIZE = 100
+LINE_CHARS = 90
+CV_FONT_SIZE = 28
+
+LANGUAGES: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "titles": ["Corporate Lawyer", "Legal Counsel", "Compliance Officer", "Paralegal", "Litigation Associate", "Contract Manager"],
+        "cities": ["London", "Manchester", "Dublin", "Edinburgh", "New York"],
+        "intro": ["{company} is looking for a {title} to join its {city} office.", "Our {city} team is hiring a {title}."],
+        "requirement": ["Candidates must hold a {keyword}.", "A {keyword} is required for this position.", "Strong command of {keyword} is expected."],
+        "skill": ["You will handle {keyword} for major clients.", "Daily work includes {keyword} and advisory work.", "Experience in {keyword} is a plus."],
+        "experience": ["At least {years} years of experience, {keyword} level.", "We welcome {keyword} profiles with {years} years in practice."],
+        "filler": ["The role reports to the General Counsel.", "We offer hybrid working and continuous training.", "Applications are reviewed on a rolling basis.", "The team works closely with finance and HR."],
+        "cv_headings": ["Education", "Skills", "Experience"],
+        "cv_lines": ["{year} - {keyword}, {city}", "{keyword}", "{years} years as {title} ({keyword})"],
+        "first_names": ["James", "Olivia", "Harry", "Amelia", "Noah", "Isla"],
+        "last_names": ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson"]
+    },
+    "fr": {
+        "titles": ["Juriste d'affaires", "Avocat collaborateur", "Responsable conformité", "Juriste contrats", "Paralégal"],
+        "cities": ["Paris", "Lyon", "Marseille", "Bordeaux", "Lille"],
+        "intro": ["{company} recrute un {title} pour son bureau de {city}.", "Notre équipe de {city} recherche un {title}."],
+        "requirement": ["Le candidat doit être titulaire d'un {keyword}.", "Un {keyword} est exigé pour ce poste.", "Une excellente maîtrise de {keyword} est attendue."],
+        "skill": ["Vous serez en charge de {keyword} pour des clients de premier plan.", "Le poste comprend {keyword} et du conseil.", "Une expérience en {keyword} est appréciée."],
+        "experience": ["Au moins {years} ans d'expérience, niveau {keyword}.", "Profil {keyword} avec {years} ans de pratique bienvenu."],
+        "filler": ["Le poste est rattaché à la direction juridique.", "Télétravail partiel et formation continue.", "Les candidatures sont étudiées au fil de l'eau.", "L'équipe travaille avec la finance et les RH."],
+        "cv_headings": ["Formation", "Compétences", "Expérience"],
+        "cv_lines": ["{year} - {keyword}, {city}", "{keyword}", "{years} ans comme {title} ({keyword})"],
+        "first_names": ["Camille", "Léa", "Hugo", "Chloé", "Louis", "Inès"],
+        "last_names": ["Martin", "Bernard", "Dubois", "Lefèvre", "Moreau", "Girard"]
+    },
+    "de": {
+        "titles": ["Syndikusrechtsanwalt", "Wirtschaftsjurist", "Compliance-Manager", "Rechtsanwaltsfachangestellte", "Vertragsmanager"],
+        "cities": ["Berlin", "München", "Hamburg", "Köln", "Frankfurt"],
+        "intro": ["{company} sucht einen {title} für das Büro in {city}.", "Unser Team in {city} stellt einen {title} ein."],
+        "requirement": ["Voraussetzung ist ein {keyword}.", "Ein {keyword} ist für diese Stelle erforderlich.", "Sichere Kenntnisse in {keyword} werden erwartet."],
+        "skill": ["Sie betreuen {keyword} für namhafte Mandanten.", "Zu den Aufgaben gehören {keyword} und Beratung.", "Erfahrung in {keyword} ist von Vorteil."],
+        "experience": ["Mindestens {years} Jahre Berufserfahrung, Niveau {keyword}.", "{keyword} Profile mit {years} Jahren Praxis sind willkommen."],
+        "filler": ["Die Stelle berichtet an den General Counsel.", "Wir bieten mobiles Arbeiten und Weiterbildung.", "Bewerbungen werden laufend geprüft.", "Das Team arbeitet eng mit Finanzen und Personal."],
+        "cv_headings": ["Ausbildung", "Kenntnisse", "Berufserfahrung"],
+        "cv_lines": ["{year} - {keyword}, {city}", "{keyword}", "{years} Jahre als {title} ({keyword})"],
+        "first_names": ["Lukas", "Anna", "Jonas", "Lea", "Felix", "Marie"],
+        "last_names": ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Becker"]
+    },
+    "es": {
+        "titles": ["Abogado corporativo", "Asesor jurídico", "Responsable de cumplimiento", "Paralegal", "Gestor de contratos"],
+        "cities": ["Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao"],
+        "intro": ["{company} busca un {title} para su oficina de {city}.", "Nuestro equipo de {city} contrata un {title}."],
+        "requirement": ["Se requiere un {keyword}.", "Es imprescindible contar con un {keyword}.", "Se valorará el dominio de {keyword}."],
+        "skill": ["Gestionará {keyword} para clientes de primer nivel.", "El puesto incluye {keyword} y asesoramiento.", "Se valorará experiencia en {keyword}."],
+        "experience": ["Al menos {years} años de experiencia, nivel {keyword}.", "Perfiles {keyword} con {years} años de práctica."],
+        "filler": ["El puesto reporta a la dirección jurídica.", "Ofrecemos teletrabajo parcial y formación continua.", "Las candidaturas se revisan de forma continua.", "El equipo colabora con finanzas y RR. HH."],
+        "cv_headings": ["Formación", "Competencias", "Experiencia"],
+        "cv_lines": ["{year} - {keyword}, {city}", "{keyword}", "{years} años como {title} ({keyword})"],
+        "first_names": ["Lucía", "Hugo", "Martina", "Pablo", "Sofía", "Daniel"],
+        "last_names": ["García", "Fernández", "López", "Martínez", "Sánchez", "Pérez"]
+    }
+}
+COMPANIES = ["Acme Legal", "Northwind Partners", "Globex", "Initech", "Umbrella Group", "Stark & Wayne", "Contoso"]
+
+def _keywords(values: List[str]) -> List[str]:
+    """Clean a configured keyword list, keeping a placeholder if it is empty."""
+    cleaned = [value.strip() for value in values if value.strip()]
+    return cleaned or ["law"]
+
+def _wrap(text: str, width: int = LINE_CHARS) -> List[str]:
+    """Wrap text into lines of at most width characters on word boundaries."""
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+def _document_rng(seed: int, kind: str, index: int) -> random.Random:
+    """Random generator for one document, independent of generation order and worker count."""
+    return random.Random(f"{seed}:{kind}:{index}")
+
+def generate_job(index: int, language: str, seed: int, paragraphs: int) -> Dict[str, object]:
+    """Generate the content of one job description.
+
+    Args:
+        index: Document index.
+        language: Language code from LANGUAGES.
+        seed: Corpus seed.
+        paragraphs: Number of body paragraphs.
+
+    Returns:
+        Dict[str, object]: title, company, paragraphs, requirements table rows and the keywords used.
+    """
+    rng = _document_rng(seed, "job", index)
+    words = LANGUAGES[language]
+    qualifications = rng.sample(_keywords(config.QUALIFICATIONS_KEYWORDS), k=min(2, len(_keywords(config.QUALIFICATIONS_KEYWORDS))))
+    skills = rng.sample(_keywords(config.SKILLS_KEYWORDS), k=min(4, len(_keywords(config.SKILLS_KEYWORDS))))
+    experience = rng.sample(_keywords(config.EXPERIENCE_KEYWORDS), k=1)
+    title, company, city = rng.choice(words["titles"]), rng.choice(COMPANIES), rng.choice(words["cities"])
+    years = rng.randint(2, 12)
+
+    body = [rng.choice(words["intro"]).format(company=company, title=title, city=city)]
+    for number in range(paragraphs):
+        sentences = [rng.choice(words["skill"]).format(keyword=rng.choice(skills))]
+        if number == 0:
+            sentences += [rng.choice(words["requirement"]).format(keyword=keyword) for keyword in qualifications]
+            sentences.append(rng.choice(words["experience"]).format(keyword=experience[0], years=years))
+        sentences += rng.sample(words["filler"], k=2)
+        body.append(" ".join(sentences))
+    return {
+        "title": f"{title} - {city}",
+        "company": company,
+        "paragraphs": body,
+        "table": [[heading, keyword] for heading, keyword in zip(words["cv_headings"], [qualifications[0], skills[0], experience[0]])],
+        "keywords": {"qualifications": qualifications, "skills": skills, "experience": experience}
+    }
+
+def generate_cv(index: int, language: str, seed: int) -> Dict[str, object]:
+    """Generate the content of one CV.
+
+    Args:
+        index: Document index.
+        language: Language code from LANGUAGES.
+        seed: Corpus seed.
+
+    Returns:
+        Dict[str, object]: name, text lines and the keywords used.
+    """
+    rng = _document_rng(seed, "cv", index)
+    words = LANGUAGES[language]
+    all_qualifications = _keywords(config.QUALIFICATIONS_KEYWORDS)
+    all_skills = _keywords(config.SKILLS_KEYWORDS)
+    all_experience = _keywords(config.EXPERIENCE_KEYWORDS)
+    qualifications = rng.sample(all_qualifications, k=rng.randint(1, min(3, len(all_qualifications))))
+    skills = rng.sample(all_skills, k=rng.randint(1, min(6, len(all_skills))))
+    experience = rng.sample(all_experience, k=1)
+    name = f"{rng.choice(words['first_names'])} {rng.choice(words['last_names'])}"
+    education, competences, career = words["cv_headings"]
+    lines = [name, rng.choice(words["cities"]), "", education]
+    lines += [words["cv_lines"][0].format(year=rng.randint(1995, 2022), keyword=keyword, city=rng.choice(words["cities"])) for keyword in qualifications]
+    lines += ["", competences] + [words["cv_lines"][1].format(keyword=keyword) for keyword in skills]
+    lines += ["", career, words["cv_lines"][2].format(years=rng.randint(1, 20), title=rng.choice(words["titles"]), keyword=experience[0])]
+    return {"name": name, "lines": lines, "keywords": {"qualifications": qualifications, "skills": skills, "experience": experience}}
+
+def job_text(job: Dict[str, object]) -> str:
+    """Plain text of a generated job description, as an extractor would return it."""
+    table = " ".join(" ".join(row) for row in job["table"])
+    return " ".join([job["title"], job["company"], *job["paragraphs"], table])
+
+def write_job_pdf(path: str, job: Dict[str, object]) -> None:
+    """Write a job description as a PDF: text pages, then a ruled requirements table page."""
+    lines = [job["title"], job["company"], ""]
+    for paragraph in job["paragraphs"]:
+        lines += _wrap(paragraph) + [""]
+    lines_per_page = 48
+    pages = [(text_page(lines[start:start + lines_per_page]), None) for start in range(0, len(lines), lines_per_page)]
+    pages.append((table_page(job["table"]), None))
+    write_pdf(path, pages)
+
+def _docx_paragraph(text: str) -> str:
+    return f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+def write_job_docx(path: str, job: Dict[str, object]) -> None:
+    """Write a job description as a minimal DOCX with a header, body paragraphs, a table and a footer."""
+    namespace = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    rows = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_docx_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>"
+        for row in job["table"]
+    )
+    body = "".join(_docx_paragraph(paragraph) for paragraph in [job["title"], *job["paragraphs"]])
+    document = (
+        f"<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?><w:document {namespace}><w:body>{body}"
+        f"<w:tbl>{rows}</w:tbl><w:sectPr><w:headerReference w:type=\"default\" r:id=\"rId1\"/>"
+        "<w:footerReference w:type=\"default\" r:id=\"rId2\"/></w:sectPr></w:body></w:document>"
+    )
+    part_types = {
+        "document": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+        "header": "application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml",
+        "footer": "application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"
+    }
+    relationship = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+            "<Types xmlns=\"http://schemas.openxmlformats.org/package/2006/content-types\">"
+            "<Default Extension=\"rels\" ContentType=\"application/vnd.openxmlformats-package.relationships+xml\"/>"
+            "<Default Extension=\"xml\" ContentType=\"application/xml\"/>"
+            f"<Override PartName=\"/word/document.xml\" ContentType=\"{part_types['document']}\"/>"
+            f"<Override PartName=\"/word/header1.xml\" ContentType=\"{part_types['header']}\"/>"
+            f"<Override PartName=\"/word/footer1.xml\" ContentType=\"{part_types['footer']}\"/></Types>"
+        ))
+        archive.writestr("_rels/.rels", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+            "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+            f"<Relationship Id=\"rId1\" Type=\"{relationship}/officeDocument\" Target=\"word/document.xml\"/></Relationships>"
+        ))
+        archive.writestr("word/_rels/document.xml.rels", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+            "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+            f"<Relationship Id=\"rId1\" Type=\"{relationship}/header\" Target=\"header1.xml\"/>"
+            f"<Relationship Id=\"rId2\" Type=\"{relationship}/footer\" Target=\"footer1.xml\"/></Relationships>"
+        ))
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/header1.xml", f"<w:hdr {namespace}>{_docx_paragraph(job['company'])}</w:hdr>")
+        archive.writestr("word/footer1.xml", f"<w:ftr {namespace}>{_docx_paragraph(job['title'])}</w:ftr>")
+
+@lru_cache(maxsize=None)
+def _load_font(font: Optional[str], size: int) -> ImageFont.ImageFont:
+    """Load the CV font: the given TrueType file, DejaVu Sans if installed, else Pillow's default.
+
+    Pillow's default font has no accented glyphs, so pass --font for non-English CVs.
+    """
+    for candidate in filter(None, (font, "DejaVuSans.ttf")):
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def write_cv_png(path: str, cv: Dict[str, object], font: Optional[str] = None, noise: float = 0.0, seed: int = 0) -> None:
+    """Render a CV as a grayscale PNG, optionally with salt-and-pepper noise like a scan.
+
+    Args:
+        path: Output path.
+        cv: Generated CV content.
+        font: Path to a TrueType font; see _load_font.
+        noise: Fraction of pixels flipped to black or white.
+        seed: Seed for the noise.
+    """
+    typeface = _load_font(font, CV_FONT_SIZE)
+    line_height = typeface.getbbox("Ag")[3] + CV_FONT_SIZE // 2
+    image = Image.new("L", (1240, max(400, 80 + line_height * len(cv["lines"]))), 255)
+    draw = ImageDraw.Draw(image)
+    for number, line in enumerate(cv["lines"]):
+        draw.text((60, 40 + number * line_height), line, fill=0, font=typeface)
+    if noise:
+        rng = random.Random(seed)
+        pixels = image.load()
+        for _ in range(int(image.width * image.height * noise)):
+            pixels[rng.randrange(image.width), rng.randrange(image.height)] = rng.choice((0, 255))
+    image.save(path)
+
+def _sql_blob(text: str, dialect: str) -> str:
+    """SQL literal of a text compressed like the CompressedText column type stores it."""
+    data = zlib.compress(text.encode("utf-8"), config.TEXT_COMPRESSION_LEVEL).hex()
+    return f"X'{data}'" if dialect == "sqlite" else f"'\\x{data}'::bytea"
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def _generate_batch(task: Tuple[str, int, int, argparse.Namespace]) -> List[Dict[str, object]]:
+    """Generate and write one batch of documents; runs in a worker process.
+
+    Returns:
+        List[Dict[str, object]]: Manifest entries, with the text and SQL row for the parent.
+    """
+    kind, start, stop, args = task
+    languages = args.languages.split(",")
+    entries = []
+    for index in range(start, stop):
+        language = languages[index % len(languages)]
+        if kind == "job":
+            job = generate_job(index, language, args.seed, args.paragraphs)
+            file_formats = [fmt for fmt in ("pdf", "docx") if fmt in args.format_set]
+            extension = file_formats[index % len(file_formats)] if file_formats else "pdf"
+            filename = f"job_{index:06d}.{extension}"
+            if extension in args.format_set:
+                writer = write_job_pdf if extension == "pdf" else write_job_docx
+                writer(os.path.join(args.output, "jobs", filename), job)
+            text, keywords = job_text(job), job["keywords"]
+        else:
+            cv = generate_cv(index, language, args.seed)
+            filename = f"cv_{index:06d}.png"
+            if "png" in args.format_set:
+                write_cv_png(os.path.join(args.output, "cvs", filename), cv, args.font, args.noise, args.seed + index)
+            text, keywords = " ".join(cv["lines"]), cv["keywords"]
+        entries.append({"type": kind, "filename": filename, "language": language, "keywords": keywords, "text": text})
+    return entries
+
+def _tasks(args: argparse.Namespace, batch_size: int) -> Iterator[Tuple[str, int, int, argparse.Namespace]]:
+    for kind, count in (("job", args.jobs), ("cv", args.cvs)):
+        for start in range(0, count, batch_size):
+            yield kind, start, min(start + batch_size, count), args
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--jobs", type=int, default=1000, help="Number of job descriptions")
+    parser.add_argument("--cvs", type=int, default=1000, help="Number of CVs")
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"Comma-separated subset of {','.join(FORMATS)}")
+    parser.add_argument("--languages", default="en", help=f"Comma-separated subset of {','.join(LANGUAGES)}, used round-robin")
+    parser.add_argument("--dialect", choices=DIALECTS, default="sqlite", help="SQL dialect of the fixtures")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Body paragraphs per job description")
+    parser.add_argument("--noise", type=float, default=0.0, help="Fraction of noisy pixels in CV images")
+    parser.add_argument("--font", help="TrueType font for CV images; needed for accents unless DejaVu Sans is installed")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    args.format_set = set(args.formats.split(","))
+    unknown = args.format_set - set(FORMATS) or set(args.languages.split(",")) - set(LANGUAGES)
+    if unknown:
+        parser.error(f"Unknown format or language: {', '.join(sorted(unknown))}")
+    for directory in ("jobs", "cvs"):
+        os.makedirs(os.path.join(args.output, directory), exist_ok=True)
+
+    started = time.perf_counter()
+    tables = {"job": config.JOB_DESCRIPTIONS_TABLE, "cv": config.CVS_TABLE}
+    sql = open(os.path.join(args.output, f"fixtures_{args.dialect}.sql"), "w", encoding="utf-8") if "sql" in args.format_set else None
+    counts = {"job": 0, "cv": 0}
+    try:
+        with open(os.path.join(args.output, "manifest.jsonl"), "w", encoding="utf-8") as manifest, \
+                ProcessPoolExecutor(max_workers=args.workers) as executor:
+            # Batches come back in submission order, so IDs in the fixtures follow document indexes.
+            for entries in executor.map(_generate_batch, _tasks(args, BATCH_SIZE)):
+                rows = []
+                for entry in entries:
+                    counts[entry["type"]] += 1
+                    text = entry.pop("text")
+                    manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    if entry["type"] == "job":
+                        rows.append(f"({_sql_string(entry['filename'])}, {_sql_blob(text, args.dialect)})")
+                    else:
+                        keywords = [",".join(entry["keywords"][category]) for category in ("qualifications", "skills", "experience")]
+                        rows.append(f"({_sql_string(entry['filename'])}, {_sql_blob(text, args.dialect)}, " + ", ".join(map(_sql_string, keywords)) + ")")
+                if sql is not None and rows:
+                    kind = entries[0]["type"]
+                    columns = "filename, text" if kind == "job" else "filename, text, qualifications, skills, experience"
+                    sql.write(f"INSERT INTO {tables[kind]} ({columns}) VALUES\n" + ",\n".join(rows) + ";\n")
+    finally:
+        if sql is not None:
+            sql.close()
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "output": args.output,
+        "jobs": counts["job"],
+        "cvs": counts["cv"],
+        "seconds": round(elapsed, 2),
+        "documents_per_second": round((counts["job"] + counts["cv"]) / elapsed, 1)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
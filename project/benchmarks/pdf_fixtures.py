@@ -0,0 +1,104 @@
+"""Minimal hand-written PDF files for benchmarks: text pages, ruled tables and scanned pages.
+
+No PDF library is needed to write them; pages use the standard Helvetica font and scanned
+pages embed a JPEG rendered with Pillow.
+"""
+from typing import List, Optional, Tuple
+import io
+from PIL import Image, ImageDraw
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 72
+FONT_SIZE = 11
+LEADING = 14
+
+def _escape(text: str) -> bytes:
+    """Encode text as the body of a PDF literal string."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+def text_page(lines: List[str]) -> bytes:
+    """Content stream for a single-column page of text lines."""
+    body = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td".encode()]
+    body.extend(b"(" + _escape(line) + b") Tj T*" for line in lines)
+    body.append(b"ET")
+    return b"\n".join(body)
+
+def table_page(rows: List[List[str]], column_width: int = 150, row_height: int = 20) -> bytes:
+    """Content stream for a ruled table, one text object per cell as table generators emit."""
+    columns = max(len(row) for row in rows)
+    top = PAGE_HEIGHT - MARGIN
+    body = []
+    for index in range(len(rows) + 1):
+        y = top - index * row_height
+        body.append(f"{MARGIN} {y} m {MARGIN + columns * column_width} {y} l S".encode())
+    for index in range(columns + 1):
+        x = MARGIN + index * column_width
+        body.append(f"{x} {top} m {x} {top - len(rows) * row_height} l S".encode())
+    # Cells are written column by column, so the raw text layer reads down columns.
+    for column in range(columns):
+        for index, row in enumerate(rows):
+            if column < len(row):
+                x = MARGIN + column * column_width + 4
+                y = top - (index + 1) * row_height + 6
+                body.append(f"BT /F1 {FONT_SIZE - 1} Tf {x} {y} Td (".encode() + _escape(row[column]) + b") Tj ET")
+    return b"\n".join(body)
+
+def scanned_page_image(lines: List[str], dpi: int = 150) -> Image.Image:
+    """Render text lines onto a white page-sized image, as a scanner would produce."""
+    scale = dpi / 72
+    image = Image.new("L", (int(PAGE_WIDTH * scale), int(PAGE_HEIGHT * scale)), 255)
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((MARGIN * scale, (MARGIN + index * LEADING) * scale), line, fill=0)
+    return image
+
+def write_pdf(path: str, pages: List[Tuple[bytes, Optional[Image.Image]]]) -> None:
+    """Write a PDF from page content streams and optional full-page images.
+
+    Args:
+        path: Output path.
+        pages: (content stream, image) per page; the image, if any, is drawn full page under the content.
+    """
+    objects: List[bytes] = []
+
+    def add(data: bytes) -> int:
+        objects.append(data)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = add(b"")
+    page_ids = []
+    for content, image in pages:
+        resources = f"/Font << /F1 {font} 0 R >>".encode()
+        if image is not None:
+            buffer = io.BytesIO()
+            image.convert("L").save(buffer, format="JPEG", quality=80)
+            data = buffer.getvalue()
+            image_id = add(
+                f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>\nstream\n".encode()
+                + data + b"\nendstream"
+            )
+            resources += f" /XObject << /Im1 {image_id} 0 R >>".encode()
+            content = f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im1 Do Q\n".encode() + content
+        content_id = add(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << ".encode() + resources + f" >> /Contents {content_id} 0 R >>".encode()
+        ))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    catalog = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, data in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + data + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as handle:
+        handle.write(output)
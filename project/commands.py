@@ -0,0 +1,245 @@
+from typing import Iterator, List, Optional, Tuple
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import csv
+import itertools
+import os
+import sqlite3
+import time
+import click
+import numpy as np
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+import config
+from db.models import db
+from db.routing import REPLICA_BIND
+from db.database import iter_document_texts, replace_similarity_scores, store_similarity_scores
+from db.import_checkpoints import clear_failed_checkpoints, get_processed_paths, store_import_batch
+from db.transfer import DOC_TYPES, DUMP_FORMATS, detect_dump_format, open_dump, export_documents, iter_dump_records, import_documents
+from profiling import sign_profile_token
+from sharding import serve_shard
+from utils.directory_import import extract_import_file, iter_import_files
+from utils.pdf_extractor import PDF_ENGINES
+from utils.similarity_matrix import tokenize_corpus, compute_similarity_matrix, iter_score_rows
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _tokenize_documents(doc_type: str, workers: int) -> List[Tuple[int, List[str]]]:
+    """Tokenize every job description or CV, streaming texts from the database so only tokens are kept.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        workers: Number of worker processes.
+
+    Returns:
+        List[Tuple[int, List[str]]]: (document ID, tokens) pairs in ID order.
+    """
+    doc_ids: List[int] = []
+
+    def texts() -> Iterator[str]:
+        for doc_id, text in iter_document_texts(doc_type):
+            doc_ids.append(doc_id)
+            yield text
+
+    tokens = list(tokenize_corpus(texts(), workers))
+    return list(zip(doc_ids, tokens))
+
+@click.command("similarity-matrix")
+@click.option("--output", "output_path", default=None, help="CSV file or NPZ directory to write; not used with --format db.")
+@click.option("--format", "output_format", type=click.Choice(["csv", "npz", "db"]), default="csv", show_default=True, help="Output format.")
+@click.option("--top-k", type=int, default=None, help="Keep only the K most similar CVs per job.")
+@click.option("--workers", type=int, default=os.cpu_count() or 1, show_default=True, help="Number of worker processes.")
+@click.option("--chunk-size", type=int, default=None, help="Jobs per chunk; derived from SIMILARITY_MATRIX_CHUNK_CELLS by default.")
+@with_appcontext
+def similarity_matrix_command(output_path: Optional[str], output_format: str, top_k: Optional[int], workers: int, chunk_size: Optional[int]) -> None:
+    """Score every job description against every CV (cosine similarity and Jaccard Index)."""
+    if output_format != "db" and not output_path:
+        raise click.UsageError("--output is required for csv and npz formats")
+
+    started = time.perf_counter()
+    job_tokens = _tokenize_documents("job", workers)
+    cv_tokens = _tokenize_documents("cv", workers)
+
+    if not chunk_size:
+        chunk_size = max(1, config.SIMILARITY_MATRIX_CHUNK_CELLS // max(len(cv_tokens), 1))
+    click.echo(f"Scoring {len(job_tokens)} jobs x {len(cv_tokens)} CVs in chunks of {chunk_size} jobs on {workers} workers")
+
+    results = compute_similarity_matrix(job_tokens, cv_tokens, chunk_size, workers, top_k)
+    written = 0
+    if output_format == "csv":
+        with open(output_path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["job_id", "cv_id", "cosine_similarity", "jaccard_index"])
+            for result in results:
+                for job_id, cv_id, cosine, jaccard in iter_score_rows(result):
+                    writer.writerow([job_id, cv_id, f"{cosine:.6f}", f"{jaccard:.6f}"])
+                    written += 1
+    elif output_format == "npz":
+        os.makedirs(output_path, exist_ok=True)
+        for index, result in enumerate(results):
+            np.savez_compressed(os.path.join(output_path, f"scores_{index:05d}.npz"), **result)
+            written += result["cosine_similarity"].size
+    else:
+        replace_similarity_scores()
+        for result in results:
+            rows = [
+                {"job_id": job_id, "cv_id": cv_id, "cosine_similarity": cosine, "jaccard_index": jaccard}
+                for job_id, cv_id, cosine, jaccard in iter_score_rows(result)
+            ]
+            store_similarity_scores(rows)
+            written += len(rows)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Similarity matrix completed: {written} scores in {elapsed:.1f}s")
+    click.echo(f"Wrote {written} scores in {elapsed:.1f}s")
+
+@click.command("export-data")
+@click.option("--output", "output_path", default="-", show_default=True, help="File to write (.gz to compress), or - for stdout.")
+@click.option("--format", "dump_format", type=click.Choice(DUMP_FORMATS), default=None, help="Dump format; guessed from the file name by default.")
+@click.option("--doc-type", type=click.Choice(["job", "cv", "all"]), default="all", show_default=True, help="Documents to export.")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Rows fetched per query.")
+@with_appcontext
+def export_data_command(output_path: str, dump_format: Optional[str], doc_type: str, batch_size: int) -> None:
+    """Stream job descriptions and CVs to an NDJSON or CSV dump."""
+    started = time.perf_counter()
+    dump_format = dump_format or detect_dump_format(output_path)
+    doc_types = DOC_TYPES if doc_type == "all" else (doc_type,)
+    handle = open_dump(output_path, "w")
+    try:
+        counts = export_documents(handle, dump_format, doc_types, batch_size)
+    finally:
+        if output_path != "-":
+            handle.close()
+    elapsed = time.perf_counter() - started
+    click.echo(f"Exported {', '.join(f'{count} {name}' for name, count in counts.items())} documents in {elapsed:.1f}s", err=True)
+
+@click.command("import-data")
+@click.option("--input", "input_path", default="-", show_default=True, help="File to read (.gz if compressed), or - for stdin.")
+@click.option("--format", "dump_format", type=click.Choice(DUMP_FORMATS), default=None, help="Dump format; guessed from the file name by default.")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Documents per transaction.")
+@click.option("--keep-ids/--new-ids", default=True, show_default=True, help="Reuse the exported IDs, or let the database assign new ones.")
+@with_appcontext
+def import_data_command(input_path: str, dump_format: Optional[str], batch_size: int, keep_ids: bool) -> None:
+    """Stream an NDJSON or CSV dump into the job description and CV tables."""
+    started = time.perf_counter()
+    dump_format = dump_format or detect_dump_format(input_path)
+    handle = open_dump(input_path, "r")
+    try:
+        counts = import_documents(iter_dump_records(handle, dump_format), batch_size, keep_ids)
+    finally:
+        if input_path != "-":
+            handle.close()
+    elapsed = time.perf_counter() - started
+    imported = counts["jobs"] + counts["cvs"]
+    click.echo(
+        f"Imported {counts['jobs']} jobs and {counts['cvs']} CVs in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):.0f} documents/s); "
+        f"{counts['skipped']} skipped, {counts['invalid']} invalid"
+    )
+
+@click.command("import-dir")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option("--workers", type=int, default=os.cpu_count() or 1, show_default=True, help="Number of extraction processes.")
+@click.option("--batch-size", type=int, default=100, show_default=True, help="Files committed per transaction.")
+@click.option("--pdf-engine", type=click.Choice(PDF_ENGINES), default=None, help="PDF engine; PDF_EXTRACTION_ENGINE by default.")
+@click.option("--retry-errors", is_flag=True, help="Process files that failed in earlier runs again.")
+@with_appcontext
+def import_dir_command(directory: str, workers: int, batch_size: int, pdf_engine: Optional[str], retry_errors: bool) -> None:
+    """Import every PDF/DOCX job description and PNG CV under a directory, resuming after interruptions."""
+    source = os.path.abspath(directory)
+    if retry_errors:
+        click.echo(f"Retrying {clear_failed_checkpoints(source)} previously failed files")
+    processed = get_processed_paths(source)
+    if processed:
+        click.echo(f"Resuming: {len(processed)} files already imported from {source}")
+    paths = (path for path in iter_import_files(source) if path not in processed)
+    # Forked workers must not share the parent's open database connections.
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+
+    started = time.perf_counter()
+    totals = Counter()
+    batch = []
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+
+    def submit_more() -> None:
+        # Keep a few files queued per worker so extraction continues while a batch is written.
+        for path in itertools.islice(paths, max(workers * 4 - len(pending), 0)):
+            pending.add(executor.submit(extract_import_file, source, path, pdf_engine))
+
+    try:
+        submit_more()
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            batch.extend(future.result() for future in finished)
+            submit_more()
+            if len(batch) >= batch_size or not pending:
+                totals.update(store_import_batch(source, batch))
+                batch = []
+                elapsed = time.perf_counter() - started
+                click.echo(
+                    f"{sum(totals.values())} files: {totals['stored']} stored, {totals['skipped']} skipped, "
+                    f"{totals['error']} errors ({sum(totals.values()) / elapsed:.1f} files/s)"
+                )
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Directory import of {source} completed: {dict(totals)} in {elapsed:.1f}s")
+    click.echo(f"Imported {sum(totals.values())} files in {elapsed:.1f}s ({sum(totals.values()) / max(elapsed, 1e-9):.1f} files/s); {totals['error']} errors")
+
+@click.command("replica-sync")
+@with_appcontext
+def replica_sync_command() -> None:
+    """Copy the primary SQLite database into the replica file, to try read routing locally."""
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.UsageError("SQLALCHEMY_REPLICA_URI is not set")
+    if db.engine.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+        raise click.UsageError("replica-sync only copies SQLite files; use the database's own replication otherwise")
+    db.session.remove()
+    source = sqlite3.connect(db.engine.url.database)
+    target = sqlite3.connect(replica.url.database)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    replica.dispose()
+    click.echo(f"Copied {db.engine.url.database} to {replica.url.database}")
+
+@click.command("profile-token")
+@click.option("--minutes", type=int, default=15, show_default=True, help="Minutes until the token expires.")
+def profile_token_command(minutes: int) -> None:
+    """Print a signed token that enables profiling of requests and access to /profiles."""
+    if not config.PROFILING_SECRET:
+        raise click.UsageError("PROFILING_SECRET must be set to sign profiling tokens")
+    click.echo(sign_profile_token(int(time.time()) + minutes * 60))
+
+@click.command("serve-shard")
+@click.option("--shard", type=int, required=True, help="Index of the shard to serve, from 0.")
+@click.option("--shards", type=int, required=True, help="Total number of shards.")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on.")
+@click.option("--port", type=int, default=5100, show_default=True, help="TCP port to listen on.")
+@with_appcontext
+def serve_shard_command(shard: int, shards: int, host: str, port: int) -> None:
+    """Serve nearest-neighbour rankings over one shard of the embeddings, for a coordinator with SHARD_URLS."""
+    if shards < 1 or not 0 <= shard < shards:
+        raise click.UsageError("--shard must be between 0 and --shards - 1")
+    serve_shard(current_app._get_current_object(), shard, shards, host, port)
+
+def register_commands(app: Flask) -> None:
+    """Register the batch CLI commands on the Flask application.
+
+    Args:
+        app: Flask application instance.
+    """
+    app.cli.add_command(similarity_matrix_command)
+    app.cli.add_command(export_data_command)
+    app.cli.add_command(import_data_command)
+    app.cli.add_command(import_dir_command)
+    app.cli.add_command(replica_sync_command)
+    app.cli.add_command(profile_token_command)
+    app.cli.add_command(serve_shard_command)
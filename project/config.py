@@ -25,6 +25,82 @@ SKILLS_KEYWORDS: List[str] = os.getenv("SKILLS_KEYWORDS", "").split(",")
 EXPERIENCE_KEYWORDS: List[str] = os.getenv("EXPERIENCE_KEYWORDS", "").split(",")
 JOB_DESCRIPTIONS_TABLE: str = os.getenv("JOB_DESCRIPTIONS_TABLE")  
 CVS_TABLE: str = os.getenv("CVS_TABLE")  
+TEXT_COMPRESSION_LEVEL: int = int(os.getenv("TEXT_COMPRESSION_LEVEL", "6"))
+SCHEMA_MIGRATIONS_TABLE: str = os.getenv("SCHEMA_MIGRATIONS_TABLE", "schema_migrations")
+SIMILARITY_CACHE_TABLE: str = os.getenv("SIMILARITY_CACHE_TABLE", "similarity_cache")
+SIMILARITY_CACHE_SIZE: int = int(os.getenv("SIMILARITY_CACHE_SIZE", "1024"))
+SIMILARITY_CACHE_PERSISTENT: bool = os.getenv("SIMILARITY_CACHE_PERSISTENT", "true").lower() == "true"
+DOCUMENT_FREQUENCIES_TABLE: str = os.getenv("DOCUMENT_FREQUENCIES_TABLE", "document_frequencies")
+CORPUS_STATISTICS_TABLE: str = os.getenv("CORPUS_STATISTICS_TABLE", "corpus_statistics")
+BM25_K1: float = float(os.getenv("BM25_K1", "1.5"))
+BM25_B: float = float(os.getenv("BM25_B", "0.75"))
+MINHASH_SIGNATURES_TABLE: str = os.getenv("MINHASH_SIGNATURES_TABLE", "minhash_signatures")
+LSH_BUCKETS_TABLE: str = os.getenv("LSH_BUCKETS_TABLE", "lsh_buckets")
+MINHASH_NUM_PERM: int = int(os.getenv("MINHASH_NUM_PERM", "128"))
+MINHASH_BANDS: int = int(os.getenv("MINHASH_BANDS", "16"))
+NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+NEAR_DUPLICATE_ACTION: str = os.getenv("NEAR_DUPLICATE_ACTION", "flag").lower()
+KEYWORDS_TABLE: str = os.getenv("KEYWORDS_TABLE", "keywords")
+CV_KEYWORDS_TABLE: str = os.getenv("CV_KEYWORDS_TABLE", "cv_keywords")
+CV_KEYWORD_BITSETS_TABLE: str = os.getenv("CV_KEYWORD_BITSETS_TABLE", "cv_keyword_bitsets")
+SEARCH_INDEX_TABLE: str = os.getenv("SEARCH_INDEX_TABLE", "search_index")
+SEARCH_TEXT_CONFIG: str = os.getenv("SEARCH_TEXT_CONFIG", "simple")
+SIMILARITY_SCORES_TABLE: str = os.getenv("SIMILARITY_SCORES_TABLE", "similarity_scores")
+SIMILARITY_MATRIX_CHUNK_CELLS: int = int(os.getenv("SIMILARITY_MATRIX_CHUNK_CELLS", "20000000"))
+DOCX_EXTRACTION_ENGINE: str = os.getenv("DOCX_EXTRACTION_ENGINE", "streaming").lower()
+PDF_EXTRACTION_ENGINE: str = os.getenv("PDF_EXTRACTION_ENGINE", "auto").lower()
+PDF_LAYOUT_MIN_PATHS: int = int(os.getenv("PDF_LAYOUT_MIN_PATHS", "20"))
+PDF_MIN_TEXT_CHARS: int = int(os.getenv("PDF_MIN_TEXT_CHARS", "16"))
+PDF_OCR_DPI: int = int(os.getenv("PDF_OCR_DPI", "300"))
+UPLOAD_WORKERS: int = int(os.getenv("UPLOAD_WORKERS", "4"))
+TABLE_VERSIONS_TABLE: str = os.getenv("TABLE_VERSIONS_TABLE", "table_versions")
+HTTP_COMPRESSION_MIN_BYTES: int = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024"))
+HTTP_COMPRESSION_LEVEL: int = int(os.getenv("HTTP_COMPRESSION_LEVEL", "6"))
+EMBEDDINGS_TABLE: str = os.getenv("EMBEDDINGS_TABLE", "document_embeddings")
+EMBEDDING_DIM: int = int(os.getenv("EMBEDDING_DIM", "256"))
+EMBEDDING_INDEX_DIR: str = os.getenv("EMBEDDING_INDEX_DIR", "embedding_index")
+EMBEDDING_SYNONYMS_PATH: str = os.getenv("EMBEDDING_SYNONYMS_PATH", "")
+UPLOAD_CONCURRENCY: int = int(os.getenv("UPLOAD_CONCURRENCY", "2"))
+OCR_CONCURRENCY: int = int(os.getenv("OCR_CONCURRENCY", "2"))
+LLM_CONCURRENCY: int = int(os.getenv("LLM_CONCURRENCY", "4"))
+TRANSLATION_CONCURRENCY: int = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "4"))
+ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+OCR_TIMEOUT: float = float(os.getenv("OCR_TIMEOUT", "30"))
+LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+TRANSLATION_TIMEOUT: float = float(os.getenv("TRANSLATION_TIMEOUT", "20"))
+OCR_TARGET_DPI: int = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_PREPROCESSING: str = os.getenv("OCR_PREPROCESSING", "enhance").lower()
+OCR_BINARIZATION: str = os.getenv("OCR_BINARIZATION", "adaptive").lower()
+OCR_MAX_SKEW_DEGREES: float = float(os.getenv("OCR_MAX_SKEW_DEGREES", "10"))
+OCR_PSM: int = int(os.getenv("OCR_PSM", "3"))
+IMPORT_CHECKPOINTS_TABLE: str = os.getenv("IMPORT_CHECKPOINTS_TABLE", "import_checkpoints")
+SQLALCHEMY_REPLICA_URI: str = os.getenv("SQLALCHEMY_REPLICA_URI", "")
+READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+SHARD_URLS: List[str] = [url.strip().rstrip("/") for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()]
+SHARD_TIMEOUT: float = float(os.getenv("SHARD_TIMEOUT", "5"))
+SHARD_CONCURRENCY: int = int(os.getenv("SHARD_CONCURRENCY", "8"))
+GEMINI_API_BASE_URL: str = os.getenv("GEMINI_API_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+TRANSLATION_BASE_URL: str = os.getenv("TRANSLATION_BASE_URL", "https://translate.google.com").rstrip("/")
+ASYNC_LLM_CONCURRENCY: int = int(os.getenv("ASYNC_LLM_CONCURRENCY", "200"))
+ASYNC_TRANSLATION_CONCURRENCY: int = int(os.getenv("ASYNC_TRANSLATION_CONCURRENCY", "200"))
+ASYNC_MAX_CONNECTIONS: int = int(os.getenv("ASYNC_MAX_CONNECTIONS", "200"))
+ASYNC_WSGI_THREADS: int = int(os.getenv("ASYNC_WSGI_THREADS", "8"))
+PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_MODE: str = os.getenv("PROFILING_MODE", "cprofile").lower()
+PROFILING_SAMPLE_INTERVAL: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.005"))
+PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "100"))
+MEMORY_DIAGNOSTICS_ENABLED: bool = os.getenv("MEMORY_DIAGNOSTICS_ENABLED", "false").lower() == "true"
+MEMORY_TRACEMALLOC: bool = os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+MEMORY_TRACEMALLOC_FRAMES: int = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+MEMORY_MAX_SNAPSHOTS: int = int(os.getenv("MEMORY_MAX_SNAPSHOTS", "5"))
+MEMORY_LOG_GROWTH_MB: float = float(os.getenv("MEMORY_LOG_GROWTH_MB", "50"))
+WORKER_MAX_REQUESTS: int = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+WORKER_MAX_REQUESTS_JITTER: int = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "0"))
+WORKER_MAX_RSS_MB: float = float(os.getenv("WORKER_MAX_RSS_MB", "0"))
 
 def ensure_upload_folder() -> None:
     """Ensure the upload folder exists.
@@ -87,5 +163,41 @@ for var_name, var_value in required_vars.items():
         logger.error(f"Required environment variable {var_name} is not defined or empty in .env")
         raise ValueError(f"{var_name} must be defined in the .env file")
 
+if MINHASH_NUM_PERM % MINHASH_BANDS != 0:
+    logger.error("MINHASH_NUM_PERM must be a multiple of MINHASH_BANDS")
+    raise ValueError("MINHASH_NUM_PERM must be a multiple of MINHASH_BANDS in the .env file")
+
+if NEAR_DUPLICATE_ACTION not in ("flag", "skip"):
+    logger.error(f"Invalid NEAR_DUPLICATE_ACTION: {NEAR_DUPLICATE_ACTION}")
+    raise ValueError("NEAR_DUPLICATE_ACTION must be 'flag' or 'skip' in the .env file")
+
+if DOCX_EXTRACTION_ENGINE not in ("streaming", "python-docx"):
+    logger.error(f"Invalid DOCX_EXTRACTION_ENGINE: {DOCX_EXTRACTION_ENGINE}")
+    raise ValueError("DOCX_EXTRACTION_ENGINE must be 'streaming' or 'python-docx' in the .env file")
+
+if PDF_EXTRACTION_ENGINE not in ("fast", "layout", "auto"):
+    logger.error(f"Invalid PDF_EXTRACTION_ENGINE: {PDF_EXTRACTION_ENGINE}")
+    raise ValueError("PDF_EXTRACTION_ENGINE must be 'fast', 'layout' or 'auto' in the .env file")
+
+if OCR_PREPROCESSING not in ("enhance", "normalize"):
+    logger.error(f"Invalid OCR_PREPROCESSING: {OCR_PREPROCESSING}")
+    raise ValueError("OCR_PREPROCESSING must be 'enhance' or 'normalize' in the .env file")
+
+if OCR_BINARIZATION not in ("otsu", "adaptive", "none"):
+    logger.error(f"Invalid OCR_BINARIZATION: {OCR_BINARIZATION}")
+    raise ValueError("OCR_BINARIZATION must be 'otsu', 'adaptive' or 'none' in the .env file")
+
+if not 0 <= OCR_PSM <= 13:
+    logger.error(f"Invalid OCR_PSM: {OCR_PSM}")
+    raise ValueError("OCR_PSM must be a Tesseract page segmentation mode between 0 and 13 in the .env file")
+
+if PROFILING_MODE not in ("cprofile", "sampling"):
+    logger.error(f"Invalid PROFILING_MODE: {PROFILING_MODE}")
+    raise ValueError("PROFILING_MODE must be 'cprofile' or 'sampling' in the .env file")
+
+if not 1 <= MEMORY_TRACEMALLOC_FRAMES <= 100:
+    logger.error(f"Invalid MEMORY_TRACEMALLOC_FRAMES: {MEMORY_TRACEMALLOC_FRAMES}")
+    raise ValueError("MEMORY_TRACEMALLOC_FRAMES must be between 1 and 100 in the .env file")
+
 ensure_upload_folder()
 configure_dependencies()
\ No newline at end of file
@@ -0,0 +1,116 @@
+from typing import Dict, Iterable, List, Union
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from .models import db, JobDescription, CV, DocumentFrequency, CorpusStatistics
+from .dialects import dialect_insert
+from .table_versions import get_table_versions
+
+logger = logging.getLogger(__name__)
+
+CORPUS_STATISTICS_ID = 1
+MAX_TERM_LENGTH = 255
+UPSERT_BATCH_SIZE = 400
+
+def _upsert_increments(model: db.Model, key: str, rows: List[Dict[str, int]], increments: Dict[str, object]) -> None:
+    """Insert rows or add to their counters if the key already exists.
+
+    Args:
+        model: Model to write to.
+        key: Name of the primary key column.
+        rows: Values to insert for new keys.
+        increments: Column name to SQL expression applied on conflict.
+    """
+    insert = dialect_insert()
+    if insert is None:
+        for row in rows:
+            existing = db.session.get(model, row[key])
+            if existing is None:
+                db.session.add(model(**row))
+            else:
+                for column in increments:
+                    setattr(existing, column, getattr(existing, column) + row[column])
+        db.session.flush()
+        return
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        statement = insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+        statement = statement.on_conflict_do_update(index_elements=[key], set_=increments)
+        db.session.execute(statement)
+
+def record_document_terms(tokens: List[str], sign: int = 1) -> None:
+    """Add (or, with sign=-1, remove) one document's terms to the corpus statistics.
+
+    Runs inside the caller's transaction so the statistics commit together with the document.
+
+    Args:
+        tokens: Preprocessed tokens of the document.
+        sign: 1 when a document is added, -1 when it is removed.
+    """
+    terms = sorted({token for token in tokens if len(token) <= MAX_TERM_LENGTH})
+    if terms:
+        _upsert_increments(
+            DocumentFrequency,
+            "term",
+            [{"term": term, "document_frequency": sign} for term in terms],
+            {"document_frequency": DocumentFrequency.document_frequency + sign}
+        )
+    _upsert_increments(
+        CorpusStatistics,
+        "id",
+        [{"id": CORPUS_STATISTICS_ID, "document_count": sign, "total_tokens": sign * len(tokens)}],
+        {
+            "document_count": CorpusStatistics.document_count + sign,
+            "total_tokens": CorpusStatistics.total_tokens + sign * len(tokens)
+        }
+    )
+
+def get_corpus_statistics(terms: Iterable[str]) -> Dict[str, Union[int, float, Dict[str, int]]]:
+    """Retrieve the corpus counters and the document frequencies of the given terms.
+
+    Args:
+        terms: Terms whose document frequencies are needed.
+
+    Returns:
+        Dict[str, Union[int, float, Dict[str, int]]]: document_count, average_document_length and
+        document_frequencies (terms absent from the corpus are omitted).
+    """
+    try:
+        stats = db.session.get(CorpusStatistics, CORPUS_STATISTICS_ID)
+        document_count = stats.document_count if stats else 0
+        total_tokens = stats.total_tokens if stats else 0
+
+        frequencies: Dict[str, int] = {}
+        terms = sorted({term for term in terms if len(term) <= MAX_TERM_LENGTH})
+        for start in range(0, len(terms), UPSERT_BATCH_SIZE):
+            rows = (
+                db.session.query(DocumentFrequency.term, DocumentFrequency.document_frequency)
+                .filter(DocumentFrequency.term.in_(terms[start:start + UPSERT_BATCH_SIZE]))
+                .all()
+            )
+            frequencies.update({row.term: row.document_frequency for row in rows})
+
+        return {
+            "document_count": document_count,
+            "average_document_length": total_tokens / document_count if document_count else 0.0,
+            "document_frequencies": frequencies
+        }
+    except SQLAlchemyError as e:
+        logger.error(f"Error retrieving corpus statistics: {str(e)}")
+        return {"document_count": 0, "average_document_length": 0.0, "document_frequencies": {}}
+
+def get_corpus_version() -> str:
+    """Return a version that changes whenever the corpus statistics do.
+
+    The statistics change with the job description and CV tables, in the same transaction,
+    so their version counters are combined; unlike the document count, they also move when
+    one document replaces another.
+
+    Returns:
+        str: "<job descriptions version>.<CVs version>", "0.0" if the versions are unavailable.
+    """
+    versions = get_table_versions([JobDescription.__tablename__, CV.__tablename__])
+    return f"{versions.get(JobDescription.__tablename__, 0)}.{versions.get(CV.__tablename__, 0)}"
+
+def corpus_statistics_initialized() -> bool:
+    """Check whether the corpus statistics row exists."""
+    return db.session.get(CorpusStatistics, CORPUS_STATISTICS_ID) is not None
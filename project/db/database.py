@@ -1,9 +1,19 @@
+from contextlib import contextmanager
+from datetime import datetime
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from typing import Optional, List, Dict, Union
+from typing import Optional, List, Dict, Union, Iterator, Tuple
 import logging
 from sqlalchemy.exc import SQLAlchemyError
-from .models import db, JobDescription, CV
+from sqlalchemy.orm import undefer
+from .models import db, JobDescription, CV, SimilarityCacheEntry, SimilarityScore
+from .corpus_stats import record_document_terms
+from .near_duplicates import index_signature
+from .keywords import link_cv_keywords
+from .search import index_document_text
+from .embeddings import index_embedding
+from utils.similarity_calculator import preprocess_text
+from utils.minhash import compute_minhash
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,6 +38,64 @@ def initialize_database(app: Flask) -> None:
             logger.error(f"Failed to initialize database: {str(e)}")
             raise
 
+def _index_document(doc_type: str, doc_id: int, filename: str, text: str) -> None:
+    """Update the derived indexes for a newly added document inside the current transaction.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the flushed document.
+        filename: Name of the file the document came from.
+        text: Text content of the document.
+    """
+    tokens = preprocess_text(text)
+    record_document_terms(tokens)
+    index_signature(doc_type, doc_id, compute_minhash(tokens))
+    index_document_text(doc_type, doc_id, filename, text)
+    index_embedding(doc_type, doc_id, tokens)
+
+def add_job_description(filename: str, text: str, job_id: Optional[int] = None) -> Optional[int]:
+    """Add a job description inside a savepoint of the current transaction, without committing.
+
+    A failure rolls back only this job description, so other rows of a batch are kept.
+
+    Args:
+        filename: Name of the file containing the job description.
+        text: Text content of the job description.
+        job_id: Explicit ID to use (e.g. when restoring an export); assigned by the database if None.
+
+    Returns:
+        Optional[int]: ID of the added job description, or None if it could not be added.
+    """
+    try:
+        with db.session.begin_nested():
+            job = JobDescription(id=job_id, filename=filename, text=text)
+            db.session.add(job)
+            db.session.flush()
+            _index_document("job", job.id, filename, text)
+        logger.debug(f"Added job description: {filename} with ID {job.id}")
+        return job.id
+    except SQLAlchemyError as e:
+        logger.error(f"Error adding job description {filename}: {str(e)}")
+        return None
+
+@contextmanager
+def batch_transaction() -> Iterator[None]:
+    """Commit everything added inside the block at once, or roll it all back on error.
+
+    Raises:
+        SQLAlchemyError: If the commit fails.
+    """
+    try:
+        yield
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error committing batch: {str(e)}")
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+
 def store_job_description(filename: str, text: str) -> Optional[int]:
     """Store a job description in the database.
 
@@ -39,16 +107,51 @@ def store_job_description(filename: str, text: str) -> Optional[int]:
         Optional[int]: ID of the stored job description, or None if storage fails.
     """
     try:
-        job = JobDescription(filename=filename, text=text)
-        db.session.add(job)
-        db.session.commit()
-        logger.debug(f"Stored job description: {filename} with ID {job.id}")
-        return job.id
+        with batch_transaction():
+            job_id = add_job_description(filename, text)
+        if job_id is not None:
+            logger.debug(f"Stored job description: {filename} with ID {job_id}")
+        return job_id
     except SQLAlchemyError as e:
-        db.session.rollback()
         logger.error(f"Error storing job description {filename}: {str(e)}")
         return None
 
+def add_cv(filename: str, text: str, qualifications: List[str], skills: List[str], experience: List[str], cv_id: Optional[int] = None) -> Optional[int]:
+    """Add a CV inside a savepoint of the current transaction, without committing.
+
+    A failure rolls back only this CV, so other rows of a batch are kept.
+
+    Args:
+        filename: Name of the file containing the CV.
+        text: Full text content of the CV.
+        qualifications: List of qualifications extracted from the CV.
+        skills: List of skills extracted from the CV.
+        experience: List of experience indicators extracted from the CV.
+        cv_id: Explicit ID to use (e.g. when restoring an export); assigned by the database if None.
+
+    Returns:
+        Optional[int]: ID of the added CV, or None if it could not be added.
+    """
+    try:
+        with db.session.begin_nested():
+            cv = CV(
+                id=cv_id,
+                filename=filename,
+                text=text,
+                qualifications=",".join(qualifications),
+                skills=",".join(skills),
+                experience=",".join(experience)
+            )
+            db.session.add(cv)
+            db.session.flush()
+            _index_document("cv", cv.id, filename, text)
+            link_cv_keywords(cv.id, {"qualifications": qualifications, "skills": skills, "experience": experience})
+        logger.debug(f"Added CV: {filename} with ID {cv.id}")
+        return cv.id
+    except SQLAlchemyError as e:
+        logger.error(f"Error adding CV {filename}: {str(e)}")
+        return None
+
 def store_cv(filename: str, text: str, qualifications: List[str], skills: List[str], experience: List[str]) -> Optional[int]:
     """Store a CV in the database.
 
@@ -63,58 +166,283 @@ def store_cv(filename: str, text: str, qualifications: List[str], skills: List[s
         Optional[int]: ID of the stored CV, or None if storage fails.
     """
     try:
-        cv = CV(
-            filename=filename,
-            text=text,
-            qualifications=",".join(qualifications),
-            skills=",".join(skills),
-            experience=",".join(experience)
-        )
-        db.session.add(cv)
-        db.session.commit()
-        logger.debug(f"Stored CV: {filename} with ID {cv.id}")
-        return cv.id
+        with batch_transaction():
+            cv_id = add_cv(filename, text, qualifications, skills, experience)
+        if cv_id is not None:
+            logger.debug(f"Stored CV: {filename} with ID {cv_id}")
+        return cv_id
     except SQLAlchemyError as e:
-        db.session.rollback()
         logger.error(f"Error storing CV {filename}: {str(e)}")
         return None
 
-def get_all_jobs() -> List[Dict[str, Union[int, str]]]:
+def get_all_jobs(include_text: bool = True) -> List[Dict[str, Union[int, str]]]:
     """Retrieve all job descriptions from the database.
 
+    Args:
+        include_text: Whether to load and return the full text of each job description.
+
     Returns:
         List[Dict[str, Union[int, str]]]: List of dictionaries containing job description details.
     """
     try:
-        jobs = JobDescription.query.all()
-        result = [{"id": job.id, "filename": job.filename, "text": job.text} for job in jobs]
+        query = JobDescription.query.order_by(JobDescription.id)
+        if include_text:
+            jobs = query.options(undefer(JobDescription.text)).all()
+            result = [{"id": job.id, "filename": job.filename, "text": job.text} for job in jobs]
+        else:
+            result = [{"id": job.id, "filename": job.filename} for job in query.all()]
         logger.debug(f"Retrieved {len(result)} job descriptions from database")
         return result
     except SQLAlchemyError as e:
         logger.error(f"Error retrieving job descriptions: {str(e)}")
         return []
 
-def get_all_cvs() -> List[Dict[str, Union[int, str, List[str]]]]:
+def _cv_to_dict(cv: CV, include_text: bool) -> Dict[str, Union[int, str, List[str]]]:
+    """Convert a CV row to its API representation, reading the deferred text only if requested."""
+    result = {"id": cv.id, "filename": cv.filename}
+    if include_text:
+        result["text"] = cv.text
+    result.update({
+        "qualifications": cv.qualifications.split(",") if cv.qualifications else [],
+        "skills": cv.skills.split(",") if cv.skills else [],
+        "experience": cv.experience.split(",") if cv.experience else []
+    })
+    return result
+
+def get_all_cvs(include_text: bool = True) -> List[Dict[str, Union[int, str, List[str]]]]:
     """Retrieve all CVs from the database.
 
+    Args:
+        include_text: Whether to load and return the full text of each CV.
+
     Returns:
         List[Dict[str, Union[int, str, List[str]]]]: List of dictionaries containing CV details.
     """
     try:
-        cvs = CV.query.all()
-        result = [
-            {
-                "id": cv.id,
-                "filename": cv.filename,
-                "text": cv.text,
-                "qualifications": cv.qualifications.split(",") if cv.qualifications else [],
-                "skills": cv.skills.split(",") if cv.skills else [],
-                "experience": cv.experience.split(",") if cv.experience else []
-            }
-            for cv in cvs
-        ]
+        query = CV.query.order_by(CV.id)
+        if include_text:
+            query = query.options(undefer(CV.text))
+        result = [_cv_to_dict(cv, include_text) for cv in query.all()]
         logger.debug(f"Retrieved {len(result)} CVs from database")
         return result
     except SQLAlchemyError as e:
         logger.error(f"Error retrieving CVs: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+def get_job_by_id(job_id: Union[int, str], include_text: bool = True) -> Optional[Dict[str, Union[int, str]]]:
+    """Retrieve a single job description by its ID.
+
+    Args:
+        job_id: ID of the job description.
+        include_text: Whether to load the full text; the content hash is always returned.
+
+    Returns:
+        Optional[Dict[str, Union[int, str]]]: Job description details, or None if not found or retrieval fails.
+    """
+    try:
+        columns = [JobDescription.id, JobDescription.filename, JobDescription.text_hash]
+        if include_text:
+            columns.append(JobDescription.text)
+        row = db.session.query(*columns).filter(JobDescription.id == int(job_id)).first()
+        if row is None:
+            logger.debug(f"No job description found with ID {job_id}")
+            return None
+        return dict(row._mapping)
+    except (SQLAlchemyError, ValueError) as e:
+        logger.error(f"Error retrieving job description {job_id}: {str(e)}")
+        return None
+
+def get_cv_by_id(cv_id: Union[int, str], include_text: bool = True) -> Optional[Dict[str, Union[int, str]]]:
+    """Retrieve a single CV by its ID.
+
+    Args:
+        cv_id: ID of the CV.
+        include_text: Whether to load the full text; the content hash is always returned.
+
+    Returns:
+        Optional[Dict[str, Union[int, str]]]: CV details, or None if not found or retrieval fails.
+    """
+    try:
+        columns = [CV.id, CV.filename, CV.text_hash]
+        if include_text:
+            columns.append(CV.text)
+        row = db.session.query(*columns).filter(CV.id == int(cv_id)).first()
+        if row is None:
+            logger.debug(f"No CV found with ID {cv_id}")
+            return None
+        return dict(row._mapping)
+    except (SQLAlchemyError, ValueError) as e:
+        logger.error(f"Error retrieving CV {cv_id}: {str(e)}")
+        return None
+
+def get_cv_by_filename(filename: str) -> Optional[Dict[str, Union[int, str, List[str]]]]:
+    """Retrieve the most recently stored CV with the given filename.
+
+    Args:
+        filename: Name of the file the CV came from.
+
+    Returns:
+        Optional[Dict[str, Union[int, str, List[str]]]]: CV details including text, or None if not found or retrieval fails.
+    """
+    try:
+        cv = CV.query.options(undefer(CV.text)).filter(CV.filename == filename).order_by(CV.id.desc()).first()
+        if cv is None:
+            logger.debug(f"No CV found with filename {filename}")
+            return None
+        return _cv_to_dict(cv, include_text=True)
+    except SQLAlchemyError as e:
+        logger.error(f"Error retrieving CV {filename}: {str(e)}")
+        return None
+
+def get_similarity_cache_entry(cache_key: str) -> Optional[Dict[str, Union[int, str]]]:
+    """Retrieve a persisted similarity result.
+
+    Args:
+        cache_key: Key of the cached result.
+
+    Returns:
+        Optional[Dict[str, Union[int, str]]]: Cached entry with content hashes and JSON result, or None if absent.
+    """
+    try:
+        entry = db.session.get(SimilarityCacheEntry, cache_key)
+        if entry is None:
+            return None
+        return {"job_hash": entry.job_hash, "cv_hash": entry.cv_hash, "result": entry.result}
+    except SQLAlchemyError as e:
+        logger.error(f"Error retrieving similarity cache entry {cache_key}: {str(e)}")
+        return None
+
+def store_similarity_cache_entry(cache_key: str, job_id: int, cv_id: int, job_hash: str, cv_hash: str, result: str) -> bool:
+    """Insert or replace a persisted similarity result.
+
+    Args:
+        cache_key: Key of the cached result.
+        job_id: ID of the job description.
+        cv_id: ID of the CV.
+        job_hash: Text hash of the job description the result was computed from.
+        cv_hash: Text hash of the CV the result was computed from.
+        result: JSON-encoded similarity metrics.
+
+    Returns:
+        bool: True if the entry was stored, False otherwise.
+    """
+    try:
+        db.session.merge(SimilarityCacheEntry(
+            cache_key=cache_key,
+            job_id=job_id,
+            cv_id=cv_id,
+            job_hash=job_hash,
+            cv_hash=cv_hash,
+            result=result,
+            created_at=datetime.utcnow()
+        ))
+        db.session.commit()
+        logger.debug(f"Stored similarity cache entry {cache_key}")
+        return True
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning(f"Error storing similarity cache entry {cache_key}: {str(e)}")
+        return False
+
+def iter_document_texts(doc_type: str, batch_size: int = 500) -> Iterator[Tuple[int, str]]:
+    """Stream (id, text) pairs of all job descriptions or CVs in ID order.
+
+    Rows are fetched in batches so memory stays bounded regardless of table size.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        batch_size: Number of rows fetched per round trip.
+
+    Yields:
+        Tuple[int, str]: Document ID and text.
+
+    Raises:
+        ValueError: If doc_type is not "job" or "cv".
+    """
+    if doc_type not in ("job", "cv"):
+        raise ValueError(f"Unknown document type: {doc_type}")
+    model = JobDescription if doc_type == "job" else CV
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(model.id, model.text)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        for row in rows:
+            yield row.id, row.text
+        last_id = rows[-1].id
+
+def iter_documents(doc_type: str, batch_size: int = 500) -> Iterator[Dict[str, Union[int, str, List[str]]]]:
+    """Stream every job description or CV, with its text, in ID order.
+
+    Rows are fetched in ID-keyed batches and released after each one, so memory stays
+    bounded regardless of table size.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        batch_size: Number of rows fetched per round trip.
+
+    Yields:
+        Dict[str, Union[int, str, List[str]]]: Document in its /view-data representation.
+
+    Raises:
+        ValueError: If doc_type is not "job" or "cv".
+    """
+    if doc_type not in ("job", "cv"):
+        raise ValueError(f"Unknown document type: {doc_type}")
+    model = JobDescription if doc_type == "job" else CV
+    last_id = 0
+    while True:
+        rows = (
+            model.query.options(undefer(model.text))
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        for row in rows:
+            if doc_type == "job":
+                yield {"id": row.id, "filename": row.filename, "text": row.text}
+            else:
+                yield _cv_to_dict(row, include_text=True)
+        last_id = rows[-1].id
+        db.session.expunge_all()
+
+def replace_similarity_scores() -> None:
+    """Delete all precomputed similarity scores ahead of a new batch run."""
+    try:
+        SimilarityScore.query.delete()
+        db.session.commit()
+        logger.info("Cleared precomputed similarity scores")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error clearing similarity scores: {str(e)}")
+        raise
+
+def store_similarity_scores(rows: List[Dict[str, Union[int, float]]]) -> None:
+    """Bulk insert a chunk of precomputed similarity scores in one transaction.
+
+    Args:
+        rows: Dictionaries with job_id, cv_id, cosine_similarity and jaccard_index.
+    """
+    if not rows:
+        return
+    try:
+        now = datetime.utcnow()
+        db.session.execute(
+            SimilarityScore.__table__.insert(),
+            [dict(row, computed_at=now) for row in rows]
+        )
+        db.session.commit()
+        logger.debug(f"Stored {len(rows)} similarity scores")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error storing similarity scores: {str(e)}")
+        raise
@@ -0,0 +1,33 @@
+from typing import Callable, Optional
+from sqlalchemy import text
+from .models import db
+
+def dialect_insert() -> Optional[Callable]:
+    """Return the dialect-specific insert construct supporting ON CONFLICT, or None.
+
+    Returns:
+        Optional[Callable]: PostgreSQL or SQLite insert() with on_conflict_* support, None for other dialects.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def sync_id_sequence(table_name: str) -> None:
+    """Move a table's ID sequence past its largest ID after rows were inserted with explicit IDs.
+
+    Only PostgreSQL needs this; SQLite derives new IDs from the current maximum.
+
+    Args:
+        table_name: Table with a serial "id" primary key.
+    """
+    if db.session.get_bind().dialect.name != "postgresql":
+        return
+    db.session.execute(
+        text(f"SELECT setval(pg_get_serial_sequence(:table_name, 'id'), COALESCE((SELECT MAX(id) FROM {table_name}), 0) + 1, false)"),
+        {"table_name": table_name}
+    )
@@ -0,0 +1,395 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import json
+import logging
+import os
+import threading
+import numpy as np
+from sqlalchemy import and_, func, or_, true
+from sqlalchemy.exc import SQLAlchemyError
+import config
+from .models import db, JobDescription, CV, DocumentEmbedding, SchemaMigration
+from .table_versions import get_table_versions
+from .routing import primary_reads
+from utils.embeddings import EMBEDDING_DTYPE, embed_tokens, embedding_to_bytes, embedding_from_bytes
+from utils.shard_client import search_shards
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MODELS = {"job": JobDescription, "cv": CV}
+SYNC_BATCH_SIZE = 1000
+ID_DTYPE = np.dtype("<i8")
+VECTOR_BYTES = config.EMBEDDING_DIM * EMBEDDING_DTYPE.itemsize
+# Recorded once per database by the migrations; its timestamp identifies the database an index was built from.
+DATABASE_EPOCH_MIGRATION = "database_epoch"
+
+def index_embedding(doc_type: str, doc_id: int, tokens: List[str]) -> None:
+    """Store a document's embedding inside the current transaction.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+        tokens: Preprocessed tokens of the document.
+    """
+    DocumentEmbedding.query.filter_by(doc_type=doc_type, doc_id=doc_id).delete()
+    db.session.add(DocumentEmbedding(doc_type=doc_type, doc_id=doc_id, vector=embedding_to_bytes(embed_tokens(tokens))))
+
+def get_document_embedding(doc_type: str, doc_id: int) -> Optional[np.ndarray]:
+    """Load the stored embedding of a document.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+
+    Returns:
+        Optional[np.ndarray]: The embedding, or None if the document has no current embedding.
+    """
+    try:
+        vector = (
+            db.session.query(DocumentEmbedding.vector)
+            .filter_by(doc_type=doc_type, doc_id=doc_id)
+            .scalar()
+        )
+        if vector is None or len(vector) != VECTOR_BYTES:
+            return None
+        return embedding_from_bytes(vector)
+    except SQLAlchemyError as e:
+        logger.error(f"Error loading embedding of {doc_type} {doc_id}: {str(e)}")
+        return None
+
+def get_unembedded_document_ids(doc_type: str) -> List[int]:
+    """List IDs of documents without an embedding of the configured dimension.
+
+    Args:
+        doc_type: Either "job" or "cv".
+
+    Returns:
+        List[int]: IDs of documents to (re-)embed.
+    """
+    model = DOCUMENT_MODELS[doc_type]
+    rows = (
+        db.session.query(model.id)
+        .outerjoin(DocumentEmbedding, and_(DocumentEmbedding.doc_type == doc_type, DocumentEmbedding.doc_id == model.id))
+        .filter(or_(DocumentEmbedding.id.is_(None), func.length(DocumentEmbedding.vector) != VECTOR_BYTES))
+        .order_by(model.id)
+        .all()
+    )
+    return [row.id for row in rows]
+
+def get_database_epoch() -> str:
+    """Return the identity of the database, which changes when it is recreated from scratch.
+
+    Returns:
+        str: Time the database_epoch migration was recorded, empty if it has not run yet.
+    """
+    migration = db.session.get(SchemaMigration, DATABASE_EPOCH_MIGRATION)
+    return migration.applied_at.isoformat() if migration is not None else ""
+
+class EmbeddingIndex:
+    """Memory-mapped float32 matrix of one document type's embeddings.
+
+    The database is the source of truth; the matrix is a derived, append-only copy under
+    EMBEDDING_INDEX_DIR that every worker process maps read-only and extends with the
+    embedding rows committed since its last record. A vectors file holds one row per record
+    and an IDs file holds the (embedding ID, document ID) pair of each row. When a document
+    is re-embedded its newest row wins.
+
+    Files are never truncated below what a reader may have mapped, which would kill it with
+    SIGBUS. A rebuild, needed when the index is ahead of the database or was built from
+    another database (its epoch differs), writes a new generation of files and switches the
+    `.meta` manifest to it atomically; processes remap when they see the new generation,
+    and searches already running finish on the old, unlinked files. Deleting the files
+    rebuilds the index on next use.
+
+    A shard index (shard i of n) holds only the documents whose ID modulo n is i, in files
+    of its own, so several shard workers can share EMBEDDING_INDEX_DIR.
+    """
+
+    def __init__(self, doc_type: str, shard: Optional[Tuple[int, int]] = None) -> None:
+        base = os.path.join(config.EMBEDDING_INDEX_DIR, f"{doc_type}-{config.EMBEDDING_DIM}")
+        if shard is not None:
+            base = f"{base}-shard{shard[0]}of{shard[1]}"
+        self.doc_type = doc_type
+        self.shard = shard
+        self._in_shard = (DocumentEmbedding.doc_id % shard[1] == shard[0]) if shard is not None else true()
+        self.table_name = DOCUMENT_MODELS[doc_type].__tablename__
+        self.base = base
+        self.meta_path = f"{base}.meta"
+        self.lock_path = f"{base}.lock"
+        self.generation = 0
+        self.vectors_path, self.ids_path = self._generation_paths(0)
+        self._lock = threading.Lock()
+        self._synced_version: Optional[int] = None
+        self._count = -1
+        self._vectors = np.zeros((0, config.EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+        self._ids = np.zeros((0, 2), dtype=ID_DTYPE)
+        self._live = np.zeros(0, dtype=bool)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Serialize index updates across worker processes (a no-op where flock is unavailable)."""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _generation_paths(self, generation: int) -> Tuple[str, str]:
+        """Vectors and IDs file paths of one generation of the index."""
+        return f"{self.base}.g{generation}.f32", f"{self.base}.g{generation}.ids"
+
+    def _read_meta(self) -> Optional[Dict[str, Union[int, str]]]:
+        """Read the manifest naming the current generation and the database it was built from."""
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _use_generation(self, generation: int) -> None:
+        """Point this index at a generation's files, dropping the mapping of another one."""
+        if generation != self.generation:
+            self.generation = generation
+            self.vectors_path, self.ids_path = self._generation_paths(generation)
+            self._count = -1
+
+    def _rebuild(self, epoch: str, previous: Optional[int]) -> None:
+        """Write a new generation from the database, publish it and unlink the previous one.
+
+        Args:
+            epoch: Epoch of the database the index is built from.
+            previous: Generation being replaced, None if there is no manifest yet.
+        """
+        old_paths = self._generation_paths(previous) if previous is not None else (f"{self.base}.f32", f"{self.base}.ids")
+        generation = (previous or 0) + 1
+        new_paths = self._generation_paths(generation)
+        for path in new_paths:
+            open(path, "wb").close()
+        self._use_generation(generation)
+        appended = sum(self._append(rows) for rows in self._fetch_rows(true()))
+        temporary_path = f"{self.meta_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"generation": generation, "epoch": epoch}, f)
+        os.replace(temporary_path, self.meta_path)
+        for path in old_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.info(f"Rebuilt embedding index {self.vectors_path} with {appended} records")
+
+    def _record_count(self) -> int:
+        """Number of complete records; a torn append leaves the two files out of step."""
+        sizes = [
+            os.path.getsize(path) // itemsize if os.path.exists(path) else 0
+            for path, itemsize in ((self.vectors_path, VECTOR_BYTES), (self.ids_path, 2 * ID_DTYPE.itemsize))
+        ]
+        return min(sizes)
+
+    def _truncate(self, count: int) -> None:
+        """Cut both files to the given number of records.
+
+        Only used to drop the tail of a torn append, past every record a reader may have mapped.
+        """
+        for path, itemsize in ((self.vectors_path, VECTOR_BYTES), (self.ids_path, 2 * ID_DTYPE.itemsize)):
+            with open(path, "ab") as f:
+                f.truncate(count * itemsize)
+
+    def _append(self, rows: List[Tuple[int, int, bytes]]) -> int:
+        """Append (embedding ID, document ID, vector) rows and return how many were written."""
+        rows = [row for row in rows if len(row[2]) == VECTOR_BYTES]
+        if not rows:
+            return 0
+        with open(self.vectors_path, "ab") as f:
+            f.write(b"".join(vector for _, _, vector in rows))
+        with open(self.ids_path, "ab") as f:
+            f.write(np.array([(seq, doc_id) for seq, doc_id, _ in rows], dtype=ID_DTYPE).tobytes())
+        return len(rows)
+
+    def _map(self) -> None:
+        """(Re)map the files if records were added since they were last mapped."""
+        count = self._record_count()
+        if count == self._count:
+            return
+        if count == 0:
+            self._vectors = np.zeros((0, config.EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+            self._ids = np.zeros((0, 2), dtype=ID_DTYPE)
+            self._live = np.zeros(0, dtype=bool)
+        else:
+            self._vectors = np.memmap(self.vectors_path, dtype=EMBEDDING_DTYPE, mode="r", shape=(count, config.EMBEDDING_DIM))
+            self._ids = np.array(np.memmap(self.ids_path, dtype=ID_DTYPE, mode="r", shape=(count, 2)))
+            # Keep only the newest record (highest embedding ID) of each document.
+            order = np.lexsort((self._ids[:, 0], self._ids[:, 1]))
+            doc_ids = self._ids[order, 1]
+            self._live = np.zeros(count, dtype=bool)
+            self._live[order[np.append(doc_ids[1:] != doc_ids[:-1], True)]] = True
+        self._count = count
+
+    def _fetch_rows(self, criterion) -> Iterator[List[Tuple[int, int, bytes]]]:
+        """Yield batches of embedding rows of this document type matching a criterion, in ID order."""
+        last_id = 0
+        while True:
+            rows = (
+                db.session.query(DocumentEmbedding.id, DocumentEmbedding.doc_id, DocumentEmbedding.vector)
+                .filter(DocumentEmbedding.doc_type == self.doc_type, self._in_shard, DocumentEmbedding.id > last_id, criterion)
+                .order_by(DocumentEmbedding.id)
+                .limit(SYNC_BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                return
+            yield [(row.id, row.doc_id, row.vector) for row in rows]
+            last_id = rows[-1].id
+
+    def sync(self) -> None:
+        """Bring the files up to date with the committed embeddings and map them.
+
+        Skipped while the document table's version counter and the index generation are
+        unchanged, so searches between writes cost no database round trip beyond the version
+        lookup. Always reads the primary: a lagging replica would make the index look
+        ahead of the database and rebuild it back and forth.
+        """
+        with primary_reads():
+            version = get_table_versions([self.table_name]).get(self.table_name)
+            meta = self._read_meta()
+            if version is not None and version == self._synced_version and meta is not None and meta.get("generation") == self.generation:
+                return
+            os.makedirs(config.EMBEDDING_INDEX_DIR, exist_ok=True)
+            with self._lock, self._file_lock():
+                meta = self._read_meta()
+                epoch = get_database_epoch()
+                if meta is None or meta.get("epoch") != epoch:
+                    if meta is not None:
+                        logger.warning(f"Embedding index {self.meta_path} was built from another database; rebuilding it")
+                    self._rebuild(epoch, meta["generation"] if meta is not None else None)
+                    meta = self._read_meta()
+                self._use_generation(meta["generation"])
+                self._truncate(self._record_count())
+                self._map()
+                last_seq = int(self._ids[:, 0].max()) if self._count else 0
+
+                max_id, total = (
+                    db.session.query(func.max(DocumentEmbedding.id), func.count(DocumentEmbedding.id))
+                    .filter(DocumentEmbedding.doc_type == self.doc_type, self._in_shard)
+                    .one()
+                )
+                if (max_id or 0) < last_seq:
+                    logger.warning(f"Embedding index {self.vectors_path} is ahead of the database; rebuilding it")
+                    self._rebuild(epoch, self.generation)
+                    self._map()
+                    last_seq = int(self._ids[:, 0].max()) if self._count else 0
+
+                appended = sum(self._append(rows) for rows in self._fetch_rows(DocumentEmbedding.id > last_seq))
+                self._map()
+                if total > int(self._live.sum()):
+                    # A transaction that committed after a later one left a gap behind the watermark.
+                    present = set(self._ids[:, 0].tolist())
+                    missing = [
+                        row.id for row in
+                        db.session.query(DocumentEmbedding.id).filter(DocumentEmbedding.doc_type == self.doc_type, self._in_shard).all()
+                        if row.id not in present
+                    ]
+                    for start in range(0, len(missing), SYNC_BATCH_SIZE):
+                        for rows in self._fetch_rows(DocumentEmbedding.id.in_(missing[start:start + SYNC_BATCH_SIZE])):
+                            appended += self._append(rows)
+                    self._map()
+                if appended:
+                    logger.info(f"Appended {appended} embeddings to {self.vectors_path} ({self._count} records)")
+                self._synced_version = version
+
+    def search(self, query: np.ndarray, k: int, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Exact top-k cosine search over the mapped matrix.
+
+        Args:
+            query: L2-normalized query embedding.
+            k: Number of neighbours to return.
+            exclude_id: Document ID to leave out, e.g. the query document itself.
+
+        Returns:
+            List[Tuple[int, float]]: (document ID, cosine similarity) pairs, most similar first.
+        """
+        # The arrays are read outside the lock: a rebuild replaces them instead of shrinking
+        # their files, so a mapping taken here stays valid until the search finishes.
+        with self._lock:
+            vectors, ids, live = self._vectors, self._ids, self._live
+        if not len(vectors) or k <= 0:
+            return []
+        scores = np.asarray(vectors @ np.asarray(query, dtype=EMBEDDING_DTYPE))
+        scores[~live] = -np.inf
+        if exclude_id is not None:
+            scores[ids[:, 1] == exclude_id] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[row, 1]), float(scores[row])) for row in top if np.isfinite(scores[row])]
+
+    def live_count(self) -> int:
+        """Number of documents in the mapped matrix."""
+        with self._lock:
+            return int(self._live.sum())
+
+_indexes: Dict[Tuple[str, Optional[Tuple[int, int]]], EmbeddingIndex] = {}
+
+def get_embedding_index(doc_type: str, shard: Optional[Tuple[int, int]] = None) -> EmbeddingIndex:
+    """Return the process-wide embedding index of a document type, or of one shard of it."""
+    if (doc_type, shard) not in _indexes:
+        _indexes[(doc_type, shard)] = EmbeddingIndex(doc_type, shard)
+    return _indexes[(doc_type, shard)]
+
+def nearest_documents(query: np.ndarray, doc_types: List[str], k: int = 10, exclude: Optional[Tuple[str, int]] = None) -> List[Dict[str, Union[int, str, float]]]:
+    """Find the stored documents whose embeddings are closest to a query embedding.
+
+    With SHARD_URLS set the ranking is scattered to the shard workers and their partial
+    top-k lists are merged; otherwise this process searches its own memory-mapped matrix.
+
+    Args:
+        query: L2-normalized query embedding.
+        doc_types: Document types to search, "job" and/or "cv".
+        k: Number of results.
+        exclude: (doc_type, doc_id) of a document to leave out, e.g. the query document.
+
+    Returns:
+        List[Dict[str, Union[int, str, float]]]: Results with doc_type, id, filename and score, most similar first.
+
+    Raises:
+        ShardError: If a shard worker fails, rather than returning an incomplete ranking.
+    """
+    try:
+        hits = []
+        for doc_type in doc_types:
+            exclude_id = exclude[1] if exclude and exclude[0] == doc_type else None
+            if config.SHARD_URLS:
+                doc_hits = search_shards(query, doc_type, k, exclude_id)
+            else:
+                index = get_embedding_index(doc_type)
+                index.sync()
+                doc_hits = index.search(query, k, exclude_id)
+            hits.extend((score, doc_type, doc_id) for doc_id, score in doc_hits)
+        hits.sort(key=lambda hit: -hit[0])
+        hits = hits[:k]
+
+        filenames: Dict[Tuple[str, int], str] = {}
+        for doc_type in doc_types:
+            model = DOCUMENT_MODELS[doc_type]
+            doc_ids = [doc_id for _, hit_type, doc_id in hits if hit_type == doc_type]
+            if doc_ids:
+                rows = db.session.query(model.id, model.filename).filter(model.id.in_(doc_ids)).all()
+                filenames.update({(doc_type, row.id): row.filename for row in rows})
+        # Documents deleted since they were embedded have no filename and are dropped.
+        return [
+            {"doc_type": doc_type, "id": doc_id, "filename": filenames[(doc_type, doc_id)], "score": round(score, 6)}
+            for score, doc_type, doc_id in hits
+            if (doc_type, doc_id) in filenames
+        ]
+    except (SQLAlchemyError, OSError) as e:
+        db.session.rollback()
+        logger.error(f"Error searching nearest documents: {str(e)}")
+        return []
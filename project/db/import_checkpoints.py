@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Set, Union
+from collections import Counter
+from datetime import datetime
+import logging
+import config
+from .models import db, ImportCheckpoint
+from .database import add_job_description, add_cv, batch_transaction
+from .near_duplicates import find_near_duplicates_for_text
+
+logger = logging.getLogger(__name__)
+
+def get_processed_paths(source: str) -> Set[str]:
+    """Return the relative paths already committed by earlier imports of a directory.
+
+    Args:
+        source: Absolute path of the imported directory.
+
+    Returns:
+        Set[str]: Paths with a checkpoint, whatever their status.
+    """
+    rows = db.session.query(ImportCheckpoint.path).filter(ImportCheckpoint.source == source)
+    return {row.path for row in rows}
+
+def clear_failed_checkpoints(source: str) -> int:
+    """Forget the failed files of a directory so the next import retries them.
+
+    Args:
+        source: Absolute path of the imported directory.
+
+    Returns:
+        int: Number of checkpoints removed.
+    """
+    with batch_transaction():
+        removed = (
+            ImportCheckpoint.query
+            .filter(ImportCheckpoint.source == source, ImportCheckpoint.status == "error")
+            .delete(synchronize_session=False)
+        )
+    return removed
+
+def _store_result(result: Dict[str, Union[str, Dict[str, List[str]], None]]) -> ImportCheckpoint:
+    """Store one extracted file, mirroring the upload routes, and describe the outcome."""
+    path, doc_type, text = result["path"], result["doc_type"], result["text"]
+    checkpoint = ImportCheckpoint(path=path, doc_type=doc_type, status="error", error=result["error"])
+    if result["error"] or not text:
+        return checkpoint
+    duplicates = find_near_duplicates_for_text(doc_type, text, config.NEAR_DUPLICATE_THRESHOLD)
+    if duplicates:
+        logger.warning(f"Imported file {path} is a near-duplicate of {doc_type} IDs {[d['id'] for d in duplicates]}")
+    if duplicates and config.NEAR_DUPLICATE_ACTION == "skip":
+        logger.info(f"Skipped imported file {path}, a near-duplicate of {doc_type} ID {duplicates[0]['id']}")
+        checkpoint.status, checkpoint.doc_id = "skipped", duplicates[0]["id"]
+        return checkpoint
+    if doc_type == "job":
+        doc_id = add_job_description(path, text)
+    else:
+        parsed = result["parsed"] or {}
+        doc_id = add_cv(path, text, parsed.get("qualifications", []), parsed.get("skills", []), parsed.get("experience", []))
+    if doc_id is None:
+        checkpoint.error = f"Error storing {path}"
+    else:
+        checkpoint.status, checkpoint.doc_id = "stored", doc_id
+    return checkpoint
+
+def store_import_batch(source: str, results: Iterable[Dict[str, Union[str, Dict[str, List[str]], None]]]) -> Counter:
+    """Store a batch of extracted files and their checkpoints in one transaction.
+
+    Each document goes through its own savepoint, so one failure marks only that file as
+    an error; documents and checkpoints are committed together, so a crash never leaves a
+    stored document without its checkpoint or the reverse.
+
+    Args:
+        source: Absolute path of the imported directory.
+        results: Results of utils.directory_import.extract_import_file.
+
+    Returns:
+        Counter: Number of files per status.
+    """
+    statuses = Counter()
+    now = datetime.utcnow()
+    with batch_transaction():
+        for result in results:
+            checkpoint = _store_result(result)
+            checkpoint.source = source
+            checkpoint.processed_at = now
+            db.session.add(checkpoint)
+            statuses[checkpoint.status] += 1
+    db.session.expunge_all()
+    return statuses
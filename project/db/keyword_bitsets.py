@@ -0,0 +1,170 @@
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+import threading
+import numpy as np
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+import config
+from .models import db, CV, Keyword, CVKeyword, CVKeywordBitset
+from .keywords import _get_cv_keywords
+from .table_versions import get_table_versions
+from utils.bitsets import BITSET_DTYPE, WORD_BITS, pack_bits, popcount
+
+logger = logging.getLogger(__name__)
+
+MATCH_SORT_KEYS = ("jaccard", "coverage")
+
+def get_cvs_without_bitset() -> List[int]:
+    """List IDs of CVs with keyword associations but no bitset yet.
+
+    Returns:
+        List[int]: IDs of CVs to backfill.
+    """
+    rows = (
+        db.session.query(CVKeyword.cv_id)
+        .outerjoin(CVKeywordBitset, CVKeywordBitset.cv_id == CVKeyword.cv_id)
+        .filter(CVKeywordBitset.cv_id.is_(None))
+        .distinct()
+        .order_by(CVKeyword.cv_id)
+        .all()
+    )
+    return [row.cv_id for row in rows]
+
+def index_cv_keyword_bitsets(cv_ids: List[int]) -> None:
+    """Build the keyword bitsets of CVs from their keyword associations inside the current transaction.
+
+    Args:
+        cv_ids: IDs of the CVs.
+    """
+    keyword_ids: Dict[int, List[int]] = {cv_id: [] for cv_id in cv_ids}
+    for row in db.session.query(CVKeyword.cv_id, CVKeyword.keyword_id).filter(CVKeyword.cv_id.in_(cv_ids)):
+        keyword_ids[row.cv_id].append(row.keyword_id)
+    for cv_id, ids in keyword_ids.items():
+        db.session.merge(CVKeywordBitset(cv_id=cv_id, bits=pack_bits(ids).tobytes()))
+
+class KeywordBitsetMatrix:
+    """All CV keyword bitsets as one uint64 matrix, reloaded when the CV table changes.
+
+    Rows are ordered by CV ID; the per-row popcounts are kept alongside so a match needs
+    one AND and one popcount over the matrix.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.cv_ids = np.empty(0, dtype=np.int64)
+        self.bits = np.zeros((0, 0), dtype=BITSET_DTYPE)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def refresh(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reload the matrix if the CV table version changed.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: CV IDs, bitset matrix and per-CV keyword counts.
+        """
+        version = get_table_versions([config.CVS_TABLE]).get(config.CVS_TABLE)
+        with self._lock:
+            if version is None or version != self.version:
+                rows = db.session.query(CVKeywordBitset.cv_id, CVKeywordBitset.bits).order_by(CVKeywordBitset.cv_id).all()
+                width = max((len(row.bits) for row in rows), default=0) // BITSET_DTYPE.itemsize
+                bits = np.zeros((len(rows), width), dtype=BITSET_DTYPE)
+                for index, row in enumerate(rows):
+                    bits[index, :len(row.bits) // BITSET_DTYPE.itemsize] = np.frombuffer(row.bits, dtype=BITSET_DTYPE)
+                self.cv_ids = np.fromiter((row.cv_id for row in rows), dtype=np.int64, count=len(rows))
+                self.bits = bits
+                self.counts = popcount(bits) if width else np.zeros(len(rows), dtype=np.int64)
+                self.version = version
+                logger.info(f"Loaded keyword bitsets of {len(rows)} CVs ({width * WORD_BITS} bits each)")
+            return self.cv_ids, self.bits, self.counts
+
+_matrix = KeywordBitsetMatrix()
+
+def _resolve_keyword_ids(criteria: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    """Map (category, term) pairs to keyword IDs; terms no CV has are absent."""
+    if not criteria:
+        return {}
+    rows = db.session.query(Keyword.id, Keyword.category, Keyword.term).filter(tuple_(Keyword.category, Keyword.term).in_(criteria)).all()
+    return {(row.category, row.term): row.id for row in rows}
+
+def match_cvs_by_keyword_bitsets(
+    required: Dict[str, List[str]],
+    must_have: Optional[Dict[str, List[str]]] = None,
+    min_coverage: float = 0.0,
+    sort: str = "jaccard",
+    limit: int = 50,
+    offset: int = 0
+) -> Dict[str, Union[int, List[Dict[str, Union[int, str, float, List[str]]]]]]:
+    """Score every CV against a set of required keywords with vectorized popcounts.
+
+    Jaccard is |required ∩ CV| / |required ∪ CV| and coverage is |required ∩ CV| / |required|,
+    both over the keywords of all categories. Must-have keywords count as required and a CV
+    lacking any of them is excluded.
+
+    Args:
+        required: Normalized required keywords per category.
+        must_have: Normalized keywords per category every returned CV must have.
+        min_coverage: Minimum coverage of a returned CV, between 0 and 1.
+        sort: "jaccard" or "coverage"; ties are broken by the other score, then by CV ID.
+        limit: Maximum number of CVs returned.
+        offset: Number of ranked CVs to skip.
+
+    Returns:
+        Dict[str, Union[int, List[...]]]: total number of matching CVs and the requested page,
+        each with id, filename, jaccard, coverage, matched keyword count and keywords per category.
+
+    Raises:
+        ValueError: If sort is unknown or no keyword is given.
+    """
+    if sort not in MATCH_SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(MATCH_SORT_KEYS)}")
+    must_criteria = sorted({(category, term) for category, terms in (must_have or {}).items() for term in terms})
+    criteria = sorted({(category, term) for category, terms in required.items() for term in terms} | set(must_criteria))
+    if not criteria:
+        raise ValueError("At least one qualification, skill or experience keyword is required")
+
+    try:
+        keyword_ids = _resolve_keyword_ids(criteria)
+        if any(criterion not in keyword_ids for criterion in must_criteria):
+            logger.debug(f"No CV has all must-have keywords {must_criteria}")
+            return {"total": 0, "cvs": []}
+        cv_ids, bits, counts = _matrix.refresh()
+        if not len(cv_ids):
+            return {"total": 0, "cvs": []}
+
+        width = bits.shape[1]
+        # Keywords no CV has (unknown, or newer than every stored bitset) still count towards |required|.
+        required_count = len(criteria)
+        job_bits = pack_bits(keyword_ids.values(), width)
+        must_bits = pack_bits((keyword_ids[criterion] for criterion in must_criteria), width)
+
+        overlap = popcount(bits & job_bits)
+        union = counts + required_count - overlap
+        jaccard = overlap / np.maximum(union, 1)
+        coverage = overlap / required_count
+        selected = coverage >= min_coverage
+        if must_criteria:
+            selected &= ((bits & must_bits) == must_bits).all(axis=1)
+        indices = np.flatnonzero(selected)
+        primary, secondary = (jaccard, coverage) if sort == "jaccard" else (coverage, jaccard)
+        order = indices[np.lexsort((cv_ids[indices], -secondary[indices], -primary[indices]))]
+        page = order[offset:offset + limit]
+
+        page_ids = [int(cv_id) for cv_id in cv_ids[page]]
+        filenames = dict(db.session.query(CV.id, CV.filename).filter(CV.id.in_(page_ids)).all()) if page_ids else {}
+        keywords = _get_cv_keywords(page_ids)
+        cvs = [
+            {
+                "id": cv_id,
+                "filename": filenames.get(cv_id),
+                "jaccard": round(float(jaccard[index]), 6),
+                "coverage": round(float(coverage[index]), 6),
+                "matched_keywords": int(overlap[index]),
+                **keywords[cv_id]
+            }
+            for cv_id, index in zip(page_ids, page)
+        ]
+        logger.debug(f"Matched {len(indices)} of {len(cv_ids)} CVs against {len(criteria)} keywords")
+        return {"total": int(len(indices)), "cvs": cvs}
+    except SQLAlchemyError as e:
+        logger.error(f"Error matching CVs by keyword bitsets: {str(e)}")
+        return {"total": 0, "cvs": []}
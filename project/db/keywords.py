@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional, Union
+import logging
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from .models import db, CV, Keyword, CVKeyword, CVKeywordBitset
+from .dialects import dialect_insert
+from utils.bitsets import pack_bits
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_CATEGORIES = ("qualifications", "skills", "experience")
+MAX_KEYWORD_LENGTH = 255
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """Lower-case, strip and de-duplicate keywords, dropping empty ones.
+
+    Args:
+        keywords: Raw keywords.
+
+    Returns:
+        List[str]: Normalized keywords in first-seen order.
+    """
+    seen: Dict[str, None] = {}
+    for keyword in keywords:
+        term = keyword.strip().lower()
+        if term and len(term) <= MAX_KEYWORD_LENGTH:
+            seen.setdefault(term, None)
+    return list(seen)
+
+def get_or_create_keyword_ids(category: str, terms: List[str]) -> Dict[str, int]:
+    """Resolve keyword IDs for a category, inserting missing keywords inside the current transaction.
+
+    Args:
+        category: One of KEYWORD_CATEGORIES.
+        terms: Normalized keywords.
+
+    Returns:
+        Dict[str, int]: Keyword ID per term.
+    """
+    if not terms:
+        return {}
+    insert = dialect_insert()
+    if insert is not None:
+        db.session.execute(
+            insert(Keyword)
+            .values([{"category": category, "term": term} for term in terms])
+            .on_conflict_do_nothing(index_elements=["category", "term"])
+        )
+    else:
+        existing = {row.term for row in db.session.query(Keyword.term).filter(Keyword.category == category, Keyword.term.in_(terms))}
+        db.session.add_all(Keyword(category=category, term=term) for term in terms if term not in existing)
+        db.session.flush()
+    rows = db.session.query(Keyword.id, Keyword.term).filter(Keyword.category == category, Keyword.term.in_(terms)).all()
+    return {row.term: row.id for row in rows}
+
+def link_cv_keywords(cv_id: int, keywords: Dict[str, List[str]]) -> None:
+    """Associate a CV with its keywords and store its keyword bitset inside the current transaction.
+
+    Args:
+        cv_id: ID of the CV.
+        keywords: Raw keywords per category (see KEYWORD_CATEGORIES).
+    """
+    keyword_ids = set()
+    for category in KEYWORD_CATEGORIES:
+        keyword_ids.update(get_or_create_keyword_ids(category, normalize_keywords(keywords.get(category, []))).values())
+    CVKeyword.query.filter_by(cv_id=cv_id).delete()
+    db.session.add_all(CVKeyword(cv_id=cv_id, keyword_id=keyword_id) for keyword_id in sorted(keyword_ids))
+    # Keyword IDs double as bit positions of the CV's packed keyword set.
+    db.session.merge(CVKeywordBitset(cv_id=cv_id, bits=pack_bits(keyword_ids).tobytes()))
+
+def _get_cv_keywords(cv_ids: List[int]) -> Dict[int, Dict[str, List[str]]]:
+    """Load the keywords of the given CVs grouped by category."""
+    result = {cv_id: {category: [] for category in KEYWORD_CATEGORIES} for cv_id in cv_ids}
+    if not cv_ids:
+        return result
+    rows = (
+        db.session.query(CVKeyword.cv_id, Keyword.category, Keyword.term)
+        .join(Keyword, Keyword.id == CVKeyword.keyword_id)
+        .filter(CVKeyword.cv_id.in_(cv_ids))
+        .order_by(Keyword.term)
+        .all()
+    )
+    for row in rows:
+        result[row.cv_id][row.category].append(row.term)
+    return result
+
+def find_cvs_by_keywords(
+    qualifications: Optional[List[str]] = None,
+    skills: Optional[List[str]] = None,
+    experience: Optional[List[str]] = None,
+    match: str = "all",
+    limit: int = 50,
+    offset: int = 0
+) -> Dict[str, Union[int, List[Dict[str, Union[int, str, Dict[str, List[str]]]]]]]:
+    """Find CVs having any or all of the requested keywords, filtered and ranked in SQL.
+
+    Args:
+        qualifications: Required qualifications.
+        skills: Required skills.
+        experience: Required experience indicators.
+        match: "all" to require every keyword, "any" to require at least one.
+        limit: Maximum number of CVs returned.
+        offset: Number of matching CVs to skip.
+
+    Returns:
+        Dict[str, Union[int, List[...]]]: total number of matches and the requested page of CVs,
+        each with id, filename, matched keyword count and keywords per category.
+
+    Raises:
+        ValueError: If match is neither "all" nor "any", or no keyword is given.
+    """
+    if match not in ("all", "any"):
+        raise ValueError("match must be 'all' or 'any'")
+    criteria = [
+        (category, term)
+        for category, terms in (("qualifications", qualifications), ("skills", skills), ("experience", experience))
+        for term in normalize_keywords(terms or [])
+    ]
+    if not criteria:
+        raise ValueError("At least one qualification, skill or experience keyword is required")
+
+    try:
+        keyword_ids = [
+            row.id for row in
+            db.session.query(Keyword.id).filter(tuple_(Keyword.category, Keyword.term).in_(criteria)).all()
+        ]
+        if not keyword_ids or (match == "all" and len(keyword_ids) < len(criteria)):
+            logger.debug(f"No CVs can match keywords {criteria}")
+            return {"total": 0, "cvs": []}
+
+        matched = func.count(CVKeyword.keyword_id).label("matched")
+        matches = (
+            db.session.query(CVKeyword.cv_id.label("cv_id"), matched)
+            .filter(CVKeyword.keyword_id.in_(keyword_ids))
+            .group_by(CVKeyword.cv_id)
+        )
+        if match == "all":
+            matches = matches.having(func.count(CVKeyword.keyword_id) == len(keyword_ids))
+        matches = matches.subquery()
+
+        total = db.session.query(func.count()).select_from(matches).scalar()
+        rows = (
+            db.session.query(CV.id, CV.filename, matches.c.matched)
+            .join(matches, matches.c.cv_id == CV.id)
+            .order_by(matches.c.matched.desc(), CV.id)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+        keywords = _get_cv_keywords([row.id for row in rows])
+        cvs = [
+            {"id": row.id, "filename": row.filename, "matched_keywords": row.matched, **keywords[row.id]}
+            for row in rows
+        ]
+        logger.debug(f"Found {total} CVs matching {match} of {criteria}")
+        return {"total": total, "cvs": cvs}
+    except SQLAlchemyError as e:
+        logger.error(f"Error filtering CVs by keywords: {str(e)}")
+        return {"total": 0, "cvs": []}
+
+def get_unlinked_cv_ids() -> List[int]:
+    """List IDs of CVs with comma-joined keywords but no keyword associations.
+
+    Returns:
+        List[int]: IDs of CVs still to migrate.
+    """
+    rows = (
+        db.session.query(CV.id)
+        .outerjoin(CVKeyword, CVKeyword.cv_id == CV.id)
+        .filter(CVKeyword.cv_id.is_(None))
+        .filter(or_(CV.qualifications != "", CV.skills != "", CV.experience != ""))
+        .order_by(CV.id)
+        .all()
+    )
+    return [row.id for row in rows]
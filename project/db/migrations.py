@@ -0,0 +1,330 @@
+from datetime import datetime
+from typing import List
+import logging
+import zlib
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import undefer
+import config
+from .models import db, JobDescription, CV, SchemaMigration, MinHashSignature, LSHBucket, ImportCheckpoint, compute_text_hash
+from .corpus_stats import record_document_terms, corpus_statistics_initialized
+from .database import iter_document_texts
+from .near_duplicates import DOCUMENT_MODELS, index_signature, get_unsigned_document_ids
+from .keywords import link_cv_keywords, get_unlinked_cv_ids
+from .keyword_bitsets import index_cv_keyword_bitsets, get_cvs_without_bitset
+from .search import ensure_search_index
+from .embeddings import DATABASE_EPOCH_MIGRATION, index_embedding, get_unembedded_document_ids
+from .table_versions import bump_table_versions
+from utils.similarity_calculator import preprocess_text
+from utils.minhash import compute_minhash, empty_signature, signature_to_bytes
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+def _existing_columns(table_name: str) -> List[str]:
+    """List the column names currently present on a table.
+
+    Args:
+        table_name: Name of the database table.
+
+    Returns:
+        List[str]: Column names of the table.
+    """
+    return [column["name"] for column in inspect(db.engine).get_columns(table_name)]
+
+def add_missing_column(table_name: str, column_name: str, column_ddl: str) -> bool:
+    """Add a column to an existing table if it is not there yet.
+
+    db.create_all() only creates missing tables, so new columns on existing
+    tables are added here.
+
+    Args:
+        table_name: Name of the database table.
+        column_name: Name of the column to add.
+        column_ddl: SQL type (and constraints) of the new column.
+
+    Returns:
+        bool: True if the column was added, False if it already existed.
+    """
+    if column_name in _existing_columns(table_name):
+        return False
+    db.session.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_ddl}"))
+    db.session.commit()
+    logger.info(f"Added column {column_name} to table {table_name}")
+    return True
+
+def backfill_text_hashes() -> int:
+    """Compute text hashes for rows stored before hashes were tracked.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    updated = 0
+    for model in (JobDescription, CV):
+        while True:
+            rows = model.query.options(undefer(model.text)).filter(model.text_hash.is_(None)).limit(BACKFILL_BATCH_SIZE).all()
+            if not rows:
+                break
+            for row in rows:
+                row.text_hash = compute_text_hash(row.text)
+            db.session.commit()
+            updated += len(rows)
+    if updated:
+        logger.info(f"Backfilled text hashes for {updated} rows")
+    return updated
+
+def _migration_applied(name: str) -> bool:
+    """Check whether a one-off migration has already completed."""
+    return db.session.get(SchemaMigration, name) is not None
+
+def _mark_migration_applied(name: str) -> None:
+    """Record a one-off migration as completed."""
+    db.session.add(SchemaMigration(name=name, applied_at=datetime.utcnow()))
+    db.session.commit()
+    logger.info(f"Applied migration {name}")
+
+def record_database_epoch() -> None:
+    """Record when this database was created, once.
+
+    Derived files such as the embedding index store the epoch and rebuild when it changes,
+    e.g. after the application is pointed at a fresh or restored database.
+    """
+    if not _migration_applied(DATABASE_EPOCH_MIGRATION):
+        _mark_migration_applied(DATABASE_EPOCH_MIGRATION)
+
+def _is_compressed(value: object) -> bool:
+    """Check whether a stored text value is already zlib-compressed."""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return False
+    try:
+        zlib.decompress(bytes(value))
+        return True
+    except zlib.error:
+        return False
+
+def compress_document_texts() -> int:
+    """Compress the text of job descriptions and CVs stored before compression was enabled.
+
+    On PostgreSQL the text columns are first converted to BYTEA in place. Rows are then
+    read raw (bypassing CompressedText) and rewritten compressed in batches, so the
+    migration can be interrupted and resumed. Runs once per database.
+
+    Returns:
+        int: Number of rows compressed.
+    """
+    name = "compress_document_texts"
+    if _migration_applied(name):
+        return 0
+    compressed = 0
+    dialect = db.session.get_bind().dialect.name
+    for model in (JobDescription, CV):
+        table = model.__tablename__
+        if dialect == "postgresql":
+            data_type = db.session.execute(
+                text("SELECT data_type FROM information_schema.columns WHERE table_name = :table AND column_name = 'text'"),
+                {"table": table}
+            ).scalar()
+            if data_type == "text":
+                db.session.execute(text(f"ALTER TABLE {table} ALTER COLUMN text TYPE BYTEA USING convert_to(text, 'UTF8')"))
+                db.session.commit()
+                logger.info(f"Converted {table}.text to BYTEA")
+
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                text(f"SELECT id, text FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+            ).all()
+            if not rows:
+                break
+            updates = [
+                {
+                    "id": row.id,
+                    "text": zlib.compress(
+                        row.text.encode("utf-8") if isinstance(row.text, str) else bytes(row.text),
+                        config.TEXT_COMPRESSION_LEVEL
+                    )
+                }
+                for row in rows if not _is_compressed(row.text)
+            ]
+            if updates:
+                db.session.execute(text(f"UPDATE {table} SET text = :text WHERE id = :id"), updates)
+            db.session.commit()
+            compressed += len(updates)
+            last_id = rows[-1].id
+    _mark_migration_applied(name)
+    if compressed:
+        logger.info(f"Compressed the text of {compressed} documents")
+    return compressed
+
+def backfill_corpus_statistics() -> int:
+    """Build document frequencies for documents stored before they were tracked.
+
+    Runs once, when the corpus statistics row does not exist yet, in a single transaction.
+
+    Returns:
+        int: Number of documents indexed.
+    """
+    if corpus_statistics_initialized():
+        return 0
+    indexed = 0
+    for doc_type in ("job", "cv"):
+        for _, document_text in iter_document_texts(doc_type):
+            record_document_terms(preprocess_text(document_text))
+            indexed += 1
+    if indexed:
+        db.session.commit()
+        logger.info(f"Backfilled document frequencies for {indexed} documents")
+    return indexed
+
+def backfill_minhash_signatures() -> int:
+    """Compute MinHash signatures and LSH buckets for documents stored without them.
+
+    Returns:
+        int: Number of documents indexed.
+    """
+    indexed = 0
+    for doc_type, model in DOCUMENT_MODELS.items():
+        doc_ids = get_unsigned_document_ids(doc_type)
+        for start in range(0, len(doc_ids), BACKFILL_BATCH_SIZE):
+            rows = db.session.query(model.id, model.text).filter(model.id.in_(doc_ids[start:start + BACKFILL_BATCH_SIZE])).all()
+            for row in rows:
+                index_signature(doc_type, row.id, compute_minhash(preprocess_text(row.text)))
+            db.session.commit()
+            indexed += len(rows)
+    if indexed:
+        logger.info(f"Backfilled MinHash signatures for {indexed} documents")
+    return indexed
+
+def unindex_empty_minhash_signatures() -> int:
+    """Take documents without shingles out of the LSH buckets.
+
+    They used to share one all-MAX_HASH signature and therefore every bucket, which made
+    them exact duplicates of each other. Runs once per database.
+
+    Returns:
+        int: Number of documents taken out.
+    """
+    name = "unindex_empty_minhash_signatures"
+    if _migration_applied(name):
+        return 0
+    rows = db.session.query(MinHashSignature.doc_type, MinHashSignature.doc_id).filter(
+        MinHashSignature.signature == signature_to_bytes(empty_signature())
+    ).all()
+    for row in rows:
+        LSHBucket.query.filter_by(doc_type=row.doc_type, doc_id=row.doc_id).delete()
+        db.session.query(MinHashSignature).filter_by(doc_type=row.doc_type, doc_id=row.doc_id).update({"signature": b""})
+    _mark_migration_applied(name)
+    if rows:
+        logger.info(f"Removed {len(rows)} documents without shingles from the near-duplicate index")
+    return len(rows)
+
+def rename_merged_import_checkpoints() -> int:
+    """Rename the "merged" status of directory import checkpoints to "skipped".
+
+    NEAR_DUPLICATE_ACTION=merge never merged anything, so it was renamed to skip. Runs once
+    per database.
+
+    Returns:
+        int: Number of checkpoints renamed.
+    """
+    name = "rename_merged_import_checkpoints"
+    if _migration_applied(name):
+        return 0
+    renamed = ImportCheckpoint.query.filter(ImportCheckpoint.status == "merged").update({"status": "skipped"}, synchronize_session=False)
+    _mark_migration_applied(name)
+    return renamed
+
+def backfill_embeddings() -> int:
+    """Embed documents stored without an embedding, or with one of another EMBEDDING_DIM.
+
+    Returns:
+        int: Number of documents embedded.
+    """
+    embedded = 0
+    for doc_type, model in DOCUMENT_MODELS.items():
+        doc_ids = get_unembedded_document_ids(doc_type)
+        for start in range(0, len(doc_ids), BACKFILL_BATCH_SIZE):
+            rows = db.session.query(model.id, model.text).filter(model.id.in_(doc_ids[start:start + BACKFILL_BATCH_SIZE])).all()
+            for row in rows:
+                index_embedding(doc_type, row.id, preprocess_text(row.text))
+            db.session.commit()
+            embedded += len(rows)
+    if embedded:
+        logger.info(f"Backfilled embeddings for {embedded} documents")
+    return embedded
+
+def backfill_cv_keywords() -> int:
+    """Move comma-joined CV keywords into the normalized keyword tables.
+
+    The comma-joined columns are kept for backwards compatibility.
+
+    Returns:
+        int: Number of CVs migrated.
+    """
+    migrated = 0
+    cv_ids = get_unlinked_cv_ids()
+    for start in range(0, len(cv_ids), BACKFILL_BATCH_SIZE):
+        rows = (
+            db.session.query(CV.id, CV.qualifications, CV.skills, CV.experience)
+            .filter(CV.id.in_(cv_ids[start:start + BACKFILL_BATCH_SIZE]))
+            .all()
+        )
+        for row in rows:
+            link_cv_keywords(row.id, {
+                "qualifications": row.qualifications.split(","),
+                "skills": row.skills.split(","),
+                "experience": row.experience.split(",")
+            })
+        db.session.commit()
+        migrated += len(rows)
+    if migrated:
+        logger.info(f"Migrated keywords of {migrated} CVs to normalized tables")
+    return migrated
+
+def backfill_cv_keyword_bitsets() -> int:
+    """Pack the keywords of CVs linked before keyword bitsets existed.
+
+    Returns:
+        int: Number of CVs indexed.
+    """
+    cv_ids = get_cvs_without_bitset()
+    for start in range(0, len(cv_ids), BACKFILL_BATCH_SIZE):
+        index_cv_keyword_bitsets(cv_ids[start:start + BACKFILL_BATCH_SIZE])
+        db.session.commit()
+    if cv_ids:
+        logger.info(f"Backfilled keyword bitsets for {len(cv_ids)} CVs")
+    return len(cv_ids)
+
+def run_migrations() -> None:
+    """Apply in-place schema upgrades that db.create_all() cannot perform.
+
+    Every step is idempotent, so this runs on each application start.
+
+    Raises:
+        SQLAlchemyError: If a migration step fails.
+    """
+    try:
+        record_database_epoch()
+        for model in (JobDescription, CV):
+            add_missing_column(model.__tablename__, "text_hash", "VARCHAR(64)")
+        compress_document_texts()
+        backfill_text_hashes()
+        backfill_corpus_statistics()
+        unindex_empty_minhash_signatures()
+        rename_merged_import_checkpoints()
+        backfill_minhash_signatures()
+        backfill_embeddings()
+        backfill_cv_keywords()
+        backfill_cv_keyword_bitsets()
+        ensure_search_index()
+        # Rows may have been loaded or rewritten outside the ORM, and response formats may
+        # have changed with the deployment, so HTTP validators issued before start are dropped.
+        bump_table_versions(db.session, [model.__tablename__ for model in (JobDescription, CV)])
+        db.session.commit()
+        logger.info("Database migrations applied successfully")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to apply database migrations: {str(e)}")
+        raise
@@ -1,7 +1,49 @@
+from datetime import datetime
+from typing import Optional, Union
+import hashlib
+import zlib
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import deferred
+from sqlalchemy.types import TypeDecorator, LargeBinary
 import config
+from .routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+class CompressedText(TypeDecorator):
+    """Text column stored zlib-compressed as binary and decompressed transparently on load.
+
+    Values written before compression was enabled (plain text, or raw UTF-8 bytes after a
+    column type change) are still returned as text.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: object) -> Optional[bytes]:
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), config.TEXT_COMPRESSION_LEVEL)
+
+    def process_result_value(self, value: Optional[Union[bytes, str]], dialect: object) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        data = bytes(value)
+        try:
+            return zlib.decompress(data).decode("utf-8")
+        except zlib.error:
+            return data.decode("utf-8")
+
+def compute_text_hash(text: str) -> str:
+    """Compute the content hash used to version a stored text.
+
+    Args:
+        text: Text content to hash.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest of the text.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
 
 class JobDescription(db.Model):
     """Database model representing job descriptions.
@@ -9,12 +51,14 @@ class JobDescription(db.Model):
     Attributes:
         id: Unique identifier for the job description.
         filename: Name of the file from which the job description was extracted.
-        text: Full text content of the job description.
+        text: Full text content of the job description, compressed at rest and loaded on first access.
+        text_hash: SHA-256 of the text, kept in sync whenever the text is assigned.
     """
     __tablename__ = config.JOB_DESCRIPTIONS_TABLE
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False, unique=True)
-    text = db.Column(db.Text, nullable=False)
+    text = deferred(db.Column(CompressedText, nullable=False))
+    text_hash = db.Column(db.String(64), nullable=True)
 
 class CV(db.Model):
     """Database model representing CVs.
@@ -22,7 +66,8 @@ class CV(db.Model):
     Attributes:
         id: Unique identifier for the CV.
         filename: Name of the file from which the CV was extracted.
-        text: Full text content of the CV.
+        text: Full text content of the CV, compressed at rest and loaded on first access.
+        text_hash: SHA-256 of the text, kept in sync whenever the text is assigned.
         qualifications: Comma-separated list of qualifications.
         skills: Comma-separated list of skills.
         experience: Comma-separated list of experience indicators.
@@ -30,7 +75,217 @@ class CV(db.Model):
     __tablename__ = config.CVS_TABLE
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False, unique=True)
-    text = db.Column(db.Text, nullable=False)
+    text = deferred(db.Column(CompressedText, nullable=False))
+    text_hash = db.Column(db.String(64), nullable=True)
     qualifications = db.Column(db.Text, nullable=False)
     skills = db.Column(db.Text, nullable=False)
-    experience = db.Column(db.Text, nullable=False)
\ No newline at end of file
+    experience = db.Column(db.Text, nullable=False)
+
+class SimilarityCacheEntry(db.Model):
+    """Database model representing a persisted similarity result.
+
+    Attributes:
+        cache_key: SHA-256 of (job_id, cv_id, metric set, algorithm version).
+        job_id: ID of the job description the result was computed for.
+        cv_id: ID of the CV the result was computed for.
+        job_hash: Text hash of the job description at computation time.
+        cv_hash: Text hash of the CV at computation time.
+        result: JSON-encoded similarity metrics.
+        created_at: Time the result was computed.
+    """
+    __tablename__ = config.SIMILARITY_CACHE_TABLE
+    cache_key = db.Column(db.String(64), primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False, index=True)
+    cv_id = db.Column(db.Integer, nullable=False, index=True)
+    job_hash = db.Column(db.String(64), nullable=False)
+    cv_hash = db.Column(db.String(64), nullable=False)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class SimilarityScore(db.Model):
+    """Database model representing a precomputed job/CV similarity score.
+
+    Attributes:
+        job_id: ID of the job description.
+        cv_id: ID of the CV.
+        cosine_similarity: Cosine similarity of the term-count vectors.
+        jaccard_index: Jaccard Index of the term sets.
+        computed_at: Time the batch run computed the score.
+    """
+    __tablename__ = config.SIMILARITY_SCORES_TABLE
+    job_id = db.Column(db.Integer, primary_key=True)
+    cv_id = db.Column(db.Integer, primary_key=True)
+    cosine_similarity = db.Column(db.Float, nullable=False)
+    jaccard_index = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class DocumentFrequency(db.Model):
+    """Database model representing the number of stored documents containing a term.
+
+    Attributes:
+        term: Preprocessed term.
+        document_frequency: Number of job descriptions and CVs containing the term.
+    """
+    __tablename__ = config.DOCUMENT_FREQUENCIES_TABLE
+    term = db.Column(db.String(255), primary_key=True)
+    document_frequency = db.Column(db.Integer, nullable=False, default=0)
+
+class CorpusStatistics(db.Model):
+    """Database model representing corpus-wide counters used by TF-IDF and BM25.
+
+    Attributes:
+        id: Always 1; the table holds a single row.
+        document_count: Number of job descriptions and CVs indexed.
+        total_tokens: Total number of preprocessed tokens across those documents.
+    """
+    __tablename__ = config.CORPUS_STATISTICS_TABLE
+    id = db.Column(db.Integer, primary_key=True)
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+    total_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+
+class MinHashSignature(db.Model):
+    """Database model representing the MinHash signature of a stored document.
+
+    Attributes:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+        signature: Little-endian uint64 MinHash signature.
+    """
+    __tablename__ = config.MINHASH_SIGNATURES_TABLE
+    doc_type = db.Column(db.String(8), primary_key=True)
+    doc_id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+class LSHBucket(db.Model):
+    """Database model representing one LSH band bucket a document falls into.
+
+    Attributes:
+        doc_type: Either "job" or "cv".
+        band: Index of the signature band.
+        bucket: Hash of the band's signature values.
+        doc_id: ID of the job description or CV.
+    """
+    __tablename__ = config.LSH_BUCKETS_TABLE
+    doc_type = db.Column(db.String(8), primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True)
+    doc_id = db.Column(db.Integer, primary_key=True)
+    __table_args__ = (db.Index(f"ix_{config.LSH_BUCKETS_TABLE}_doc", "doc_type", "doc_id"),)
+
+class Keyword(db.Model):
+    """Database model representing a normalized CV keyword.
+
+    Attributes:
+        id: Unique identifier for the keyword.
+        category: One of "qualifications", "skills" or "experience".
+        term: Lower-cased keyword.
+    """
+    __tablename__ = config.KEYWORDS_TABLE
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(32), nullable=False)
+    term = db.Column(db.String(255), nullable=False)
+    __table_args__ = (db.UniqueConstraint("category", "term", name=f"uq_{config.KEYWORDS_TABLE}_category_term"),)
+
+class CVKeyword(db.Model):
+    """Database model associating CVs with their normalized keywords.
+
+    Attributes:
+        cv_id: ID of the CV.
+        keyword_id: ID of the keyword.
+    """
+    __tablename__ = config.CV_KEYWORDS_TABLE
+    cv_id = db.Column(db.Integer, db.ForeignKey(f"{config.CVS_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey(f"{config.KEYWORDS_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    __table_args__ = (db.Index(f"ix_{config.CV_KEYWORDS_TABLE}_keyword_cv", "keyword_id", "cv_id"),)
+
+class CVKeywordBitset(db.Model):
+    """Database model holding a CV's keywords as a packed bitset.
+
+    Bit i is set when the CV has the keyword with ID i, across all categories.
+
+    Attributes:
+        cv_id: ID of the CV.
+        bits: Little-endian uint64 words, as long as the CV's highest keyword ID needs.
+    """
+    __tablename__ = config.CV_KEYWORD_BITSETS_TABLE
+    cv_id = db.Column(db.Integer, db.ForeignKey(f"{config.CVS_TABLE}.id", ondelete="CASCADE"), primary_key=True)
+    bits = db.Column(db.LargeBinary, nullable=False)
+
+class DocumentEmbedding(db.Model):
+    """Database model representing the embedding of a stored document.
+
+    Rows are append-only: re-embedding a document replaces its row with a new ID, so the
+    on-disk nearest-neighbour index can catch up by reading rows with a greater ID.
+
+    Attributes:
+        id: Monotonic sequence number of the embedding.
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+        vector: Little-endian float32 embedding.
+    """
+    __tablename__ = config.EMBEDDINGS_TABLE
+    id = db.Column(db.Integer, primary_key=True)
+    doc_type = db.Column(db.String(8), nullable=False)
+    doc_id = db.Column(db.Integer, nullable=False)
+    vector = db.Column(db.LargeBinary, nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("doc_type", "doc_id", name=f"uq_{config.EMBEDDINGS_TABLE}_doc"),
+        db.Index(f"ix_{config.EMBEDDINGS_TABLE}_type_id", "doc_type", "id"),
+        # IDs must never be reused, or the index would skip a re-embedded last row.
+        {"sqlite_autoincrement": True}
+    )
+
+class ImportCheckpoint(db.Model):
+    """Database model recording each file processed by a directory import.
+
+    Written in the same transaction as the documents it describes, so an interrupted import
+    resumes exactly after the last committed batch.
+
+    Attributes:
+        id: Unique identifier for the checkpoint.
+        source: Absolute path of the imported directory.
+        path: Path of the file relative to the source directory.
+        status: "stored", "skipped" (a near-duplicate) or "error".
+        doc_type: "job" or "cv"; None if the file could not be classified.
+        doc_id: ID of the stored document, or of the document a skipped file duplicates.
+        error: Error message for failed files.
+        processed_at: Time the file's batch was committed.
+    """
+    __tablename__ = config.IMPORT_CHECKPOINTS_TABLE
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(1024), nullable=False)
+    path = db.Column(db.String(1024), nullable=False)
+    status = db.Column(db.String(16), nullable=False)
+    doc_type = db.Column(db.String(8), nullable=True)
+    doc_id = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    processed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    __table_args__ = (db.UniqueConstraint("source", "path", name=f"uq_{config.IMPORT_CHECKPOINTS_TABLE}_source_path"),)
+
+class SchemaMigration(db.Model):
+    """Database model recording one-off data migrations that have completed.
+
+    Attributes:
+        name: Name of the migration.
+        applied_at: Time the migration completed.
+    """
+    __tablename__ = config.SCHEMA_MIGRATIONS_TABLE
+    name = db.Column(db.String(128), primary_key=True)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class TableVersion(db.Model):
+    """Database model counting committed changes per table, used to validate HTTP caches.
+
+    Attributes:
+        table_name: Name of the tracked table.
+        version: Incremented in the same transaction as every change to the table.
+    """
+    __tablename__ = config.TABLE_VERSIONS_TABLE
+    table_name = db.Column(db.String(128), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+@event.listens_for(JobDescription.text, "set")
+@event.listens_for(CV.text, "set")
+def _sync_text_hash(target: db.Model, value: str, oldvalue: object, initiator: object) -> None:
+    """Refresh the text hash whenever a document's text is assigned."""
+    target.text_hash = compute_text_hash(value)
@@ -0,0 +1,193 @@
+from typing import Dict, List, Optional, Union
+import logging
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import SQLAlchemyError
+from .models import db, JobDescription, CV, MinHashSignature, LSHBucket
+from utils.minhash import compute_minhash, band_hashes, estimate_jaccard, signature_to_bytes, signature_from_bytes
+from utils.similarity_calculator import preprocess_text
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MODELS = {"job": JobDescription, "cv": CV}
+
+def index_signature(doc_type: str, doc_id: int, signature: Optional[np.ndarray]) -> None:
+    """Store a document's MinHash signature and LSH buckets inside the current transaction.
+
+    A document without shingles is stored with an empty signature and no buckets, so it is
+    never a near-duplicate candidate and is not picked up again by the backfill.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+        signature: MinHash signature of the document, None if it has no shingles.
+    """
+    LSHBucket.query.filter_by(doc_type=doc_type, doc_id=doc_id).delete()
+    db.session.merge(MinHashSignature(doc_type=doc_type, doc_id=doc_id, signature=signature_to_bytes(signature) if signature is not None else b""))
+    if signature is None:
+        return
+    db.session.add_all(
+        LSHBucket(doc_type=doc_type, band=band, bucket=bucket, doc_id=doc_id)
+        for band, bucket in enumerate(band_hashes(signature))
+    )
+
+def _load_signatures(doc_type: str, doc_ids: List[int]) -> Dict[int, np.ndarray]:
+    """Load the stored signatures of the given documents."""
+    signatures: Dict[int, np.ndarray] = {}
+    for start in range(0, len(doc_ids), 500):
+        rows = (
+            db.session.query(MinHashSignature.doc_id, MinHashSignature.signature)
+            .filter(MinHashSignature.doc_type == doc_type, MinHashSignature.doc_id.in_(doc_ids[start:start + 500]))
+            .all()
+        )
+        signatures.update({row.doc_id: signature_from_bytes(row.signature) for row in rows})
+    return signatures
+
+def _load_filenames(doc_type: str, doc_ids: List[int]) -> Dict[int, str]:
+    """Load the filenames of the given documents."""
+    model = DOCUMENT_MODELS[doc_type]
+    filenames: Dict[int, str] = {}
+    for start in range(0, len(doc_ids), 500):
+        rows = db.session.query(model.id, model.filename).filter(model.id.in_(doc_ids[start:start + 500])).all()
+        filenames.update({row.id: row.filename for row in rows})
+    return filenames
+
+def find_near_duplicates(doc_type: str, signature: np.ndarray, threshold: float, exclude_id: Optional[int] = None) -> List[Dict[str, Union[int, str, float]]]:
+    """Find stored documents whose estimated Jaccard similarity reaches the threshold.
+
+    Candidates come from the LSH buckets shared with the signature, so only a handful of
+    stored signatures are compared instead of the whole corpus.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        signature: MinHash signature of the document to check.
+        threshold: Minimum estimated Jaccard similarity.
+        exclude_id: Document ID to leave out, e.g. the document itself.
+
+    Returns:
+        List[Dict[str, Union[int, str, float]]]: Matches with id, filename and similarity, most similar first.
+    """
+    try:
+        buckets = band_hashes(signature)
+        candidate_ids = [
+            row.doc_id for row in
+            db.session.query(LSHBucket.doc_id)
+            .filter(
+                LSHBucket.doc_type == doc_type,
+                or_(*(and_(LSHBucket.band == band, LSHBucket.bucket == bucket) for band, bucket in enumerate(buckets)))
+            )
+            .distinct()
+            .all()
+            if row.doc_id != exclude_id
+        ]
+        if not candidate_ids:
+            return []
+
+        signatures = _load_signatures(doc_type, candidate_ids)
+        matches = [
+            (doc_id, estimate_jaccard(signature, candidate))
+            for doc_id, candidate in signatures.items()
+        ]
+        matches = sorted((m for m in matches if m[1] >= threshold), key=lambda m: m[1], reverse=True)
+        filenames = _load_filenames(doc_type, [doc_id for doc_id, _ in matches])
+        result = [
+            {"id": doc_id, "filename": filenames.get(doc_id), "similarity": similarity}
+            for doc_id, similarity in matches
+        ]
+        logger.debug(f"Found {len(result)} near-duplicate {doc_type} documents among {len(candidate_ids)} candidates")
+        return result
+    except SQLAlchemyError as e:
+        logger.error(f"Error finding near-duplicate {doc_type} documents: {str(e)}")
+        return []
+
+def find_near_duplicates_for_text(doc_type: str, text: str, threshold: float) -> List[Dict[str, Union[int, str, float]]]:
+    """Find stored documents that are near-duplicates of a not yet stored text.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        text: Text content of the incoming document.
+        threshold: Minimum estimated Jaccard similarity.
+
+    Returns:
+        List[Dict[str, Union[int, str, float]]]: Matches with id, filename and similarity, most similar first.
+    """
+    signature = compute_minhash(preprocess_text(text))
+    if signature is None:
+        return []
+    return find_near_duplicates(doc_type, signature, threshold)
+
+def find_duplicate_pairs(doc_type: str, threshold: float) -> List[Dict[str, Union[int, str, float]]]:
+    """List all pairs of stored documents whose estimated Jaccard similarity reaches the threshold.
+
+    Candidate pairs are produced in SQL from documents sharing at least one LSH bucket.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        threshold: Minimum estimated Jaccard similarity.
+
+    Returns:
+        List[Dict[str, Union[int, str, float]]]: Pairs with both IDs and filenames and their similarity, most similar first.
+    """
+    try:
+        other = aliased(LSHBucket)
+        candidate_pairs = (
+            db.session.query(LSHBucket.doc_id.label("first_id"), other.doc_id.label("second_id"))
+            .join(other, and_(
+                other.doc_type == LSHBucket.doc_type,
+                other.band == LSHBucket.band,
+                other.bucket == LSHBucket.bucket,
+                other.doc_id > LSHBucket.doc_id
+            ))
+            .filter(LSHBucket.doc_type == doc_type)
+            .distinct()
+            .all()
+        )
+        if not candidate_pairs:
+            return []
+
+        doc_ids = sorted({pair.first_id for pair in candidate_pairs} | {pair.second_id for pair in candidate_pairs})
+        signatures = _load_signatures(doc_type, doc_ids)
+        pairs = []
+        for pair in candidate_pairs:
+            if pair.first_id not in signatures or pair.second_id not in signatures:
+                continue
+            similarity = estimate_jaccard(signatures[pair.first_id], signatures[pair.second_id])
+            if similarity >= threshold:
+                pairs.append((pair.first_id, pair.second_id, similarity))
+
+        filenames = _load_filenames(doc_type, sorted({p[0] for p in pairs} | {p[1] for p in pairs}))
+        result = [
+            {
+                "first_id": first_id,
+                "first_filename": filenames.get(first_id),
+                "second_id": second_id,
+                "second_filename": filenames.get(second_id),
+                "similarity": similarity
+            }
+            for first_id, second_id, similarity in sorted(pairs, key=lambda p: p[2], reverse=True)
+        ]
+        logger.debug(f"Found {len(result)} near-duplicate {doc_type} pairs among {len(candidate_pairs)} candidates")
+        return result
+    except SQLAlchemyError as e:
+        logger.error(f"Error listing near-duplicate {doc_type} pairs: {str(e)}")
+        return []
+
+def get_unsigned_document_ids(doc_type: str) -> List[int]:
+    """List IDs of documents that have no MinHash signature yet.
+
+    Args:
+        doc_type: Either "job" or "cv".
+
+    Returns:
+        List[int]: IDs of unsigned documents.
+    """
+    model = DOCUMENT_MODELS[doc_type]
+    rows = (
+        db.session.query(model.id)
+        .outerjoin(MinHashSignature, and_(MinHashSignature.doc_type == doc_type, MinHashSignature.doc_id == model.id))
+        .filter(MinHashSignature.doc_id.is_(None))
+        .order_by(model.id)
+        .all()
+    )
+    return [row.id for row in rows]
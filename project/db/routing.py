@@ -0,0 +1,120 @@
+from typing import Any, Callable, Iterator, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import logging
+import math
+import time
+from flask import Flask, Response, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+import config
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = "replica"
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+class RoutingSession(Session):
+    """Session sending the reads of read-only views to the replica and everything else to the primary.
+
+    Reads go to the replica only inside a read_only view and only when a replica bind is
+    configured. Only statements known to be SELECTs qualify: flushes, INSERT/UPDATE/DELETE
+    and raw text() statements always use the primary, so a read-only view that caches a
+    result still writes it to the right database. Wrap a raw SELECT with text(...).columns()
+    to let it read from the replica.
+    """
+
+    def get_bind(self, mapper: Optional[Any] = None, clause: Optional[Any] = None, bind: Optional[Any] = None, **kwargs: Any) -> Any:
+        if (
+            bind is None
+            and _use_replica.get()
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def replica_enabled() -> bool:
+    """Whether a read replica is configured."""
+    return bool(config.SQLALCHEMY_REPLICA_URI)
+
+def _reads_own_writes(read_primary_until: Optional[str]) -> bool:
+    """Whether the client changed documents recently enough that the replica may not show it yet."""
+    try:
+        return float(read_primary_until or 0) > time.time()
+    except ValueError:
+        return False
+
+@contextmanager
+def replica_reads(read_primary_until: Optional[str] = None) -> Iterator[None]:
+    """Send the reads of the enclosed block to the replica, as inside a read_only view.
+
+    Args:
+        read_primary_until: The client's read-your-writes cookie, if it sent one.
+    """
+    if not replica_enabled() or _reads_own_writes(read_primary_until):
+        yield
+        return
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Send the reads of the enclosed block to the primary, even inside a read_only view."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+def read_only(view: Callable) -> Callable:
+    """Decorate a view that only reads so its queries use the read replica.
+
+    Clients that changed documents within READ_YOUR_WRITES_SECONDS keep reading from the
+    primary, so an upload followed by /view-data shows the new document even while the
+    replica lags.
+
+    Args:
+        view: View function to decorate.
+
+    Returns:
+        Callable: Wrapped view.
+    """
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with replica_reads(request.cookies.get(READ_YOUR_WRITES_COOKIE)):
+            return view(*args, **kwargs)
+    return wrapper
+
+def note_document_write() -> None:
+    """Record that the current request changed job descriptions or CVs."""
+    if has_request_context():
+        g.documents_written = True
+
+def _set_read_your_writes_cookie(response: Response) -> Response:
+    """after_request hook: pin a client that changed documents to the primary for a while."""
+    if g.get("documents_written") and config.READ_YOUR_WRITES_SECONDS > 0:
+        until = time.time() + config.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, f"{until:.3f}", max_age=math.ceil(config.READ_YOUR_WRITES_SECONDS), httponly=True, samesite="Lax")
+    return response
+
+def init_read_routing(app: Flask) -> None:
+    """Configure the replica bind and read-your-writes handling when SQLALCHEMY_REPLICA_URI is set.
+
+    Must run before db.init_app so the replica engine is created.
+
+    Args:
+        app: Flask application instance.
+    """
+    if not replica_enabled():
+        return
+    app.config["SQLALCHEMY_BINDS"] = {**app.config.get("SQLALCHEMY_BINDS", {}), REPLICA_BIND: config.SQLALCHEMY_REPLICA_URI}
+    app.after_request(_set_read_your_writes_cookie)
+    logger.info(f"Routing read-only endpoints to the read replica (read-your-writes window {config.READ_YOUR_WRITES_SECONDS:g}s)")
@@ -0,0 +1,285 @@
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import logging
+import re
+import unicodedata
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import config
+from .models import db, JobDescription, CV
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TABLES = {"job": config.JOB_DESCRIPTIONS_TABLE, "cv": config.CVS_TABLE}
+DOCUMENT_MODELS = {"job": JobDescription, "cv": CV}
+# The SQLite FTS5 index stores no document columns, so its rowid encodes both the type and ID.
+FTS_TYPE_CODES = {"job": 0, "cv": 1}
+FTS_TYPES = {code: doc_type for doc_type, code in FTS_TYPE_CODES.items()}
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_WORDS = 30
+WORD_PUNCTUATION = re.compile(r"^(\W*)(.*?)(\W*)$", re.DOTALL)
+SCAN_BATCH_SIZE = 500
+
+SearchResults = Dict[str, Union[int, List[Dict[str, Union[int, str, float]]]]]
+
+def _dialect() -> str:
+    """Return the name of the database dialect in use."""
+    return db.session.get_bind().dialect.name
+
+def _iter_documents(doc_type: str, doc_ids: Optional[List[int]] = None) -> Iterator[Tuple[int, str, str]]:
+    """Stream (id, filename, text) of documents in ID order, decompressing text in Python.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_ids: Restrict to these IDs, None for all documents.
+
+    Yields:
+        Tuple[int, str, str]: Document ID, filename and text.
+    """
+    model = DOCUMENT_MODELS[doc_type]
+    if doc_ids is not None:
+        for start in range(0, len(doc_ids), SCAN_BATCH_SIZE):
+            rows = (
+                db.session.query(model.id, model.filename, model.text)
+                .filter(model.id.in_(doc_ids[start:start + SCAN_BATCH_SIZE]))
+                .order_by(model.id)
+                .all()
+            )
+            yield from ((row.id, row.filename, row.text) for row in rows)
+        return
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(model.id, model.filename, model.text)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(SCAN_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return
+        yield from ((row.id, row.filename, row.text) for row in rows)
+        last_id = rows[-1].id
+
+def ensure_search_index() -> None:
+    """Create the full-text search structures and index documents stored before they existed.
+
+    PostgreSQL gets a weighted `search_vector` tsvector column with a GIN index on each
+    document table; SQLite gets a contentless FTS5 virtual table shared by jobs and CVs,
+    which keeps only the inverted index and not a second, uncompressed copy of every text.
+    Document text is stored compressed, so missing entries are indexed from Python.
+    """
+    dialect = _dialect()
+    if dialect == "postgresql":
+        for table in DOCUMENT_TABLES.values():
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"))
+        db.session.commit()
+        missing_query = "SELECT id FROM {table} WHERE search_vector IS NULL ORDER BY id"
+    elif dialect == "sqlite":
+        existing = db.session.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": config.SEARCH_INDEX_TABLE}
+        ).scalar()
+        if existing and "content=''" not in existing:
+            # Indexes built before the table became contentless hold a copy of every text.
+            db.session.execute(text(f"DROP TABLE {config.SEARCH_INDEX_TABLE}"))
+            logger.info(f"Rebuilding {config.SEARCH_INDEX_TABLE} as a contentless FTS5 table")
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {config.SEARCH_INDEX_TABLE} "
+            "USING fts5(filename, text, content='', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        db.session.commit()
+        missing_query = (
+            "SELECT id FROM {table} WHERE id * 2 + :type_code NOT IN "
+            f"(SELECT rowid FROM {config.SEARCH_INDEX_TABLE}) ORDER BY id"
+        )
+    else:
+        logger.warning(f"Full-text search index is not supported on {dialect}; /search falls back to substring matching")
+        return
+
+    for doc_type, table in DOCUMENT_TABLES.items():
+        doc_ids = [row.id for row in db.session.execute(text(missing_query.format(table=table)), {"type_code": FTS_TYPE_CODES[doc_type]})]
+        for start in range(0, len(doc_ids), SCAN_BATCH_SIZE):
+            for doc_id, filename, document_text in _iter_documents(doc_type, doc_ids[start:start + SCAN_BATCH_SIZE]):
+                index_document_text(doc_type, doc_id, filename, document_text)
+            db.session.commit()
+        if doc_ids:
+            logger.info(f"Indexed {len(doc_ids)} rows of {table} for full-text search")
+
+def index_document_text(doc_type: str, doc_id: int, filename: str, document_text: str) -> None:
+    """Add a document to the full-text search index inside the current transaction.
+
+    Stored documents are never rewritten, and rows of a contentless FTS5 table cannot be
+    deleted before SQLite 3.43, so each document is indexed once, when it is added.
+
+    Args:
+        doc_type: Either "job" or "cv".
+        doc_id: ID of the job description or CV.
+        filename: Name of the file the document came from.
+        document_text: Text content of the document.
+    """
+    dialect = _dialect()
+    if dialect == "postgresql":
+        db.session.execute(
+            text(
+                f"UPDATE {DOCUMENT_TABLES[doc_type]} SET search_vector = "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :filename), 'A') || "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :text), 'B') "
+                "WHERE id = :doc_id"
+            ),
+            {"config": config.SEARCH_TEXT_CONFIG, "filename": filename, "text": document_text, "doc_id": doc_id}
+        )
+    elif dialect == "sqlite":
+        db.session.execute(
+            text(f"INSERT INTO {config.SEARCH_INDEX_TABLE} (rowid, filename, text) VALUES (:rowid, :filename, :text)"),
+            {"rowid": doc_id * 2 + FTS_TYPE_CODES[doc_type], "filename": filename, "text": document_text}
+        )
+
+def _fts5_query(query: str) -> str:
+    """Quote every word so user input is matched literally by FTS5 (all words required)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+def _fold(word: str) -> str:
+    """Lower-case a word and strip its diacritics, as the search indexes do."""
+    return "".join(char for char in unicodedata.normalize("NFKD", word.lower()) if not unicodedata.combining(char))
+
+def _make_snippet(document_text: str, terms: List[str]) -> str:
+    """Cut a window of words around the first query term match and highlight the matching words.
+
+    Args:
+        document_text: Text content of the document.
+        terms: Lower-cased query words.
+
+    Returns:
+        str: Snippet with matching words wrapped in SNIPPET_START/SNIPPET_END, or the start of the text if nothing matches.
+    """
+    words = document_text.split()
+    if not terms:
+        return " ".join(words[:SNIPPET_WORDS])
+    pattern = re.compile("|".join(re.escape(_fold(term)) for term in sorted(terms, key=len, reverse=True)))
+    matches = [bool(pattern.search(_fold(word))) for word in words]
+    first = matches.index(True) if True in matches else 0
+    start = max(0, first - SNIPPET_WORDS // 3)
+    snippet = " ".join(
+        WORD_PUNCTUATION.sub(f"\\1{SNIPPET_START}\\2{SNIPPET_END}\\3", word) if matched else word
+        for word, matched in zip(words[start:start + SNIPPET_WORDS], matches[start:start + SNIPPET_WORDS])
+    )
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if start + SNIPPET_WORDS < len(words) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+def _query_terms(query: str) -> List[str]:
+    """Extract the plain words of a search query for snippet highlighting."""
+    return [term for term in re.findall(r"\w+", query.lower()) if term != "or"]
+
+def _page_results(page: List[Tuple[str, int, float]], doc_types: List[str], query: str) -> List[Dict[str, Union[int, str, float]]]:
+    """Load filenames and text of one page of matches and build their snippets.
+
+    Neither ts_headline nor FTS5 snippet() can read the compressed text column, so snippets
+    are built here, for the requested page only.
+    """
+    details = {
+        (doc_type, doc_id): (filename, document_text)
+        for doc_type in doc_types
+        for doc_id, filename, document_text in _iter_documents(doc_type, [doc_id for page_type, doc_id, _ in page if page_type == doc_type])
+    }
+    terms = _query_terms(query)
+    results = []
+    for doc_type, doc_id, rank in page:
+        filename, document_text = details.get((doc_type, doc_id), (None, ""))
+        results.append({
+            "doc_type": doc_type,
+            "id": doc_id,
+            "filename": filename,
+            "rank": rank,
+            "snippet": _make_snippet(document_text, terms)
+        })
+    return results
+
+def _search_postgresql(query: str, doc_types: List[str], limit: int, offset: int) -> SearchResults:
+    """Rank matches with ts_rank_cd and build snippets for the requested page only."""
+    params = {"config": config.SEARCH_TEXT_CONFIG, "query": query, "limit": limit, "offset": offset}
+    matches = " UNION ALL ".join(
+        f"SELECT '{doc_type}' AS doc_type, id, ts_rank_cd(search_vector, q) AS rank "
+        f"FROM {DOCUMENT_TABLES[doc_type]}, websearch_to_tsquery(CAST(:config AS regconfig), :query) q "
+        "WHERE search_vector @@ q"
+        for doc_type in doc_types
+    )
+    total = db.session.execute(text(f"SELECT count(*) FROM ({matches}) matches").columns(), params).scalar()
+    page = db.session.execute(
+        text(f"SELECT doc_type, id, rank FROM ({matches}) matches ORDER BY rank DESC, doc_type, id LIMIT :limit OFFSET :offset").columns(),
+        params
+    ).all()
+    return {"total": total, "results": _page_results([(row.doc_type, row.id, float(row.rank)) for row in page], doc_types, query)}
+
+def _search_sqlite(query: str, doc_types: List[str], limit: int, offset: int) -> SearchResults:
+    """Rank matches with FTS5 bm25(), filename weighted above text."""
+    fts_query = _fts5_query(query)
+    if not fts_query:
+        return {"total": 0, "results": []}
+    params = {"query": fts_query, "limit": limit, "offset": offset}
+    type_filter = " AND rowid % 2 IN (" + ", ".join(str(FTS_TYPE_CODES[doc_type]) for doc_type in doc_types) + ")"
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM {config.SEARCH_INDEX_TABLE} WHERE {config.SEARCH_INDEX_TABLE} MATCH :query{type_filter}").columns(),
+        params
+    ).scalar()
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, bm25({config.SEARCH_INDEX_TABLE}, 10.0, 1.0) AS rank "
+            f"FROM {config.SEARCH_INDEX_TABLE} WHERE {config.SEARCH_INDEX_TABLE} MATCH :query{type_filter} "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ).columns(),
+        params
+    ).all()
+    page = [(FTS_TYPES[row.rowid % 2], row.rowid // 2, -float(row.rank)) for row in rows]
+    return {"total": total, "results": _page_results(page, doc_types, query)}
+
+def _search_substring(query: str, doc_types: List[str], limit: int, offset: int) -> SearchResults:
+    """Unranked fallback for databases without a supported full-text engine.
+
+    Document text is compressed, so matching happens in Python over a streamed scan.
+    """
+    needle = query.lower()
+    matches = [
+        {"doc_type": doc_type, "id": doc_id, "filename": filename, "rank": 0.0, "snippet": document_text[:200]}
+        for doc_type in doc_types
+        for doc_id, filename, document_text in _iter_documents(doc_type)
+        if needle in document_text.lower()
+    ]
+    return {"total": len(matches), "results": matches[offset:offset + limit]}
+
+def search_documents(query: str, doc_type: Optional[str] = None, page: int = 1, per_page: int = 20) -> SearchResults:
+    """Search job descriptions and CVs, returning one ranked page of results with snippets.
+
+    Args:
+        query: Search terms; on PostgreSQL web-search syntax (quotes, OR, -word) is supported.
+        doc_type: "job" or "cv" to restrict the search, None for both.
+        page: 1-based page number.
+        per_page: Number of results per page.
+
+    Returns:
+        SearchResults: total number of matches and the page of results with doc_type, id, filename, rank and snippet.
+
+    Raises:
+        ValueError: If doc_type is not "job", "cv" or None.
+    """
+    if doc_type is not None and doc_type not in DOCUMENT_TABLES:
+        raise ValueError(f"Unknown document type: {doc_type}")
+    doc_types = [doc_type] if doc_type else list(DOCUMENT_TABLES)
+    limit = per_page
+    offset = (page - 1) * per_page
+    try:
+        dialect = _dialect()
+        if dialect == "postgresql":
+            result = _search_postgresql(query, doc_types, limit, offset)
+        elif dialect == "sqlite":
+            result = _search_sqlite(query, doc_types, limit, offset)
+        else:
+            result = _search_substring(query, doc_types, limit, offset)
+        logger.debug(f"Search for '{query}' matched {result['total']} documents")
+        return result
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error searching documents for '{query}': {str(e)}")
+        return {"total": 0, "results": []}
@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, Set
+import logging
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from .models import db, JobDescription, CV, TableVersion
+from .dialects import dialect_insert
+from .routing import note_document_write
+
+logger = logging.getLogger(__name__)
+
+TRACKED_MODELS = (JobDescription, CV)
+
+def bump_table_versions(session: Session, table_names: Iterable[str]) -> None:
+    """Increment the version counters of tables inside the session's current transaction.
+
+    Called automatically for ORM changes to tracked models; bulk SQL writes to a tracked
+    table must call it themselves.
+
+    Args:
+        session: Session whose transaction the change belongs to.
+        table_names: Names of the changed tables.
+    """
+    note_document_write()
+    insert = dialect_insert()
+    connection = session.connection()
+    for table_name in sorted(set(table_names)):
+        if insert is not None:
+            connection.execute(
+                insert(TableVersion)
+                .values(table_name=table_name, version=1)
+                .on_conflict_do_update(index_elements=["table_name"], set_={"version": TableVersion.version + 1})
+            )
+        else:
+            updated = connection.execute(
+                TableVersion.__table__.update()
+                .where(TableVersion.table_name == table_name)
+                .values(version=TableVersion.version + 1)
+            )
+            if not updated.rowcount:
+                connection.execute(TableVersion.__table__.insert().values(table_name=table_name, version=1))
+
+def get_table_versions(table_names: Iterable[str]) -> Dict[str, int]:
+    """Read the current version counters of tables.
+
+    Args:
+        table_names: Names of the tables.
+
+    Returns:
+        Dict[str, int]: Version per table, 0 for tables never changed since tracking started.
+    """
+    table_names = sorted(set(table_names))
+    try:
+        rows = db.session.query(TableVersion.table_name, TableVersion.version).filter(TableVersion.table_name.in_(table_names)).all()
+        versions = {row.table_name: row.version for row in rows}
+        return {table_name: versions.get(table_name, 0) for table_name in table_names}
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading table versions: {str(e)}")
+        return {}
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_tables(session: Session, flush_context: object) -> None:
+    """Bump the versions of tracked tables whose rows this flush inserted, updated or deleted."""
+    changed: Set[str] = set()
+    for instance in session.new | session.deleted:
+        if isinstance(instance, TRACKED_MODELS):
+            changed.add(instance.__tablename__)
+    for instance in session.dirty:
+        if isinstance(instance, TRACKED_MODELS) and session.is_modified(instance, include_collections=False):
+            changed.add(instance.__tablename__)
+    if changed:
+        bump_table_versions(session, changed)
@@ -0,0 +1,162 @@
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Union
+import csv
+import gzip
+import itertools
+import json
+import logging
+import sys
+from .models import db, JobDescription, CV
+from .database import add_job_description, add_cv, batch_transaction, iter_documents
+from .dialects import sync_id_sequence
+
+logger = logging.getLogger(__name__)
+
+DUMP_FORMATS = ("ndjson", "csv")
+CSV_FIELDS = ["type", "id", "filename", "text", "qualifications", "skills", "experience"]
+LIST_FIELDS = ("qualifications", "skills", "experience")
+DOC_TYPES = ("job", "cv")
+
+Record = Dict[str, Union[int, str, List[str]]]
+
+# Job and CV texts can be far longer than the csv module's default 128 KiB field limit.
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def detect_dump_format(path: str) -> str:
+    """Guess the dump format from a file name, ignoring a trailing .gz; NDJSON by default."""
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.lower().endswith(".csv") else "ndjson"
+
+def open_dump(path: str, mode: str) -> IO[str]:
+    """Open a dump file for text reading ("r") or writing ("w").
+
+    Args:
+        path: File path; "-" for stdin/stdout, a .gz suffix for gzip compression.
+        mode: "r" or "w".
+
+    Returns:
+        IO[str]: UTF-8 text stream.
+    """
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+def export_documents(handle: IO[str], dump_format: str, doc_types: Iterable[str] = DOC_TYPES, batch_size: int = 500) -> Dict[str, int]:
+    """Stream job descriptions and CVs to NDJSON or CSV.
+
+    Rows are read in ID-keyed batches and written as they arrive, so memory does not
+    grow with the table size. NDJSON records have the /view-data shape plus a "type" key;
+    CSV rows share one header, with CV keyword lists comma-joined and empty for jobs.
+
+    Args:
+        handle: Text stream to write to.
+        dump_format: "ndjson" or "csv".
+        doc_types: Document types to export, "job" and/or "cv".
+        batch_size: Rows fetched per database round trip.
+
+    Returns:
+        Dict[str, int]: Number of exported documents per type.
+    """
+    writer = None
+    if dump_format == "csv":
+        writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    counts = {}
+    for doc_type in doc_types:
+        counts[doc_type] = 0
+        for document in iter_documents(doc_type, batch_size):
+            record = {"type": doc_type, **document}
+            if writer is not None:
+                writer.writerow({key: ",".join(value) if isinstance(value, list) else value for key, value in record.items()})
+            else:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            counts[doc_type] += 1
+        logger.info(f"Exported {counts[doc_type]} {doc_type} documents")
+    return counts
+
+def iter_dump_records(handle: IO[str], dump_format: str) -> Iterator[Record]:
+    """Read records from an NDJSON or CSV dump one at a time.
+
+    Args:
+        handle: Text stream to read from.
+        dump_format: "ndjson" or "csv".
+
+    Yields:
+        Record: Document with "type", "filename", "text", an "id" if present, and keyword
+            lists for CVs. Lines that cannot be parsed are logged and skipped.
+    """
+    if dump_format == "csv":
+        for line_number, row in enumerate(csv.DictReader(handle), start=2):
+            record = {key: value for key, value in row.items() if key in CSV_FIELDS}
+            for field in LIST_FIELDS:
+                record[field] = record[field].split(",") if record.get(field) else []
+            record["line"] = line_number
+            yield record
+        return
+    for line_number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping line {line_number}: invalid JSON ({str(e)})")
+            continue
+        if isinstance(record, dict):
+            record["line"] = line_number
+            yield record
+        else:
+            logger.warning(f"Skipping line {line_number}: not a JSON object")
+
+def _record_id(record: Record) -> Optional[int]:
+    try:
+        return int(record["id"]) if record.get("id") not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def import_documents(records: Iterable[Record], batch_size: int = 500, keep_ids: bool = True) -> Dict[str, int]:
+    """Store streamed records, committing one transaction per batch.
+
+    Each document goes through the same path as an upload, so compression, text hashes,
+    corpus statistics, MinHash, search, keyword and embedding indexes and table versions
+    are all maintained. A failing document (e.g. a filename that already exists) is skipped
+    without affecting the rest of its batch.
+
+    Args:
+        records: Records as produced by iter_dump_records.
+        batch_size: Documents per transaction.
+        keep_ids: Reuse the exported IDs so references to them stay valid.
+
+    Returns:
+        Dict[str, int]: Counts of "jobs", "cvs", "skipped" and "invalid" records.
+    """
+    counts = {"jobs": 0, "cvs": 0, "skipped": 0, "invalid": 0}
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            break
+        with batch_transaction():
+            for record in batch:
+                doc_type = record.get("type")
+                filename, text = record.get("filename"), record.get("text")
+                if doc_type not in DOC_TYPES or not isinstance(filename, str) or not filename or not isinstance(text, str):
+                    logger.warning(f"Skipping record at line {record.get('line')}: needs a type of 'job' or 'cv', a filename and a text")
+                    counts["invalid"] += 1
+                    continue
+                doc_id = _record_id(record) if keep_ids else None
+                if doc_type == "job":
+                    stored = add_job_description(filename, text, job_id=doc_id)
+                else:
+                    stored = add_cv(filename, text, *(list(record.get(field) or []) for field in LIST_FIELDS), cv_id=doc_id)
+                if stored is None:
+                    counts["skipped"] += 1
+                else:
+                    counts["jobs" if doc_type == "job" else "cvs"] += 1
+        db.session.expunge_all()
+        logger.info(f"Imported {counts['jobs']} jobs and {counts['cvs']} CVs so far ({counts['skipped']} skipped, {counts['invalid']} invalid)")
+    if keep_ids:
+        with batch_transaction():
+            for model in (JobDescription, CV):
+                sync_id_sequence(model.__tablename__)
+    return counts
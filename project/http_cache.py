@@ -0,0 +1,152 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from functools import wraps
+import gzip
+import hashlib
+import logging
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
+import config
+from db.table_versions import get_table_versions
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+DOCUMENT_TABLES = (config.JOB_DESCRIPTIONS_TABLE, config.CVS_TABLE)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider serializing with orjson, keeping Flask's sorted keys and compact output.
+
+    Objects orjson cannot handle natively fall back to the default provider's conversions.
+    """
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.options).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype
+        )
+
+def _accepted_encodings() -> Dict[str, float]:
+    """Parse Accept-Encoding into encoding -> quality."""
+    accepted = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.lower()] = quality
+    return accepted
+
+def _choose_encoding() -> Optional[str]:
+    """Pick the response encoding: brotli when available and accepted, else gzip, else none."""
+    accepted = _accepted_encodings()
+    candidates = (["br"] if brotli else []) + ["gzip"]
+    qualities = [(accepted.get(name, accepted.get("*", 0.0)), -index, name) for index, name in enumerate(candidates)]
+    quality, _, name = max(qualities)
+    return name if quality > 0 else None
+
+def compress_response(response: Response) -> Response:
+    """Compress a buffered textual response with the best encoding the client accepts.
+
+    Args:
+        response: Outgoing response.
+
+    Returns:
+        Response: The same response, compressed in place when worthwhile.
+    """
+    if (
+        response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+        or response.direct_passthrough or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < config.HTTP_COMPRESSION_MIN_BYTES:
+        return response
+    encoding = _choose_encoding()
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=min(config.HTTP_COMPRESSION_LEVEL, 11))
+    elif encoding == "gzip":
+        compressed = gzip.compress(data, compresslevel=min(config.HTTP_COMPRESSION_LEVEL, 9))
+    else:
+        return response
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    logger.debug(f"Compressed {request.path} response with {encoding}: {len(data)} -> {len(compressed)} bytes")
+    return response
+
+def conditional(tables: Iterable[str] = DOCUMENT_TABLES) -> Callable:
+    """Decorate a GET view whose output depends only on its URL and the given tables.
+
+    The ETag is derived from the endpoint, the query string and the tables' version counters,
+    so it is computed without running the view. A matching If-None-Match is answered with 304.
+
+    Args:
+        tables: Names of the tables the view reads.
+
+    Returns:
+        Callable: Decorator for the view function.
+    """
+    table_names: List[str] = sorted(tables)
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Response:
+            versions = get_table_versions(table_names)
+            if not versions:
+                return view(*args, **kwargs)
+            fingerprint = f"{request.endpoint}?{request.query_string.decode('latin-1')}|" + ",".join(
+                f"{name}={versions[name]}" for name in table_names
+            )
+            etag = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:32]
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            response = view(*args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
+
+def init_http_cache(app: Flask) -> None:
+    """Register the fast JSON provider and response compression on the application.
+
+    Args:
+        app: Flask application instance.
+    """
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+        logger.info("Using orjson for JSON responses")
+    else:
+        logger.warning("orjson is not installed; using the standard JSON provider")
+    if brotli is None:
+        logger.info("brotli is not installed; responses are compressed with gzip only")
+    app.after_request(compress_response)
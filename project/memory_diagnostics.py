@@ -0,0 +1,322 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import os
+import random
+import resource
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from flask import Blueprint, Flask, Response, abort, g, jsonify, request
+import config
+from metrics import Metric, register_collector
+from profiling import PROFILE_HEADER, PROFILE_QUERY_PARAMETER, verify_profile_token
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+SNAPSHOT_GROUPINGS = ("lineno", "filename", "traceback")
+DEFAULT_STATISTICS = 25
+MAX_STATISTICS = 500
+# Allocations made by tracemalloc itself and by the import machinery are noise in a leak hunt.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+memory_bp = Blueprint("memory", __name__)
+_snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "requests": 0,
+    "recycling": False,
+    "max_requests": 0,
+    "rss_growth_bytes": {},
+    "peak_raised_requests": {},
+    "peak_raised_bytes": {}
+}
+
+def peak_rss() -> int:
+    """Return the highest resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def current_rss() -> int:
+    """Return the current resident set size of this process in bytes.
+
+    Read from /proc/self/statm; falls back to the peak where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+def _request_token() -> Optional[str]:
+    return request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAMETER)
+
+def _require_token() -> None:
+    if not verify_profile_token(_request_token()):
+        abort(403)
+
+def _require_tracing() -> None:
+    if not tracemalloc.is_tracing():
+        abort(409, description="tracemalloc is not tracing; set MEMORY_TRACEMALLOC=true")
+
+def _statistics_to_json(statistics: Iterable[Any], limit: int) -> List[Dict[str, Any]]:
+    """Convert tracemalloc Statistic or StatisticDiff objects to JSON, largest first."""
+    result = []
+    for statistic in list(statistics)[:limit]:
+        entry = {
+            "location": [f"{frame.filename}:{frame.lineno}" for frame in statistic.traceback],
+            "size": statistic.size,
+            "count": statistic.count
+        }
+        if hasattr(statistic, "size_diff"):
+            entry.update({"size_diff": statistic.size_diff, "count_diff": statistic.count_diff})
+        result.append(entry)
+    return result
+
+def _statistics_arguments() -> Dict[str, Any]:
+    """Read and validate the group_by and limit query parameters of the snapshot endpoints."""
+    group_by = request.args.get("group_by", "lineno")
+    if group_by not in SNAPSHOT_GROUPINGS:
+        abort(400, description=f"group_by must be one of {', '.join(SNAPSHOT_GROUPINGS)}")
+    try:
+        limit = int(request.args.get("limit", DEFAULT_STATISTICS))
+    except ValueError:
+        abort(400, description="limit must be an integer")
+    return {"group_by": group_by, "limit": max(1, min(limit, MAX_STATISTICS))}
+
+def take_snapshot() -> Dict[str, Any]:
+    """Take a tracemalloc snapshot and keep it for later diffs.
+
+    The oldest snapshot is dropped once MEMORY_MAX_SNAPSHOTS are kept.
+
+    Returns:
+        Dict[str, Any]: Snapshot ID, creation time, memory figures and the snapshot itself.
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    traced, traced_peak = tracemalloc.get_traced_memory()
+    entry = {
+        "id": uuid.uuid4().hex[:8],
+        "created": time.time(),
+        "traced_bytes": traced,
+        "traced_peak_bytes": traced_peak,
+        "rss_bytes": current_rss(),
+        "snapshot": snapshot
+    }
+    with _lock:
+        _snapshots[entry["id"]] = entry
+        while len(_snapshots) > max(config.MEMORY_MAX_SNAPSHOTS, 1):
+            _snapshots.popitem(last=False)
+    return entry
+
+def _describe_snapshot(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in entry.items() if key != "snapshot"}
+
+@memory_bp.route("/memory", methods=["GET"])
+def memory_status() -> Response:
+    """Report this worker's memory use, tracemalloc state and recycling thresholds.
+
+    Requires a profiling token in the X-Profile header or the `profile` query parameter.
+
+    Returns:
+        Response: JSON with current and peak RSS, traced memory and kept snapshots.
+    """
+    _require_token()
+    traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    with _lock:
+        snapshots = [_describe_snapshot(entry) for entry in _snapshots.values()]
+        requests_served, recycling = _stats["requests"], _stats["recycling"]
+    return jsonify({
+        "pid": os.getpid(),
+        "rss_bytes": current_rss(),
+        "peak_rss_bytes": peak_rss(),
+        "tracemalloc": {"tracing": tracemalloc.is_tracing(), "frames": tracemalloc.get_traceback_limit(),
+                        "traced_bytes": traced, "traced_peak_bytes": traced_peak},
+        "snapshots": snapshots,
+        "requests": requests_served,
+        "recycling": recycling,
+        "max_requests": _stats["max_requests"],
+        "max_rss_bytes": int(config.WORKER_MAX_RSS_MB * MB)
+    })
+
+@memory_bp.route("/memory/snapshots", methods=["POST"])
+def create_snapshot() -> Response:
+    """Take a tracemalloc snapshot of this worker.
+
+    Requires a profiling token. Accepts `group_by` (lineno, filename or traceback) and
+    `limit` query parameters for the top allocation sites returned.
+
+    Returns:
+        Response: JSON with the snapshot ID and the largest allocation sites, or 409 if
+        tracemalloc is not tracing.
+    """
+    _require_token()
+    _require_tracing()
+    arguments = _statistics_arguments()
+    entry = take_snapshot()
+    logger.info(f"Took tracemalloc snapshot {entry['id']} ({entry['traced_bytes'] / MB:.1f} MB traced)")
+    return jsonify({
+        **_describe_snapshot(entry),
+        "pid": os.getpid(),
+        "top": _statistics_to_json(entry["snapshot"].statistics(arguments["group_by"]), arguments["limit"])
+    }), 201
+
+@memory_bp.route("/memory/snapshots/<snapshot_id>/diff", methods=["GET"])
+def diff_snapshot(snapshot_id: str) -> Response:
+    """Compare a kept snapshot with a later one to find what grew in between.
+
+    Requires a profiling token. `against` names the later snapshot; without it a new
+    snapshot is taken and kept. Snapshots live in the worker that took them, so under
+    several workers a 404 may just mean the request reached another process.
+
+    Args:
+        snapshot_id: ID returned by POST /memory/snapshots.
+
+    Returns:
+        Response: JSON with the allocation sites sorted by growth, or 404/409.
+    """
+    _require_token()
+    _require_tracing()
+    arguments = _statistics_arguments()
+    against_id = request.args.get("against")
+    with _lock:
+        base = _snapshots.get(snapshot_id)
+        target = _snapshots.get(against_id) if against_id else None
+    if base is None or (against_id and target is None):
+        abort(404, description=f"Unknown snapshot in worker {os.getpid()}")
+    if target is None:
+        target = take_snapshot()
+    statistics = target["snapshot"].compare_to(base["snapshot"], arguments["group_by"])
+    return jsonify({
+        "pid": os.getpid(),
+        "base": _describe_snapshot(base),
+        "target": _describe_snapshot(target),
+        "traced_growth_bytes": target["traced_bytes"] - base["traced_bytes"],
+        "rss_growth_bytes": target["rss_bytes"] - base["rss_bytes"],
+        "top": _statistics_to_json(statistics, arguments["limit"])
+    })
+
+def memory_tracking_enabled() -> bool:
+    """Whether requests are measured, for diagnostics or for a recycling threshold."""
+    return config.MEMORY_DIAGNOSTICS_ENABLED or config.WORKER_MAX_REQUESTS > 0 or config.WORKER_MAX_RSS_MB > 0
+
+def start_request_memory() -> Tuple[int, int]:
+    """Current and peak RSS at the start of a request, to pass to finish_request_memory."""
+    return current_rss(), peak_rss()
+
+def _start_request_memory() -> None:
+    g.memory_start = start_request_memory()
+
+def _add(totals: Dict[str, float], endpoint: str, value: float) -> None:
+    totals[endpoint] = totals.get(endpoint, 0) + value
+
+def _recycle_worker(reason: str) -> None:
+    """Ask this worker process to shut down gracefully so its supervisor starts a fresh one.
+
+    SIGTERM makes gunicorn and uvicorn workers finish the requests in flight, this one
+    included, before exiting.
+    """
+    logger.warning(f"Recycling worker {os.getpid()}: {reason}")
+    os.kill(os.getpid(), signal.SIGTERM)
+
+def finish_request_memory(description: str, endpoint: str, start: Tuple[int, int]) -> None:
+    """Account a finished request's memory growth and recycle the worker past its thresholds.
+
+    Also used by the async views of asgi.py, which run outside the Flask request hooks.
+
+    Args:
+        description: Method and path, for the log line.
+        endpoint: Label the growth is totalled under.
+        start: Value returned by start_request_memory when the request began.
+    """
+    rss_before, peak_before = start
+    rss_after, peak_after = current_rss(), peak_rss()
+    peak_raise = peak_after - peak_before
+
+    recycle_reason = None
+    with _lock:
+        _stats["requests"] += 1
+        if rss_after > rss_before:
+            _add(_stats["rss_growth_bytes"], endpoint, rss_after - rss_before)
+        if peak_raise > 0:
+            _add(_stats["peak_raised_requests"], endpoint, 1)
+            _add(_stats["peak_raised_bytes"], endpoint, peak_raise)
+        if not _stats["recycling"]:
+            if _stats["max_requests"] and _stats["requests"] >= _stats["max_requests"]:
+                recycle_reason = f"served {_stats['requests']} requests (WORKER_MAX_REQUESTS)"
+            elif config.WORKER_MAX_RSS_MB > 0 and rss_after >= config.WORKER_MAX_RSS_MB * MB:
+                recycle_reason = f"RSS {rss_after / MB:.0f} MB reached WORKER_MAX_RSS_MB={config.WORKER_MAX_RSS_MB:g}"
+            _stats["recycling"] = recycle_reason is not None
+
+    message = (f"{description} ({endpoint}): RSS {rss_before / MB:.1f} -> {rss_after / MB:.1f} MB, "
+               f"peak {peak_after / MB:.1f} MB (+{peak_raise / MB:.1f} MB)")
+    if peak_raise >= config.MEMORY_LOG_GROWTH_MB * MB:
+        logger.warning(f"Request raised peak memory: {message}")
+    else:
+        logger.debug(message)
+    if recycle_reason:
+        _recycle_worker(recycle_reason)
+
+def _finish_request_memory(response: Response) -> Response:
+    start = g.pop("memory_start", None)
+    if start is not None:
+        finish_request_memory(f"{request.method} {request.path}", request.endpoint or "unknown", start)
+    return response
+
+def _memory_metrics() -> Iterable[Metric]:
+    with _lock:
+        rss_growth = dict(_stats["rss_growth_bytes"])
+        peak_raised_requests = dict(_stats["peak_raised_requests"])
+        peak_raised_bytes = dict(_stats["peak_raised_bytes"])
+        requests_served = _stats["requests"]
+    yield ("process_resident_memory_bytes", "gauge", "Current resident set size of this worker.", [({}, current_rss())])
+    yield ("process_peak_resident_memory_bytes", "gauge", "Highest resident set size of this worker so far.", [({}, peak_rss())])
+    yield ("worker_requests_total", "counter", "Requests served by this worker, counted towards WORKER_MAX_REQUESTS.", [({}, requests_served)])
+    yield ("request_rss_growth_bytes_total", "counter", "Resident memory gained during requests, per endpoint.",
+           [({"endpoint": endpoint}, value) for endpoint, value in rss_growth.items()])
+    yield ("request_peak_rss_raised_total", "counter", "Requests that raised the worker's peak resident memory, per endpoint.",
+           [({"endpoint": endpoint}, value) for endpoint, value in peak_raised_requests.items()])
+    yield ("request_peak_rss_raised_bytes_total", "counter", "Bytes by which requests raised the worker's peak resident memory, per endpoint.",
+           [({"endpoint": endpoint}, value) for endpoint, value in peak_raised_bytes.items()])
+    if tracemalloc.is_tracing():
+        yield ("tracemalloc_traced_bytes", "gauge", "Python memory currently traced by tracemalloc.", [({}, tracemalloc.get_traced_memory()[0])])
+
+def init_memory_diagnostics(app: Flask) -> None:
+    """Install per-request memory tracking, worker recycling and the /memory endpoints.
+
+    Nothing is registered unless MEMORY_DIAGNOSTICS_ENABLED is set or a recycling
+    threshold (WORKER_MAX_REQUESTS, WORKER_MAX_RSS_MB) is configured. tracemalloc is
+    started only with MEMORY_TRACEMALLOC, as tracing slows every allocation.
+
+    Args:
+        app: Flask application instance.
+    """
+    if not memory_tracking_enabled():
+        return
+    recycling = config.WORKER_MAX_REQUESTS > 0 or config.WORKER_MAX_RSS_MB > 0
+    if config.WORKER_MAX_REQUESTS > 0:
+        # Spread the restarts of workers started together, like gunicorn's max_requests_jitter.
+        _stats["max_requests"] = config.WORKER_MAX_REQUESTS + random.randint(0, max(config.WORKER_MAX_REQUESTS_JITTER, 0))
+    app.before_request(_start_request_memory)
+    app.after_request(_finish_request_memory)
+    register_collector(_memory_metrics)
+    if recycling:
+        logger.info(f"Worker {os.getpid()} recycles after {_stats['max_requests'] or 'unlimited'} requests "
+                    f"or {config.WORKER_MAX_RSS_MB:g} MB RSS (0 = no limit)")
+    if not config.MEMORY_DIAGNOSTICS_ENABLED:
+        return
+    if config.MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start(config.MEMORY_TRACEMALLOC_FRAMES)
+    if not config.PROFILING_SECRET:
+        logger.warning("Memory diagnostics are enabled but PROFILING_SECRET is not set; the /memory endpoints will answer 403")
+    app.register_blueprint(memory_bp)
+    logger.info(f"Memory diagnostics enabled (tracemalloc {'on' if tracemalloc.is_tracing() else 'off'})")
@@ -0,0 +1,76 @@
+from typing import Callable, Dict, Iterable, List, Tuple
+import logging
+from flask import Blueprint, Response
+from admission import admission_stats
+
+logger = logging.getLogger(__name__)
+
+# (name, type, help, [(labels, value), ...]) in the Prometheus text exposition format.
+Metric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+metrics_bp = Blueprint("metrics", __name__)
+_collectors: List[Callable[[], Iterable[Metric]]] = []
+
+def register_collector(collector: Callable[[], Iterable[Metric]]) -> None:
+    """Add a function whose metrics are included in every /metrics scrape.
+
+    Args:
+        collector: Returns the metrics to expose, read at scrape time.
+    """
+    _collectors.append(collector)
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render a label set, escaping values as the exposition format requires."""
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for key, value in sorted(labels.items())
+    )
+    return "{" + ",".join(escaped) + "}"
+
+def render_metrics() -> str:
+    """Render every registered collector in the Prometheus text format.
+
+    Returns:
+        str: Exposition text; a failing collector is skipped and logged.
+    """
+    lines = []
+    for collector in _collectors:
+        try:
+            for name, metric_type, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(f"{name}{_format_labels(labels)} {value:g}" for labels, value in samples)
+        except Exception as e:
+            logger.error(f"Error collecting metrics from {getattr(collector, '__name__', collector)}: {str(e)}")
+    return "\n".join(lines) + "\n"
+
+def _admission_metrics() -> Iterable[Metric]:
+    """Queue depth, concurrency and rejections of each admission class, and stage timeouts."""
+    classes, timeouts = admission_stats()
+    yield ("admission_active_requests", "gauge", "Requests currently running per admission class.",
+           [({"class": name}, stats["active"]) for name, stats in classes.items()])
+    yield ("admission_queued_requests", "gauge", "Requests waiting for a slot per admission class.",
+           [({"class": name}, stats["waiting"]) for name, stats in classes.items()])
+    yield ("admission_concurrency_limit", "gauge", "Configured concurrency limit per admission class.",
+           [({"class": name}, stats["limit"]) for name, stats in classes.items()])
+    yield ("admission_admitted_total", "counter", "Requests admitted per admission class.",
+           [({"class": name}, stats["admitted_total"]) for name, stats in classes.items()])
+    yield ("admission_rejected_total", "counter", "Requests rejected with 429 per admission class.",
+           [({"class": name}, stats["rejected_total"]) for name, stats in classes.items()])
+    yield ("admission_service_seconds", "gauge", "Smoothed request duration per admission class.",
+           [({"class": name}, stats["service_seconds"]) for name, stats in classes.items()])
+    yield ("stage_timeouts_total", "counter", "OCR, LLM and translation calls aborted by their timeout.",
+           [({"stage": stage}, count) for stage, count in timeouts.items()])
+
+register_collector(_admission_metrics)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Expose process metrics for Prometheus.
+
+    Returns:
+        Response: Metrics in the Prometheus text exposition format.
+    """
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,250 @@
+from typing import Any, Dict, Iterable, List, Optional
+from collections import Counter
+import cProfile
+import hashlib
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from flask import Blueprint, Flask, Response, abort, g, jsonify, request, send_from_directory
+import config
+from metrics import Metric, register_collector
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAMETER = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_NAME_PATTERN = re.compile(r"^(?P<created>\d{8}T\d{6})_(?P<endpoint>[\w.]+)_(?P<duration_ms>\d+)ms_(?P<id>[0-9a-f]{8})\.(?P<format>prof|folded)$")
+TEXT_REPORT_LINES = 60
+
+profiling_bp = Blueprint("profiling", __name__)
+_profiles_written: Dict[str, int] = {"signed": 0, "sampled": 0}
+
+def sign_profile_token(expires: int) -> str:
+    """Build a profiling token valid until the given Unix time.
+
+    Args:
+        expires: Unix timestamp after which the token is rejected.
+
+    Returns:
+        str: Token of the form "<expires>.<hex HMAC-SHA256 of expires>".
+    """
+    signature = hmac.new(config.PROFILING_SECRET.encode("utf-8"), str(expires).encode("ascii"), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+def verify_profile_token(token: Optional[str]) -> bool:
+    """Check a profiling token's signature and expiry; always False without PROFILING_SECRET."""
+    if not token or not config.PROFILING_SECRET:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_token(int(expires)), token)
+
+def _request_token() -> Optional[str]:
+    return request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAMETER)
+
+class StackSampler(threading.Thread):
+    """Sample the call stack of one thread at a fixed interval.
+
+    Stacks are counted in the collapsed format ("outer;inner count" per line) read by
+    flamegraph.pl and speedscope. Unlike cProfile, the profiled code runs at full speed;
+    only the sampler thread costs CPU.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+def _should_profile() -> Optional[str]:
+    """Decide whether the current request is profiled and why ("signed" or "sampled")."""
+    if request.blueprint == profiling_bp.name or request.endpoint in (None, "static", "metrics.metrics"):
+        return None
+    if verify_profile_token(_request_token()):
+        return "signed"
+    if config.PROFILING_SAMPLE_RATE > 0 and random.random() < config.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+def _start_profile() -> None:
+    """before_request hook: start the configured profiler for selected requests."""
+    trigger = _should_profile()
+    if trigger is None:
+        return
+    if config.PROFILING_MODE == "sampling":
+        profiler = StackSampler(threading.get_ident(), config.PROFILING_SAMPLE_INTERVAL)
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Newer Pythons allow a single active cProfile per process; concurrent requests skip it.
+            logger.warning(f"Could not profile {request.path}: {str(e)}")
+            return
+    g.profile = (profiler, trigger, time.perf_counter())
+
+def _stop_profile() -> Optional[str]:
+    """Stop the request's profiler, write its profile and return the profile's file name."""
+    state = g.pop("profile", None)
+    if state is None:
+        return None
+    profiler, trigger, started = state
+    if isinstance(profiler, StackSampler):
+        profiler.stop()
+        extension = "folded"
+    else:
+        profiler.disable()
+        extension = "prof"
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    endpoint = re.sub(r"[^\w.]", "-", request.endpoint or "unknown")
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{endpoint}_{duration_ms}ms_{uuid.uuid4().hex[:8]}.{extension}"
+    try:
+        os.makedirs(config.PROFILING_DIR, exist_ok=True)
+        path = os.path.join(config.PROFILING_DIR, name)
+        if isinstance(profiler, StackSampler):
+            profiler.dump(path)
+        else:
+            profiler.dump_stats(path)
+        _profiles_written[trigger] += 1
+        rotate_profiles()
+        logger.info(f"Wrote {trigger} profile {name} for {request.method} {request.path}")
+        return name
+    except OSError as e:
+        logger.error(f"Error writing profile for {request.path}: {str(e)}")
+        return None
+
+def _finish_profile(response: Response) -> Response:
+    """after_request hook: write the profile and point the client to it."""
+    name = _stop_profile()
+    if name:
+        response.headers[PROFILE_ID_HEADER] = name
+    return response
+
+def _abort_profile(error: Optional[BaseException]) -> None:
+    """teardown_request hook: still write the profile when the view raised."""
+    _stop_profile()
+
+def rotate_profiles() -> None:
+    """Delete the oldest profiles beyond PROFILING_MAX_FILES."""
+    names = [name for name in os.listdir(config.PROFILING_DIR) if PROFILE_NAME_PATTERN.match(name)]
+    names.sort(key=lambda name: os.path.getmtime(os.path.join(config.PROFILING_DIR, name)))
+    for name in names[:max(len(names) - config.PROFILING_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(config.PROFILING_DIR, name))
+        except FileNotFoundError:
+            pass
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Describe the stored profiles, newest first."""
+    if not os.path.isdir(config.PROFILING_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(config.PROFILING_DIR):
+        match = PROFILE_NAME_PATTERN.match(name)
+        if not match:
+            continue
+        status = os.stat(os.path.join(config.PROFILING_DIR, name))
+        profiles.append({
+            "name": name,
+            "created": match["created"],
+            "endpoint": match["endpoint"],
+            "duration_ms": int(match["duration_ms"]),
+            "format": match["format"],
+            "size": status.st_size,
+            "modified": status.st_mtime
+        })
+    return sorted(profiles, key=lambda profile: profile["modified"], reverse=True)
+
+def _require_token() -> None:
+    if not verify_profile_token(_request_token()):
+        abort(403)
+
+@profiling_bp.route("/profiles", methods=["GET"])
+def profiles() -> Response:
+    """List stored request profiles.
+
+    Requires a profiling token in the X-Profile header or the `profile` query parameter.
+
+    Returns:
+        Response: JSON with the profiles, newest first.
+    """
+    _require_token()
+    return jsonify({"profiles": list_profiles(), "directory": config.PROFILING_DIR})
+
+@profiling_bp.route("/profiles/<name>", methods=["GET"])
+def download_profile(name: str) -> Response:
+    """Download one profile.
+
+    `.prof` files are cProfile dumps (open with pstats or snakeviz); `?format=text` returns
+    the top functions by cumulative time instead. `.folded` files are sampled stacks for
+    flame graph tools.
+
+    Args:
+        name: Profile file name as listed by /profiles.
+
+    Returns:
+        Response: The profile file, a text report, or 403/404.
+    """
+    _require_token()
+    if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(os.path.join(config.PROFILING_DIR, name)):
+        abort(404)
+    if request.args.get("format") == "text" and name.endswith(".prof"):
+        report = io.StringIO()
+        pstats.Stats(os.path.join(config.PROFILING_DIR, name), stream=report).sort_stats("cumulative").print_stats(TEXT_REPORT_LINES)
+        return Response(report.getvalue(), mimetype="text/plain")
+    return send_from_directory(os.path.abspath(config.PROFILING_DIR), name, as_attachment=True)
+
+def _profiling_metrics() -> Iterable[Metric]:
+    yield ("profiles_written_total", "counter", "Request profiles written, by trigger.",
+           [({"trigger": trigger}, count) for trigger, count in _profiles_written.items()])
+
+def init_profiling(app: Flask) -> None:
+    """Install the profiling hooks and endpoints when PROFILING_ENABLED is set.
+
+    Nothing is registered otherwise, so disabled profiling adds no per-request work.
+
+    Args:
+        app: Flask application instance.
+    """
+    if not config.PROFILING_ENABLED:
+        return
+    if not config.PROFILING_SECRET and config.PROFILING_SAMPLE_RATE <= 0:
+        logger.warning("Profiling is enabled but neither PROFILING_SECRET nor PROFILING_SAMPLE_RATE is set; no request will be profiled")
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abort_profile)
+    app.register_blueprint(profiling_bp)
+    register_collector(_profiling_metrics)
+    logger.info(f"Request profiling enabled ({config.PROFILING_MODE}, sample rate {config.PROFILING_SAMPLE_RATE:g}) writing to {config.PROFILING_DIR}")
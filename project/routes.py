@@ -1,30 +1,153 @@
-from typing import Dict, Union, List, Optional, Tuple
+from typing import Any, Dict, Union, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, jsonify, current_app, request, send_file
 import os
 import uuid
 import config
 from utils.file_handler import save_file, clean_file
-from utils.pdf_extractor import extract_pdf_text
+from utils.pdf_extractor import extract_pdf_text, PDF_ENGINES
 from utils.docx_extractor import extract_docx_text
 from utils.cv_processor import extract_png_text, parse_cv_text
 from utils.data_analyzer import analyze_text, generate_word_frequency_plot
 from utils.llm_analyzer import analyze_with_llm
-from utils.similarity_calculator import calculate_similarities
+from utils.similarity_calculator import preprocess_text, calculate_similarities, AVAILABLE_METRICS, DEFAULT_METRICS, CORPUS_METRICS
+from utils.similarity_cache import get_cached_similarities, cache_similarities
 from utils.translator import translate_to_english
-from db.database import store_job_description, store_cv, get_all_jobs, get_all_cvs
+from utils.embeddings import embed_tokens
+from utils.shard_client import ShardError
+from db.database import store_job_description, add_job_description, batch_transaction, store_cv, get_all_jobs, get_all_cvs, get_job_by_id, get_cv_by_id, get_cv_by_filename
+from db.corpus_stats import get_corpus_statistics, get_corpus_version
+from db.near_duplicates import find_near_duplicates_for_text, find_duplicate_pairs
+from db.keywords import find_cvs_by_keywords, normalize_keywords
+from db.keyword_bitsets import match_cvs_by_keyword_bitsets
+from db.search import search_documents
+from db.embeddings import nearest_documents, get_document_embedding
+from db.routing import read_only
+from http_cache import conditional
+from admission import StageTimeout, admission_controlled
 import logging
 
 logger = logging.getLogger(__name__)
 
+_upload_executor = ThreadPoolExecutor(max_workers=config.UPLOAD_WORKERS, thread_name_prefix="upload")
+
 api_bp = Blueprint("api", __name__)
 
+JsonResponse = Tuple[int, Dict[str, Any]]
+
+def find_llm_analysis_cv() -> Tuple[Optional[Dict[str, Any]], Optional[JsonResponse]]:
+    """Look up the CV that /analyze-llm analyzes, named by LLM_ANALYSIS_FILENAME.
+
+    Shared by the Flask view and its async counterpart in asgi.py.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[JsonResponse]]: The CV and None, or None and
+            the (status, payload) error response.
+    """
+    filename = config.LLM_ANALYSIS_FILENAME
+    if not filename or filename == "LLM_ANALYSIS_FILENAME":
+        logger.error("No valid filename defined in LLM_ANALYSIS_FILENAME in .env")
+        return None, (400, {"error": "No valid filename defined in LLM_ANALYSIS_FILENAME in .env"})
+
+    target_cv = get_cv_by_filename(filename)
+    if not target_cv:
+        logger.warning(f"No CV found with filename: {filename}")
+        return None, (404, {"error": f"No CV found with filename: {filename}"})
+    return target_cv, None
+
+def llm_analysis_response(filename: str, extracted_data: Dict[str, List[str]]) -> JsonResponse:
+    """Build the /analyze-llm response from the LLM's extracted data."""
+    logger.info(f"LLM analysis completed successfully for CV: {filename}")
+    return 200, {"message": "LLM analysis completed", "filename": filename, "extracted_data": extracted_data}
+
+def find_translation_text(job_id: Optional[str]) -> Tuple[Optional[str], Optional[JsonResponse]]:
+    """Pick the text /translate-to-english translates: JOB_TEXT_FOR_TRANSLATION, else the job's text.
+
+    Shared by the Flask view and its async counterpart in asgi.py.
+
+    Args:
+        job_id: The job_id query parameter, if given.
+
+    Returns:
+        Tuple[Optional[str], Optional[JsonResponse]]: The text and None, or None and the
+            (status, payload) error response.
+    """
+    job_text = config.JOB_TEXT_FOR_TRANSLATION
+
+    if not job_text and not job_id:
+        logger.error("No job text provided in JOB_TEXT_FOR_TRANSLATION (.env) or job_id (query parameter)")
+        return None, (400, {"error": "Job text must be provided via JOB_TEXT_FOR_TRANSLATION in .env or job_id via query (?job_id=X)"})
+
+    if not job_text:
+        job = get_job_by_id(job_id)
+        if not job:
+            logger.error(f"No job found with ID: {job_id}")
+            return None, (404, {"error": f"No job found with ID: {job_id}"})
+
+        job_text = job["text"]
+        logger.debug(f"Using job text from database for job_id={job_id}: {job_text[:200]}...")
+    else:
+        logger.debug(f"Using job text from .env: {job_text[:200]}...")
+    return job_text, None
+
+def translation_response(translated_text: Optional[str], job_id: Optional[str]) -> JsonResponse:
+    """Build the /translate-to-english response, an error if the translation failed."""
+    if translated_text is None:
+        logger.warning("Translation failed")
+        return 500, {"error": "Failed to translate job description"}
+
+    response = {
+        "message": "Translation completed",
+        "translated_text": translated_text
+    }
+    if job_id:
+        response["job_id"] = job_id
+
+    logger.info("Translation completed successfully")
+    return 200, response
+
+def _extract_job_file(saved_path: str, filename: str, pdf_engine: str) -> str:
+    """Extract the text of a saved job file and remove it from disk; runs on the upload executor.
+
+    Args:
+        saved_path: Path of the saved upload.
+        filename: Original filename, used to pick the extractor.
+        pdf_engine: PDF engine for PDF files.
+
+    Returns:
+        str: Extracted text.
+
+    Raises:
+        ValueError: If no text could be extracted.
+    """
+    try:
+        text = extract_pdf_text(saved_path, engine=pdf_engine) if filename.endswith(".pdf") else extract_docx_text(saved_path)
+        if not text:
+            raise ValueError("No text extracted")
+        return text
+    finally:
+        clean_file(saved_path)
+
 @api_bp.route("/upload-jobs", methods=["POST"])
+@admission_controlled("upload")
 def upload_jobs() -> Dict[str, Union[str, List[Dict[str, str]]]]:
     """Extract text from job description files (PDF/DOCX) and store them in the database.
 
+    Files are extracted concurrently on a bounded thread pool (UPLOAD_WORKERS). Each file gets
+    its own result, in upload order, with a status of "stored", "skipped" or "error"; the stored
+    job descriptions are committed together.
+
+    Query parameters:
+        pdf_engine: "fast", "layout" or "auto" to override PDF_EXTRACTION_ENGINE for this request.
+
     Returns:
-        Dict[str, Union[str, List[Dict[str, str]]]]: JSON response with extracted texts or error message.
+        Dict[str, Union[str, List[Dict[str, str]]]]: JSON response with per-file results or error message.
     """
+    pdf_engine = request.args.get("pdf_engine", config.PDF_EXTRACTION_ENGINE).lower()
+    if pdf_engine not in PDF_ENGINES:
+        logger.error(f"Invalid pdf_engine: {pdf_engine}")
+        return jsonify({"error": f"Invalid pdf_engine: {pdf_engine}. Use one of {', '.join(PDF_ENGINES)}."}), 400
+
     if "files" not in request.files:
         logger.error("No files provided in request")
         return jsonify({"error": "No files provided"}), 400
@@ -39,57 +162,72 @@ def upload_jobs() -> Dict[str, Union[str, List[Dict[str, str]]]]:
         logger.error(f"Too many files uploaded. Maximum allowed: {max_files}")
         return jsonify({"error": f"Too many files. Max {max_files} files allowed."}), 400
 
-    extracted_texts = []
-    pdf_count = 0
-    docx_count = 0
-    allowed_pdf_count = config.ALLOWED_PDF_COUNT
-    allowed_docx_count = config.ALLOWED_DOCX_COUNT
-
+    files = [file for file in files if file.filename]
     for file in files:
-        if not file.filename:
-            logger.warning("Skipping file with no filename")
-            continue
-
         if not (file.filename.endswith(".pdf") or file.filename.endswith(".docx")):
             logger.error(f"Unsupported file type: {file.filename}")
             return jsonify({"error": f"Unsupported file type: {file.filename}. Use PDF or DOCX."}), 400
 
-        if file.filename.endswith(".pdf") and pdf_count >= allowed_pdf_count:
-            logger.error(f"Exceeded limit of {allowed_pdf_count} PDF files")
-            return jsonify({"error": f"Exceeded limit of {allowed_pdf_count} PDF files"}), 400
-        if file.filename.endswith(".docx") and docx_count >= allowed_docx_count:
-            logger.error(f"Exceeded limit of {allowed_docx_count} DOCX files")
-            return jsonify({"error": f"Exceeded limit of {allowed_docx_count} DOCX files"}), 400
-
-        unique_filename = f"{uuid.uuid4()}_{file.filename}"
-        file_path = os.path.join(config.UPLOAD_FOLDER, unique_filename)
-
+    allowed_pdf_count = config.ALLOWED_PDF_COUNT
+    allowed_docx_count = config.ALLOWED_DOCX_COUNT
+    if sum(1 for file in files if file.filename.endswith(".pdf")) > allowed_pdf_count:
+        logger.error(f"Exceeded limit of {allowed_pdf_count} PDF files")
+        return jsonify({"error": f"Exceeded limit of {allowed_pdf_count} PDF files"}), 400
+    if sum(1 for file in files if file.filename.endswith(".docx")) > allowed_docx_count:
+        logger.error(f"Exceeded limit of {allowed_docx_count} DOCX files")
+        return jsonify({"error": f"Exceeded limit of {allowed_docx_count} DOCX files"}), 400
+
+    pending = []
+    for file in files:
+        file_path = os.path.join(config.UPLOAD_FOLDER, f"{uuid.uuid4()}_{file.filename}")
         saved_path = save_file(file, file_path)
         if not saved_path:
             logger.warning(f"Failed to save file: {file.filename}")
+            pending.append((file.filename, None))
             continue
+        pending.append((file.filename, _upload_executor.submit(_extract_job_file, saved_path, file.filename, pdf_engine)))
 
-        try:
-            text = extract_pdf_text(saved_path) if file.filename.endswith(".pdf") else extract_docx_text(saved_path)
-            if file.filename.endswith(".pdf"):
-                pdf_count += 1
-            else:
-                docx_count += 1
-
-            extracted_texts.append({"filename": file.filename, "text": text})
-            store_job_description(file.filename, text)
-            logger.info(f"Successfully processed and stored job file: {file.filename}")
-        except Exception as e:
-            logger.error(f"Error processing {file.filename}: {str(e)}")
-            clean_file(saved_path)
-            return jsonify({"error": f"Error processing {file.filename}: {str(e)}"}), 500
-        finally:
-            clean_file(saved_path)
+    results = []
+    try:
+        with batch_transaction():
+            for filename, future in pending:
+                entry = {"filename": filename}
+                results.append(entry)
+                if future is None:
+                    entry.update(status="error", error="Failed to save file")
+                    continue
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logger.error(f"Error extracting {filename}: {str(e)}")
+                    entry.update(status="error", error=f"Error processing {filename}: {str(e)}")
+                    continue
+
+                entry["text"] = text
+                duplicates = find_near_duplicates_for_text("job", text, config.NEAR_DUPLICATE_THRESHOLD)
+                if duplicates:
+                    logger.warning(f"Job file {filename} is a near-duplicate of job IDs {[d['id'] for d in duplicates]}")
+                    entry["near_duplicates"] = duplicates
+                    if config.NEAR_DUPLICATE_ACTION == "skip":
+                        entry.update(status="skipped", duplicate_of=duplicates[0]["id"])
+                        logger.info(f"Skipped job file {filename}, a near-duplicate of job ID {duplicates[0]['id']}")
+                        continue
+
+                job_id = add_job_description(filename, text)
+                if job_id is None:
+                    entry.update(status="error", error=f"Error storing {filename}")
+                else:
+                    entry.update(status="stored", id=job_id)
+    except Exception as e:
+        logger.error(f"Error storing job files: {str(e)}")
+        return jsonify({"error": f"Error storing job files: {str(e)}"}), 500
 
-    logger.info(f"Processed {len(extracted_texts)} job files successfully")
-    return jsonify({"extracted_texts": extracted_texts})
+    failed = sum(1 for entry in results if entry["status"] == "error")
+    logger.info(f"Processed {len(results) - failed} of {len(results)} job files successfully")
+    return jsonify({"extracted_texts": results, "failed": failed})
 
 @api_bp.route("/upload-cv", methods=["POST"])
+@admission_controlled("ocr")
 def upload_cv() -> Dict[str, Union[str, List[str]]]:
     """Extract qualifications, skills, and experience from a juriste's CV (PNG) and store in the database.
 
@@ -125,6 +263,22 @@ def upload_cv() -> Dict[str, Union[str, List[str]]]:
             return jsonify({"error": "No text extracted from CV"}), 400
 
         parsed_data = parse_cv_text(text)
+        response = {
+            "filename": file.filename,
+            "qualifications": parsed_data["qualifications"],
+            "skills": parsed_data["skills"],
+            "experience": parsed_data["experience"]
+        }
+
+        duplicates = find_near_duplicates_for_text("cv", text, config.NEAR_DUPLICATE_THRESHOLD)
+        if duplicates:
+            logger.warning(f"CV {file.filename} is a near-duplicate of CV IDs {[d['id'] for d in duplicates]}")
+            response["near_duplicates"] = duplicates
+            if config.NEAR_DUPLICATE_ACTION == "skip":
+                response["duplicate_of"] = duplicates[0]["id"]
+                logger.info(f"Skipped CV {file.filename}, a near-duplicate of CV ID {duplicates[0]['id']}")
+                return jsonify(response)
+
         store_cv(
             file.filename,
             text,
@@ -133,12 +287,9 @@ def upload_cv() -> Dict[str, Union[str, List[str]]]:
             parsed_data["experience"]
         )
         logger.info(f"Successfully processed and stored CV: {file.filename}")
-        return jsonify({
-            "filename": file.filename,
-            "qualifications": parsed_data["qualifications"],
-            "skills": parsed_data["skills"],
-            "experience": parsed_data["experience"]
-        })
+        return jsonify(response)
+    except StageTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error processing CV {file.filename}: {str(e)}")
         return jsonify({"error": f"Error processing CV: {str(e)}"}), 500
@@ -191,15 +342,21 @@ def store_data() -> Dict[str, Union[str, List[int], int]]:
         return jsonify({"error": f"Error storing data: {str(e)}"}), 500
 
 @api_bp.route("/view-data", methods=["GET"])
+@read_only
+@conditional()
 def view_data() -> Dict[str, Union[List[Dict[str, Union[int, str]]], List[Dict[str, Union[int, str, List[str]]]]]]:
     """Retrieve all stored job descriptions and CVs from the PostgreSQL database.
 
+    Query parameters:
+        include_text: "false" to list documents without their full text (default "true").
+
     Returns:
         Dict[str, Union[List[Dict[str, Union[int, str]]], List[Dict[str, Union[int, str, List[str]]]]]]: JSON response with jobs and CVs data or error message.
     """
     try:
-        jobs = get_all_jobs()
-        cvs = get_all_cvs()
+        include_text = request.args.get("include_text", "true").lower() != "false"
+        jobs = get_all_jobs(include_text=include_text)
+        cvs = get_all_cvs(include_text=include_text)
         logger.info(f"Retrieved {len(jobs)} jobs and {len(cvs)} CVs from database")
         return jsonify({"jobs": jobs, "cvs": cvs})
     except Exception as e:
@@ -207,6 +364,8 @@ def view_data() -> Dict[str, Union[List[Dict[str, Union[int, str]]], List[Dict[s
         return jsonify({"error": f"Error retrieving data: {str(e)}"}), 500
 
 @api_bp.route("/analyze-jobs", methods=["GET"])
+@read_only
+@conditional()
 def analyze_jobs() -> Dict[str, Union[str, List[Tuple[str, int]], str, Dict[str, float]]]:
     """Analyze job descriptions and generate a word frequency visualization.
 
@@ -237,6 +396,8 @@ def analyze_jobs() -> Dict[str, Union[str, List[Tuple[str, int]], str, Dict[str,
         return jsonify({"error": f"Error analyzing job descriptions: {str(e)}"}), 500
 
 @api_bp.route("/analyze-llm", methods=["GET"])
+@admission_controlled("llm")
+@read_only
 def analyze_llm() -> Dict[str, Union[str, Dict[str, List[str]]]]:
     """Analyze a specific CV using a pre-trained LLM.
 
@@ -244,34 +405,29 @@ def analyze_llm() -> Dict[str, Union[str, Dict[str, List[str]]]]:
         Dict[str, Union[str, Dict[str, List[str]]]]: JSON response with extracted data or error message.
     """
     try:
-        filename = config.LLM_ANALYSIS_FILENAME
-        if not filename or filename == "LLM_ANALYSIS_FILENAME":
-            logger.error("No valid filename defined in LLM_ANALYSIS_FILENAME in .env")
-            return jsonify({"error": "No valid filename defined in LLM_ANALYSIS_FILENAME in .env"}), 400
-
-        cvs = get_all_cvs()
-        target_cv = next((cv for cv in cvs if cv["filename"] == filename), None)
-        if not target_cv:
-            logger.warning(f"No CV found with filename: {filename}")
-            return jsonify({"error": f"No CV found with filename: {filename}"}), 404
-
-        cv_text = [target_cv["text"]]
-        extracted_data = analyze_with_llm(cv_text)
-
-        logger.info(f"LLM analysis completed successfully for CV: {filename}")
-        return jsonify({
-            "message": "LLM analysis completed",
-            "filename": filename,
-            "extracted_data": extracted_data
-        })
+        target_cv, error = find_llm_analysis_cv()
+        if error:
+            return jsonify(error[1]), error[0]
+
+        extracted_data = analyze_with_llm([target_cv["text"]])
+        status, payload = llm_analysis_response(target_cv["filename"], extracted_data)
+        return jsonify(payload), status
+    except StageTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error during LLM analysis: {str(e)}")
         return jsonify({"error": f"Error during LLM analysis: {str(e)}"}), 500
 
 @api_bp.route("/calculate-similarities", methods=["GET"])
+@read_only
+@conditional()
 def calculate_similarities_endpoint() -> Dict[str, Union[str, Dict[str, float]]]:
     """Calculate Cosine Similarity, Levenshtein Distance, and Jaccard Index between a job description and CV.
 
+    Results are served from the similarity cache when both documents are unchanged since
+    the last calculation. An optional `metrics` query parameter selects the metric set,
+    including the corpus-weighted TF-IDF cosine similarity and BM25 score.
+
     Returns:
         Dict[str, Union[str, Dict[str, float]]]: JSON response with similarity metrics or error message.
     """
@@ -283,37 +439,62 @@ def calculate_similarities_endpoint() -> Dict[str, Union[str, Dict[str, float]]]
             logger.error("No job or CV ID provided in query or environment")
             return jsonify({"error": "Job ID and CV ID must be provided via query parameters (?job_id=X&cv_id=Y) or .env"}), 400
 
-        jobs = get_all_jobs()
-        cvs = get_all_cvs()
-
-        if not jobs or not cvs:
-            logger.error("No job descriptions or CVs found in the database")
-            return jsonify({"error": "No job descriptions or CVs available for comparison"}), 404
+        requested = request.args.get("metrics")
+        metrics = [m.strip() for m in requested.split(",") if m.strip()] if requested else list(DEFAULT_METRICS)
+        unknown = [m for m in metrics if m not in AVAILABLE_METRICS]
+        if unknown:
+            logger.error(f"Unknown similarity metrics requested: {unknown}")
+            return jsonify({"error": f"Unknown metrics: {', '.join(unknown)}. Available: {', '.join(AVAILABLE_METRICS)}"}), 400
 
-        job = next((j for j in jobs if str(j["id"]) == str(job_id)), None)
-        cv = next((c for c in cvs if str(c["id"]) == str(cv_id)), None)
+        job = get_job_by_id(job_id, include_text=False)
+        cv = get_cv_by_id(cv_id, include_text=False)
 
         if not job or not cv:
             logger.error(f"No job or CV found with IDs: job_id={job_id}, cv_id={cv_id}")
             return jsonify({"error": f"No job or CV found with IDs: job_id={job_id}, cv_id={cv_id}"}), 404
 
-        logger.debug(f"Raw job text: {job['text'][:200]}...")
-        logger.debug(f"Raw CV text: {cv['text'][:200]}...")
-
-        similarities = calculate_similarities(job["text"], cv["text"])
+        corpus_version = get_corpus_version() if any(m in CORPUS_METRICS for m in metrics) else None
+        similarities = get_cached_similarities(job["id"], job["text_hash"], cv["id"], cv["text_hash"], metrics, corpus_version)
+        cached = similarities is not None
+        if not cached:
+            job_text = get_job_by_id(job_id)["text"]
+            cv_text = get_cv_by_id(cv_id)["text"]
+            logger.debug(f"Raw job text: {job_text[:200]}...")
+            logger.debug(f"Raw CV text: {cv_text[:200]}...")
+
+            corpora: List[Dict[str, Any]] = []
+
+            def corpus_lookup(terms: List[str]) -> Dict[str, Any]:
+                corpora.append(get_corpus_statistics(terms))
+                return corpora[-1]
+
+            similarities = calculate_similarities(
+                job_text,
+                cv_text,
+                metrics,
+                corpus_lookup=corpus_lookup,
+                k1=config.BM25_K1,
+                b=config.BM25_B
+            )
+            # get_corpus_statistics reports an empty corpus when it cannot read the statistics.
+            corpus_available = all(corpus["document_count"] for corpus in corpora)
+            cache_similarities(job["id"], job["text_hash"], cv["id"], cv["text_hash"], metrics, similarities, corpus_version, corpus_available)
 
         logger.info(f"Similarity calculations completed for job_id={job_id} and cv_id={cv_id}")
         return jsonify({
             "message": "Similarity metrics calculated",
             "job_id": job_id,
             "cv_id": cv_id,
-            "similarities": similarities
+            "similarities": similarities,
+            "cached": cached
         })
     except Exception as e:
         logger.error(f"Error calculating similarities: {str(e)}")
         return jsonify({"error": f"Error calculating similarities: {str(e)}"}), 500
 
 @api_bp.route("/translate-to-english", methods=["GET"])
+@admission_controlled("translation")
+@read_only
 def translate_to_english_endpoint() -> Dict[str, Union[str, Optional[str]]]:
     """Translate a job description to English, prioritizing text from .env or falling back to database by ID.
 
@@ -322,46 +503,262 @@ def translate_to_english_endpoint() -> Dict[str, Union[str, Optional[str]]]:
     """
     try:
         job_id = request.args.get("job_id")
-        job_text = config.JOB_TEXT_FOR_TRANSLATION
+        job_text, error = find_translation_text(job_id)
+        if error:
+            return jsonify(error[1]), error[0]
+
+        status, payload = translation_response(translate_to_english(job_text), job_id)
+        return jsonify(payload), status
+    except StageTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error translating job description: {str(e)}")
+        return jsonify({"error": f"Error translating job description: {str(e)}"}), 500
+
+@api_bp.route("/search", methods=["GET"])
+@read_only
+@conditional()
+def search() -> Dict[str, Union[str, int, List[Dict[str, Union[int, str, float]]]]]:
+    """Full-text search over stored job descriptions and CVs with ranked, paginated results.
+
+    Returns:
+        Dict[str, Union[str, int, List[Dict[str, Union[int, str, float]]]]]: JSON response with matching documents and snippets or error message.
+    """
+    try:
+        query = request.args.get("q", "").strip()
+        if not query:
+            logger.error("No search query provided")
+            return jsonify({"error": "A search query must be provided via ?q=..."}), 400
+
+        doc_type = request.args.get("doc_type")
+        if doc_type and doc_type not in ("job", "cv"):
+            logger.error(f"Invalid doc_type for search: {doc_type}")
+            return jsonify({"error": "doc_type must be 'job' or 'cv'"}), 400
+
+        try:
+            page = max(int(request.args.get("page", 1)), 1)
+            per_page = min(max(int(request.args.get("per_page", 20)), 1), 100)
+        except ValueError:
+            logger.error("Invalid page or per_page for search")
+            return jsonify({"error": "page and per_page must be integers"}), 400
+
+        result = search_documents(query, doc_type, page, per_page)
+        logger.info(f"Search for '{query}' returned {len(result['results'])} of {result['total']} matches")
+        return jsonify({
+            "message": "Search completed",
+            "query": query,
+            "page": page,
+            "per_page": per_page,
+            "total": result["total"],
+            "results": result["results"]
+        })
+    except Exception as e:
+        logger.error(f"Error searching documents: {str(e)}")
+        return jsonify({"error": f"Error searching documents: {str(e)}"}), 500
+
+@api_bp.route("/nearest", methods=["GET"])
+@read_only
+@conditional()
+def nearest() -> Dict[str, Union[str, int, List[Dict[str, Union[int, str, float]]]]]:
+    """Find the documents semantically closest to a text, a job description or a CV.
+
+    The query is given as ?q=<text>, ?job_id=<id> or ?cv_id=<id>. A job is matched against CVs
+    and a CV against jobs unless doc_type says otherwise; free text searches both.
+
+    Returns:
+        Dict[str, Union[str, int, List[Dict[str, Union[int, str, float]]]]]: JSON response with the nearest documents or error message.
+    """
+    try:
+        sources = {name: request.args.get(name, "").strip() for name in ("q", "job_id", "cv_id")}
+        given = [name for name, value in sources.items() if value]
+        if len(given) != 1:
+            logger.error(f"Invalid nearest-neighbour query: {given}")
+            return jsonify({"error": "Exactly one of ?q=..., ?job_id=... or ?cv_id=... must be provided"}), 400
+
+        doc_type = request.args.get("doc_type")
+        if doc_type and doc_type not in ("job", "cv"):
+            logger.error(f"Invalid doc_type for nearest: {doc_type}")
+            return jsonify({"error": "doc_type must be 'job' or 'cv'"}), 400
+
+        try:
+            k = min(max(int(request.args.get("k", 10)), 1), 100)
+        except ValueError:
+            logger.error("Invalid k for nearest")
+            return jsonify({"error": "k must be an integer"}), 400
+
+        source = given[0]
+        exclude = None
+        if source == "q":
+            vector = embed_tokens(preprocess_text(sources["q"]))
+            doc_types = [doc_type] if doc_type else ["job", "cv"]
+        else:
+            source_type = "job" if source == "job_id" else "cv"
+            try:
+                source_id = int(sources[source])
+            except ValueError:
+                logger.error(f"Invalid {source} for nearest: {sources[source]}")
+                return jsonify({"error": f"{source} must be an integer"}), 400
+            vector = get_document_embedding(source_type, source_id)
+            if vector is None:
+                document = get_job_by_id(source_id) if source_type == "job" else get_cv_by_id(source_id)
+                if not document:
+                    logger.error(f"No {source_type} found with ID {source_id}")
+                    return jsonify({"error": f"No {source_type} found with ID {source_id}"}), 404
+                vector = embed_tokens(preprocess_text(document["text"]))
+            doc_types = [doc_type or ("cv" if source_type == "job" else "job")]
+            exclude = (source_type, source_id)
+
+        try:
+            results = nearest_documents(vector, doc_types, k, exclude)
+        except ShardError as e:
+            logger.error(f"Nearest-neighbour search unavailable: {str(e)}")
+            return jsonify({"error": f"Nearest-neighbour search unavailable: {str(e)}"}), 503
+        logger.info(f"Nearest-neighbour search by {source} returned {len(results)} documents")
+        return jsonify({
+            "message": "Nearest documents found",
+            "query": {source: sources[source]},
+            "k": k,
+            "results": results
+        })
+    except Exception as e:
+        logger.error(f"Error finding nearest documents: {str(e)}")
+        return jsonify({"error": f"Error finding nearest documents: {str(e)}"}), 500
+
+@api_bp.route("/filter-cvs", methods=["GET"])
+@read_only
+@conditional()
+def filter_cvs() -> Dict[str, Union[str, int, List[Dict[str, Union[int, str, List[str]]]]]]:
+    """Filter candidates by any combination of skills, qualifications and experience keywords.
 
-        if not job_text and not job_id:
-            logger.error("No job text provided in JOB_TEXT_FOR_TRANSLATION (.env) or job_id (query parameter)")
-            return jsonify({"error": "Job text must be provided via JOB_TEXT_FOR_TRANSLATION in .env or job_id via query (?job_id=X)"}), 400
+    Returns:
+        Dict[str, Union[str, int, List[Dict[str, Union[int, str, List[str]]]]]]: JSON response with matching CVs or error message.
+    """
+    try:
+        keywords = {
+            category: [k for k in request.args.get(category, "").split(",") if k.strip()]
+            for category in ("qualifications", "skills", "experience")
+        }
+        match = request.args.get("match", "all")
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+            offset = max(int(request.args.get("offset", 0)), 0)
+        except ValueError:
+            logger.error("Invalid limit or offset for CV filter")
+            return jsonify({"error": "limit and offset must be integers"}), 400
 
-        if not job_text:
-            jobs = get_all_jobs()
-            if not jobs:
-                logger.error("No job descriptions found in the database")
-                return jsonify({"error": "No job descriptions available for translation"}), 404
+        try:
+            result = find_cvs_by_keywords(match=match, limit=limit, offset=offset, **keywords)
+        except ValueError as e:
+            logger.error(f"Invalid CV filter: {str(e)}")
+            return jsonify({"error": str(e)}), 400
 
-            job = next((j for j in jobs if str(j["id"]) == str(job_id)), None)
+        logger.info(f"CV filter matched {result['total']} CVs")
+        return jsonify({
+            "message": "CVs filtered",
+            "match": match,
+            "total": result["total"],
+            "limit": limit,
+            "offset": offset,
+            "cvs": result["cvs"]
+        })
+    except Exception as e:
+        logger.error(f"Error filtering CVs: {str(e)}")
+        return jsonify({"error": f"Error filtering CVs: {str(e)}"}), 500
+
+@api_bp.route("/match-cvs", methods=["GET"])
+@read_only
+@conditional()
+def match_cvs() -> Dict[str, Union[str, int, float, List[Dict[str, Union[int, str, float, List[str]]]]]]:
+    """Rank every CV by keyword Jaccard and coverage against a job's required keywords.
+
+    The required keywords are parsed from the job description given by job_id and/or
+    listed in the qualifications, skills and experience parameters; must_qualifications,
+    must_skills and must_experience exclude CVs lacking any of the listed keywords.
+
+    Returns:
+        Dict[str, Union[str, int, float, List[Dict[str, Union[int, str, float, List[str]]]]]]: JSON response with ranked CVs or error message.
+    """
+    try:
+        categories = ("qualifications", "skills", "experience")
+        required = {category: request.args.get(category, "").split(",") for category in categories}
+        must_have = {category: normalize_keywords(request.args.get(f"must_{category}", "").split(",")) for category in categories}
+        sort = request.args.get("sort", "jaccard")
+        try:
+            job_id = request.args.get("job_id", type=int)
+            min_coverage = float(request.args.get("min_coverage", 0))
+            limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+            offset = max(int(request.args.get("offset", 0)), 0)
+        except ValueError:
+            logger.error("Invalid numeric parameter for CV matching")
+            return jsonify({"error": "min_coverage must be a number; limit and offset must be integers"}), 400
+        if request.args.get("job_id") and job_id is None:
+            logger.error(f"Invalid job_id for CV matching: {request.args.get('job_id')}")
+            return jsonify({"error": "job_id must be an integer"}), 400
+
+        if job_id is not None:
+            job = get_job_by_id(job_id)
             if not job:
                 logger.error(f"No job found with ID: {job_id}")
                 return jsonify({"error": f"No job found with ID: {job_id}"}), 404
+            for category, terms in parse_cv_text(job["text"]).items():
+                required[category] += terms
+        required = {category: normalize_keywords(terms) for category, terms in required.items()}
 
-            job_text = job["text"]
-            logger.debug(f"Using job text from database for job_id={job_id}: {job_text[:200]}...")
-        else:
-            logger.debug(f"Using job text from .env: {job_text[:200]}...")
+        try:
+            result = match_cvs_by_keyword_bitsets(required, must_have, min_coverage=min_coverage, sort=sort, limit=limit, offset=offset)
+        except ValueError as e:
+            logger.error(f"Invalid CV match: {str(e)}")
+            return jsonify({"error": str(e)}), 400
 
-        translated_text = translate_to_english(job_text)
+        logger.info(f"CV match ranked {result['total']} CVs")
+        return jsonify({
+            "message": "CVs matched",
+            "job_id": job_id,
+            "required": required,
+            "must_have": must_have,
+            "sort": sort,
+            "min_coverage": min_coverage,
+            "total": result["total"],
+            "limit": limit,
+            "offset": offset,
+            "cvs": result["cvs"]
+        })
+    except Exception as e:
+        logger.error(f"Error matching CVs: {str(e)}")
+        return jsonify({"error": f"Error matching CVs: {str(e)}"}), 500
 
-        if translated_text is None:
-            logger.warning("Translation failed")
-            return jsonify({"error": "Failed to translate job description"}), 500
+@api_bp.route("/duplicates", methods=["GET"])
+@read_only
+@conditional()
+def duplicates_report() -> Dict[str, Union[str, float, Dict[str, List[Dict[str, Union[int, str, float]]]]]]:
+    """Report near-duplicate job descriptions and CVs found through the MinHash LSH index.
 
-        response = {
-            "message": "Translation completed",
-            "translated_text": translated_text
-        }
-        if job_id:
-            response["job_id"] = job_id
+    Returns:
+        Dict[str, Union[str, float, Dict[str, List[Dict[str, Union[int, str, float]]]]]]: JSON response with duplicate pairs per document type or error message.
+    """
+    try:
+        doc_type = request.args.get("doc_type")
+        if doc_type and doc_type not in ("job", "cv"):
+            logger.error(f"Invalid doc_type for duplicates report: {doc_type}")
+            return jsonify({"error": "doc_type must be 'job' or 'cv'"}), 400
 
-        logger.info("Translation completed successfully")
-        return jsonify(response)
+        try:
+            threshold = float(request.args.get("threshold", config.NEAR_DUPLICATE_THRESHOLD))
+        except ValueError:
+            logger.error("Invalid threshold for duplicates report")
+            return jsonify({"error": "threshold must be a number between 0 and 1"}), 400
+
+        doc_types = [doc_type] if doc_type else ["job", "cv"]
+        duplicates = {t: find_duplicate_pairs(t, threshold) for t in doc_types}
+        logger.info(f"Duplicates report generated: {', '.join(f'{t}={len(p)}' for t, p in duplicates.items())}")
+        return jsonify({
+            "message": "Duplicates report generated",
+            "threshold": threshold,
+            "duplicates": duplicates
+        })
     except Exception as e:
-        logger.error(f"Error translating job description: {str(e)}")
-        return jsonify({"error": f"Error translating job description: {str(e)}"}), 500
+        logger.error(f"Error generating duplicates report: {str(e)}")
+        return jsonify({"error": f"Error generating duplicates report: {str(e)}"}), 500
 
 @api_bp.route("/view-analysis", methods=["GET"])
 def view_analysis() -> str:
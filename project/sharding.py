@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, Tuple, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import json
+import logging
+from flask import Flask
+import config
+from db.embeddings import DOCUMENT_MODELS, VECTOR_BYTES, get_embedding_index
+from metrics import Metric, register_collector
+from utils.embeddings import embedding_from_bytes
+from utils.shard_client import encode_hits, shard_stats
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = 1024 * 1024
+MAX_K = 1000
+
+class ShardRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler of a shard worker.
+
+    POST /search?doc_type=&k=[&exclude_id=] takes the query as raw float32 little-endian bytes
+    and returns the hits as HIT_DTYPE records, most similar first, with the shard position in
+    the X-Shard and X-Shards headers. Connections are kept alive between queries. Errors and
+    GET /health, which reports the number of documents held per type, answer in JSON.
+    """
+
+    app: Flask
+    shard: Tuple[int, int]
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, a kept-alive connection waits on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, payload: Dict[str, Union[int, str, list, dict]]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _position(self) -> Dict[str, int]:
+        return {"shard": self.shard[0], "shards": self.shard[1]}
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            with self.app.app_context():
+                documents = {}
+                for doc_type in DOCUMENT_MODELS:
+                    index = get_embedding_index(doc_type, self.shard)
+                    index.sync()
+                    documents[doc_type] = index.live_count()
+            self._send_json(200, {**self._position(), "documents": documents})
+        except Exception as e:
+            logger.error(f"Error checking shard health: {str(e)}")
+            self._send_json(500, {**self._position(), "error": str(e)})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/search":
+            self.close_connection = True
+            self._send_json(404, {"error": f"Unknown path: {url.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if not 0 < length <= MAX_REQUEST_BYTES:
+                self.close_connection = True
+                raise ValueError("request body missing or too large")
+            vector = self.rfile.read(length)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            doc_type, k = params["doc_type"], int(params["k"])
+            exclude_id = int(params["exclude_id"]) if "exclude_id" in params else None
+            if doc_type not in DOCUMENT_MODELS or not 0 < k <= MAX_K:
+                raise ValueError(f"doc_type must be 'job' or 'cv' and k between 1 and {MAX_K}")
+            if len(vector) != VECTOR_BYTES:
+                raise ValueError(f"vector must have {config.EMBEDDING_DIM} float32 components")
+            query = embedding_from_bytes(vector)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Invalid shard search request: {str(e)}")
+            self._send_json(400, {**self._position(), "error": f"Invalid search request: {str(e)}"})
+            return
+        try:
+            with self.app.app_context():
+                index = get_embedding_index(doc_type, self.shard)
+                index.sync()
+                hits = index.search(query, k, exclude_id)
+        except Exception as e:
+            logger.error(f"Error searching shard {self.shard[0]} of {self.shard[1]}: {str(e)}")
+            self._send_json(500, {**self._position(), "error": str(e)})
+            return
+        body = encode_hits(hits)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Shard", str(self.shard[0]))
+        self.send_header("X-Shards", str(self.shard[1]))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+def serve_shard(app: Flask, shard: int, shard_count: int, host: str, port: int) -> None:
+    """Serve top-k embedding searches over one shard of the corpus until interrupted.
+
+    The shard holds the documents whose ID modulo shard_count is shard, read from the same
+    database as the application. Its matrices are built before the socket opens, so a
+    coordinator never waits on the initial sync.
+
+    Args:
+        app: Flask application instance, for database access.
+        shard: Index of the shard served, from 0.
+        shard_count: Total number of shards.
+        host: Interface to listen on.
+        port: TCP port to listen on.
+    """
+    with app.app_context():
+        for doc_type in DOCUMENT_MODELS:
+            index = get_embedding_index(doc_type, (shard, shard_count))
+            index.sync()
+            logger.info(f"Shard {shard} of {shard_count} holds {index.live_count()} {doc_type} embeddings")
+    handler = type("BoundShardRequestHandler", (ShardRequestHandler,), {"app": app, "shard": (shard, shard_count)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info(f"Serving shard {shard} of {shard_count} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def _sharding_metrics() -> Iterable[Metric]:
+    stats = shard_stats()
+    yield ("shard_requests_total", "counter", "Scatter-gather queries sent per shard.",
+           [({"shard": str(shard)}, values["requests"]) for shard, values in stats.items()])
+    yield ("shard_errors_total", "counter", "Shard queries that failed or timed out.",
+           [({"shard": str(shard)}, values["errors"]) for shard, values in stats.items()])
+    yield ("shard_request_seconds_total", "counter", "Cumulative latency of shard queries.",
+           [({"shard": str(shard)}, values["seconds"]) for shard, values in stats.items()])
+
+def init_sharding(app: Flask) -> None:
+    """Expose shard query metrics when the application coordinates shard workers (SHARD_URLS).
+
+    Args:
+        app: Flask application instance.
+    """
+    if not config.SHARD_URLS:
+        return
+    register_collector(_sharding_metrics)
+    logger.info(f"Scattering nearest-neighbour rankings to {len(config.SHARD_URLS)} shard workers")
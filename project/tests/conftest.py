@@ -0,0 +1,52 @@
+"""Shared fixtures: a throwaway environment for the application, set before config is imported.
+
+Run from the project directory with `python -m pytest -q`.
+"""
+from typing import Iterator
+import os
+import sys
+import tempfile
+import pytest
+from flask import Flask
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="tests_")
+
+# Assigned rather than defaulted, so a developer's .env never points the tests at a real database.
+TEST_ENV = {
+    "UPLOAD_FOLDER": os.path.join(WORK_DIR, "uploads"),
+    "MAX_FILES": "40",
+    "ALLOWED_PDF_COUNT": "20",
+    "ALLOWED_DOCX_COUNT": "20",
+    "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(WORK_DIR, 'tests.sqlite')}",
+    "SQLALCHEMY_TRACK_MODIFICATIONS": "false",
+    "GEMINI_API_KEY": "test-key",
+    "LLM_ANALYSIS_PROMPT": "Analyze {text}",
+    "LLM_ANALYSIS_FILENAME": "cv.png",
+    "JOB_ID_FOR_SIMILARITY": "1",
+    "CV_ID_FOR_SIMILARITY": "1",
+    "JOB_TEXT_FOR_TRANSLATION": "Bonjour",
+    "QUALIFICATIONS_KEYWORDS": "master,llm,bar",
+    "SKILLS_KEYWORDS": "litigation,contracts,compliance,negotiation",
+    "EXPERIENCE_KEYWORDS": "years,senior,junior",
+    "JOB_DESCRIPTIONS_TABLE": "job_descriptions",
+    "CVS_TABLE": "cvs",
+    "EMBEDDING_INDEX_DIR": os.path.join(WORK_DIR, "embedding_index"),
+    "SHARD_URLS": "",
+}
+os.environ.update(TEST_ENV)
+sys.path.insert(0, PROJECT_DIR)
+
+@pytest.fixture(scope="session")
+def app() -> Flask:
+    """Application bound to the test database, created once per session."""
+    from app import create_app
+    return create_app()
+
+@pytest.fixture
+def app_context(app: Flask) -> Iterator[None]:
+    """Application context with the session rolled back afterwards."""
+    from db.models import db
+    with app.app_context():
+        yield
+        db.session.rollback()
@@ -0,0 +1,124 @@
+"""Async /analyze-llm and /translate-to-english of asgi.py against fake upstreams with injected latency."""
+from typing import Dict, Iterator, List
+import asyncio
+import socket
+import threading
+import time
+import httpx
+import pytest
+import uvicorn
+from benchmarks.bench_async_llm import FakeUpstream
+
+LATENCY = 0.5
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture(scope="module")
+def upstream() -> Iterator[FakeUpstream]:
+    """Fake Gemini and Translate server answering after LATENCY seconds, on a background thread."""
+    fake = FakeUpstream(LATENCY)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(fake, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    fake.url = f"http://127.0.0.1:{port}"
+    yield fake
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture
+def asgi(app, upstream, monkeypatch):
+    """asgi module pointed at the fake upstream, with fresh limiters and HTTP client for this test's event loop."""
+    import asgi
+    import config
+    from db.database import add_cv, batch_transaction
+    from db.models import CV
+    with app.app_context():
+        if CV.query.filter_by(filename=config.LLM_ANALYSIS_FILENAME).first() is None:
+            with batch_transaction():
+                add_cv(config.LLM_ANALYSIS_FILENAME, "Avocat, master en droit, contentieux et contrats.", ["master"], ["litigation"], ["years"])
+    monkeypatch.setattr(config, "GEMINI_API_BASE_URL", upstream.url)
+    monkeypatch.setattr(config, "TRANSLATION_BASE_URL", upstream.url)
+    monkeypatch.setattr(asgi, "_http_client", None)
+    monkeypatch.setattr(asgi, "LIMITERS", {name: asgi.AsyncStageLimiter(name, 100) for name in asgi.LIMITERS})
+    upstream.peak_in_flight = 0
+    return asgi
+
+def _get_concurrently(asgi, path: str, count: int) -> List[httpx.Response]:
+    async def run() -> List[httpx.Response]:
+        transport = httpx.ASGITransport(app=asgi.application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=None) as client:
+            try:
+                return await asyncio.gather(*(client.get(path) for _ in range(count)))
+            finally:
+                if asgi._http_client is not None:
+                    await asgi._http_client.aclose()
+    return asyncio.run(run())
+
+def _statuses(responses: List[httpx.Response]) -> Dict[int, int]:
+    statuses: Dict[int, int] = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return statuses
+
+def test_concurrent_llm_calls_overlap(asgi, upstream):
+    start = time.perf_counter()
+    responses = _get_concurrently(asgi, "/analyze-llm", 20)
+    elapsed = time.perf_counter() - start
+    assert _statuses(responses) == {200: 20}
+    assert responses[0].json()["extracted_data"]["skills"]
+    assert upstream.peak_in_flight == 20
+    assert elapsed < 10 * LATENCY
+
+def test_translation(asgi):
+    responses = _get_concurrently(asgi, "/translate-to-english", 5)
+    assert _statuses(responses) == {200: 5}
+    assert all("Hello" in str(response.json()) for response in responses)
+
+def test_stage_limit_rejects_with_retry_after(asgi, monkeypatch):
+    import config
+    monkeypatch.setattr(config, "ADMISSION_QUEUE_TIMEOUT", 0.1)
+    monkeypatch.setitem(asgi.LIMITERS, "llm", asgi.AsyncStageLimiter("llm", 2))
+    responses = _get_concurrently(asgi, "/analyze-llm", 6)
+    assert _statuses(responses) == {200: 2, 429: 4}
+    assert all(int(response.headers["retry-after"]) >= 1 for response in responses if response.status_code == 429)
+    assert asgi.LIMITERS["llm"].rejected_total == 4
+
+def test_stage_timeout_answers_504(asgi, monkeypatch):
+    import config
+    from admission import CONTROLLERS
+    monkeypatch.setattr(config, "LLM_TIMEOUT", 0.1)
+    timeouts_before = CONTROLLERS["llm"].timeouts_total
+    responses = _get_concurrently(asgi, "/analyze-llm", 3)
+    assert _statuses(responses) == {504: 3}
+    assert CONTROLLERS["llm"].timeouts_total == timeouts_before + 3
+
+def test_requests_count_towards_memory_diagnostics(asgi, monkeypatch):
+    import config
+    import memory_diagnostics
+    monkeypatch.setattr(config, "MEMORY_DIAGNOSTICS_ENABLED", True)
+    requests_before = memory_diagnostics._stats["requests"]
+    _get_concurrently(asgi, "/translate-to-english", 4)
+    assert memory_diagnostics._stats["requests"] == requests_before + 4
+
+def test_metrics_report_async_stages(asgi):
+    from metrics import render_metrics
+    _get_concurrently(asgi, "/analyze-llm", 2)
+    metrics = render_metrics()
+    assert 'async_stage_admitted_total{stage="llm"} 2' in metrics
+    assert 'async_stage_service_seconds{stage="llm"}' in metrics
+
+def test_pool_refuses_unsupported_asgiref(asgi, monkeypatch):
+    from asgiref.wsgi import WsgiToAsgiInstance
+
+    async def run_wsgi_app(self, body):
+        pass
+
+    monkeypatch.setattr(WsgiToAsgiInstance, "run_wsgi_app", run_wsgi_app)
+    with pytest.raises(RuntimeError, match="asgiref"):
+        asgi.PooledWsgiToAsgi(asgi.flask_app, 2)
@@ -0,0 +1,144 @@
+"""EmbeddingIndex: incremental sync, re-embedding and generation rebuilds against a brute-force ranking."""
+from datetime import timedelta
+from typing import List, Optional, Tuple
+import itertools
+import os
+import numpy as np
+import pytest
+
+_filenames = itertools.count()
+
+@pytest.fixture
+def index_dir(app_context, tmp_path, monkeypatch) -> str:
+    """Empty EMBEDDING_INDEX_DIR of this test, so its indexes start from the database."""
+    import config
+    monkeypatch.setattr(config, "EMBEDDING_INDEX_DIR", str(tmp_path))
+    return str(tmp_path)
+
+def _unit_vectors(count: int, seed: int) -> np.ndarray:
+    import config
+    vectors = np.random.default_rng(seed).standard_normal((count, config.EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _add_cvs(vectors: np.ndarray) -> List[int]:
+    """Store one CV per vector with that embedding; the CV insert bumps the table version."""
+    from db.models import db, CV, DocumentEmbedding
+    from utils.embeddings import embedding_to_bytes
+    ids = []
+    for vector in vectors:
+        cv = CV(filename=f"embedding_test_{next(_filenames)}.png", text="", qualifications="", skills="", experience="")
+        db.session.add(cv)
+        db.session.flush()
+        db.session.add(DocumentEmbedding(doc_type="cv", doc_id=cv.id, vector=embedding_to_bytes(vector)))
+        ids.append(cv.id)
+    db.session.commit()
+    return ids
+
+def _bump_cv_version() -> None:
+    """Tell syncing indexes that CV embeddings changed without a CV row changing."""
+    from db.models import db, CV
+    from db.table_versions import bump_table_versions
+    bump_table_versions(db.session, [CV.__tablename__])
+    db.session.commit()
+
+def _brute_force(query: np.ndarray, k: int, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Top k over the newest stored embedding of every CV, computed directly from the database."""
+    from db.models import DocumentEmbedding
+    from utils.embeddings import embedding_from_bytes
+    latest = {}
+    for row in DocumentEmbedding.query.filter_by(doc_type="cv").order_by(DocumentEmbedding.id):
+        latest[row.doc_id] = embedding_from_bytes(row.vector)
+    scores = sorted(((float(vector @ query), doc_id) for doc_id, vector in latest.items() if doc_id != exclude_id), reverse=True)
+    return [(doc_id, score) for score, doc_id in scores[:k]]
+
+def _assert_same_ranking(hits: List[Tuple[int, float]], expected: List[Tuple[int, float]]) -> None:
+    assert [doc_id for doc_id, _ in hits] == [doc_id for doc_id, _ in expected]
+    assert [score for _, score in hits] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+def test_sync_appends_new_embeddings(index_dir):
+    from db.embeddings import EmbeddingIndex
+    vectors = _unit_vectors(60, 1)
+    ids = _add_cvs(vectors[:40])
+    index = EmbeddingIndex("cv")
+    index.sync()
+    generation = index.generation
+    _assert_same_ranking(index.search(vectors[0], 10), _brute_force(vectors[0], 10))
+
+    ids += _add_cvs(vectors[40:])
+    index.sync()
+    assert index.generation == generation
+    _assert_same_ranking(index.search(vectors[50], 10, exclude_id=ids[50]), _brute_force(vectors[50], 10, exclude_id=ids[50]))
+    assert ids[50] not in [doc_id for doc_id, _ in index.search(vectors[50], 10, exclude_id=ids[50])]
+
+def test_newest_embedding_of_a_document_wins(index_dir):
+    from db.embeddings import EmbeddingIndex, index_embedding
+    from db.models import db
+    vectors = _unit_vectors(21, 2)
+    ids = _add_cvs(vectors[:20])
+    index = EmbeddingIndex("cv")
+    index.sync()
+    live = index.live_count()
+
+    # A new embedding for ids[0] that is nothing like its old one.
+    index_embedding("cv", ids[0], ["avocat", "contentieux", "contrats"])
+    db.session.commit()
+    _bump_cv_version()
+    index.sync()
+    assert index.live_count() == live
+    _assert_same_ranking(index.search(vectors[0], 20), _brute_force(vectors[0], 20))
+
+def test_rebuild_when_database_epoch_changes(index_dir):
+    from db.embeddings import DATABASE_EPOCH_MIGRATION, EmbeddingIndex
+    from db.models import db, SchemaMigration
+    vectors = _unit_vectors(30, 3)
+    _add_cvs(vectors)
+    reader = EmbeddingIndex("cv")
+    reader.sync()
+    old_files = (reader.vectors_path, reader.ids_path)
+
+    migration = db.session.get(SchemaMigration, DATABASE_EPOCH_MIGRATION)
+    migration.applied_at = migration.applied_at + timedelta(seconds=1)
+    db.session.commit()
+    writer = EmbeddingIndex("cv")
+    writer.sync()
+    assert writer.generation == reader.generation + 1
+    assert not any(os.path.exists(path) for path in old_files)
+    # The reader still searches its mapping of the unlinked files until it syncs.
+    _assert_same_ranking(reader.search(vectors[5], 10), _brute_force(vectors[5], 10))
+
+    _bump_cv_version()
+    reader.sync()
+    assert reader.generation == writer.generation
+    _assert_same_ranking(reader.search(vectors[5], 10), _brute_force(vectors[5], 10))
+
+def test_rebuild_when_index_is_ahead_of_database(index_dir):
+    from db.embeddings import EmbeddingIndex
+    from db.models import db, CV, DocumentEmbedding
+    vectors = _unit_vectors(30, 4)
+    ids = _add_cvs(vectors)
+    index = EmbeddingIndex("cv")
+    index.sync()
+    generation = index.generation
+
+    # Rows removed behind the index's back, e.g. a database restored from an older backup.
+    removed = ids[-5:]
+    DocumentEmbedding.query.filter(DocumentEmbedding.doc_type == "cv", DocumentEmbedding.doc_id.in_(removed)).delete(synchronize_session=False)
+    CV.query.filter(CV.id.in_(removed)).delete(synchronize_session=False)
+    db.session.commit()
+    _bump_cv_version()
+    index.sync()
+    assert index.generation == generation + 1
+    hits = index.search(vectors[-1], 50)
+    assert not set(removed) & {doc_id for doc_id, _ in hits}
+    _assert_same_ranking(hits, _brute_force(vectors[-1], 50))
+
+def test_only_the_current_generation_is_kept_on_disk(index_dir):
+    from db.embeddings import EmbeddingIndex
+    _add_cvs(_unit_vectors(5, 5))
+    index = EmbeddingIndex("cv")
+    index.sync()
+    listed = sorted(os.listdir(index_dir))
+    assert os.path.basename(index.meta_path) in listed
+    assert sorted(name for name in listed if name.startswith(os.path.basename(index.base) + ".g")) == sorted(
+        os.path.basename(path) for path in (index.vectors_path, index.ids_path)
+    )
@@ -0,0 +1,100 @@
+"""Bitset keyword matching (/match-cvs) against a brute-force Jaccard and coverage over keyword sets."""
+from typing import Dict, List, Set, Tuple
+import random
+import numpy as np
+import pytest
+
+TERMS_PER_CATEGORY = 120
+CV_COUNT = 150
+
+def _vocabulary() -> Dict[str, List[str]]:
+    from db.keywords import KEYWORD_CATEGORIES
+    return {category: [f"{category[:4]} term {i}" for i in range(TERMS_PER_CATEGORY)] for category in KEYWORD_CATEGORIES}
+
+@pytest.fixture(scope="module")
+def cv_keywords(app) -> Dict[int, Set[Tuple[str, str]]]:
+    """Store CVs with random keywords, spread over several bitset words, and return each CV's keywords."""
+    from db.database import add_cv, batch_transaction
+    rng = random.Random(42)
+    vocabulary = _vocabulary()
+    stored = {}
+    with app.app_context(), batch_transaction():
+        for i in range(CV_COUNT):
+            keywords = {category: rng.sample(terms, rng.randint(0, 12)) for category, terms in vocabulary.items()}
+            cv_id = add_cv(f"bitset_test_{i}.png", f"Bitset test CV {i}", keywords["qualifications"], keywords["skills"], keywords["experience"])
+            stored[cv_id] = {(category, term) for category, terms in keywords.items() for term in terms}
+    return stored
+
+def _brute_force(cv_keywords: Dict[int, Set[Tuple[str, str]]], required: Set[Tuple[str, str]]) -> Dict[int, Tuple[float, float]]:
+    """Jaccard and coverage of every CV with at least one required keyword, from plain Python sets."""
+    scores = {}
+    for cv_id, keywords in cv_keywords.items():
+        overlap = len(keywords & required)
+        if overlap:
+            scores[cv_id] = (overlap / len(keywords | required), overlap / len(required))
+    return scores
+
+def _required(rng: random.Random, count: int) -> Dict[str, List[str]]:
+    vocabulary = _vocabulary()
+    required = {category: rng.sample(terms, count) for category, terms in vocabulary.items()}
+    # A keyword no CV has still counts towards |required|.
+    required["skills"].append("keyword nobody has")
+    return required
+
+def _pairs(keywords: Dict[str, List[str]]) -> Set[Tuple[str, str]]:
+    return {(category, term) for category, terms in keywords.items() for term in terms}
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_scores_match_brute_force(app_context, cv_keywords, seed):
+    from db.keyword_bitsets import match_cvs_by_keyword_bitsets
+    required = _required(random.Random(seed), 6)
+    expected = _brute_force(cv_keywords, _pairs(required))
+    result = match_cvs_by_keyword_bitsets(required, min_coverage=1e-9, limit=len(cv_keywords) + 1000)
+    scores = {cv["id"]: (cv["jaccard"], cv["coverage"]) for cv in result["cvs"]}
+    ours = {cv_id: score for cv_id, score in scores.items() if cv_id in cv_keywords}
+    assert len(expected) > 10
+    assert ours.keys() == expected.keys()
+    for cv_id, (jaccard, coverage) in expected.items():
+        assert ours[cv_id] == pytest.approx((jaccard, coverage), abs=1e-6)
+    assert result["total"] == len(result["cvs"])
+
+def test_ranking_order_and_pagination(app_context, cv_keywords):
+    from db.keyword_bitsets import match_cvs_by_keyword_bitsets
+    required = _required(random.Random(4), 8)
+    for sort in ("jaccard", "coverage"):
+        full = match_cvs_by_keyword_bitsets(required, min_coverage=1e-9, sort=sort, limit=10000)["cvs"]
+        primary, secondary = (("jaccard", "coverage") if sort == "jaccard" else ("coverage", "jaccard"))
+        keys = [(-cv[primary], -cv[secondary], cv["id"]) for cv in full]
+        assert keys == sorted(keys)
+        page = match_cvs_by_keyword_bitsets(required, min_coverage=1e-9, sort=sort, limit=7, offset=5)["cvs"]
+        assert [cv["id"] for cv in page] == [cv["id"] for cv in full[5:12]]
+
+def test_must_have_and_min_coverage(app_context, cv_keywords):
+    from db.keyword_bitsets import match_cvs_by_keyword_bitsets
+    rng = random.Random(5)
+    required = _required(rng, 10)
+    must_have = {"skills": [required["skills"][0]]}
+    must_pair = ("skills", required["skills"][0])
+    expected = {
+        cv_id: score for cv_id, score in _brute_force(cv_keywords, _pairs(required)).items()
+        if must_pair in cv_keywords[cv_id] and score[1] >= 0.1
+    }
+    result = match_cvs_by_keyword_bitsets(required, must_have=must_have, min_coverage=0.1, limit=10000)
+    assert {cv["id"] for cv in result["cvs"] if cv["id"] in cv_keywords} == expected.keys()
+
+def test_unknown_must_have_matches_nothing(app_context, cv_keywords):
+    from db.keyword_bitsets import match_cvs_by_keyword_bitsets
+    result = match_cvs_by_keyword_bitsets({"skills": ["litigation"]}, must_have={"skills": ["keyword nobody has"]})
+    assert result == {"total": 0, "cvs": []}
+
+def test_pack_bits_and_popcount():
+    from utils.bitsets import pack_bits, popcount
+    rng = np.random.default_rng(6)
+    sets = [set(rng.choice(500, size=rng.integers(0, 60), replace=False).tolist()) for _ in range(50)]
+    bits = np.stack([pack_bits(positions, 8) for positions in sets])
+    assert popcount(bits).tolist() == [len(positions) for positions in sets]
+    query = set(range(0, 500, 7))
+    overlaps = popcount(bits & pack_bits(query, 8))
+    assert overlaps.tolist() == [len(positions & query) for positions in sets]
+    assert pack_bits([]).size == 0
+    assert pack_bits([3, 64, 700], 2).tolist() == [1 << 3, 1]
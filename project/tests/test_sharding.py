@@ -0,0 +1,99 @@
+"""Scatter-gather /nearest against local `flask serve-shard` workers."""
+from typing import Iterator, List
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import numpy as np
+import pytest
+from conftest import PROJECT_DIR
+
+SHARD_COUNT = 3
+DOCUMENT_COUNT = 400
+STARTUP_TIMEOUT = 300
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for_health(url: str, worker: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+                json.loads(response.read())
+            return
+        except OSError:
+            if worker.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"Shard worker at {url} did not start")
+            time.sleep(0.5)
+
+@pytest.fixture(scope="module")
+def corpus(app) -> np.ndarray:
+    """Store CVs with random unit embeddings and return the vectors, in ID order."""
+    import config
+    from db.models import db, CV, DocumentEmbedding
+    from db.table_versions import bump_table_versions
+    from utils.embeddings import embedding_to_bytes
+    rng = np.random.default_rng(46)
+    vectors = rng.standard_normal((DOCUMENT_COUNT, config.EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    with app.app_context():
+        for i, vector in enumerate(vectors):
+            cv = CV(filename=f"shard_test_{i}.png", text="", qualifications="", skills="", experience="")
+            db.session.add(cv)
+            db.session.flush()
+            db.session.add(DocumentEmbedding(doc_type="cv", doc_id=cv.id, vector=embedding_to_bytes(vector)))
+        bump_table_versions(db.session, [CV.__tablename__])
+        db.session.commit()
+    return vectors
+
+@pytest.fixture(scope="module")
+def shard_urls(corpus: np.ndarray) -> Iterator[List[str]]:
+    """Start SHARD_COUNT shard worker processes on this machine and return their URLs in order."""
+    urls, workers = [], []
+    try:
+        # One at a time: each worker runs the start-up migrations against the shared SQLite file.
+        for shard in range(SHARD_COUNT):
+            port = _free_port()
+            workers.append(subprocess.Popen(
+                [sys.executable, "-m", "flask", "--app", "app", "serve-shard", "--shard", str(shard), "--shards", str(SHARD_COUNT), "--port", str(port)],
+                cwd=PROJECT_DIR,
+                env=os.environ.copy(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            ))
+            urls.append(f"http://127.0.0.1:{port}")
+            _wait_for_health(urls[-1], workers[-1])
+        yield urls
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+def test_sharded_ranking_matches_single_process(app, corpus, shard_urls, monkeypatch):
+    import config
+    from db.embeddings import nearest_documents
+    rng = np.random.default_rng(7)
+    queries = [corpus[0], corpus[123]] + [vector / np.linalg.norm(vector) for vector in rng.standard_normal((8, config.EMBEDDING_DIM)).astype(np.float32)]
+    with app.app_context():
+        for k in (1, 10, 50):
+            for query in queries:
+                monkeypatch.setattr(config, "SHARD_URLS", [])
+                single = nearest_documents(query, ["cv"], k=k, exclude=("cv", 1))
+                monkeypatch.setattr(config, "SHARD_URLS", shard_urls)
+                sharded = nearest_documents(query, ["cv"], k=k, exclude=("cv", 1))
+                assert len(single) == k
+                assert sharded == single
+
+def test_shard_in_wrong_position_is_an_error(app, corpus, shard_urls, monkeypatch):
+    import config
+    from utils.shard_client import ShardError, search_shards
+    monkeypatch.setattr(config, "SHARD_URLS", list(reversed(shard_urls)))
+    with app.app_context(), pytest.raises(ShardError, match="check SHARD_URLS order"):
+        search_shards(corpus[0], "cv", 10)
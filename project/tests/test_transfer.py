@@ -0,0 +1,81 @@
+"""NDJSON and CSV export/import round trips through db/transfer.py, between two fresh databases."""
+from typing import Callable
+import io
+import os
+import pytest
+from flask import Flask
+
+LONG_TEXT = "Clause de non-concurrence, « loyauté » et confidentialité.\n" * 4000
+DOCUMENTS = {
+    "job": [
+        ("senior_counsel.pdf", "Senior counsel, litigation & contracts.\nTen \"years\" minimum; bilingual FR/EN."),
+        ("juriste_droit_social.docx", LONG_TEXT),
+        ("empty_lines.pdf", "\n\nCompliance officer\r\nwith commas, quotes \" and tabs\t.\n")
+    ],
+    "cv": [
+        ("cv_avocat.png", "Avocat au barreau de Paris — contentieux.", ["master", "llm"], ["litigation", "contracts"], ["10 years", "senior"]),
+        ("cv_no_keywords.png", "Paralegal", [], [], []),
+        ("cv_unicode.png", "Rechtsanwältin, Vertragsrecht, Düsseldorf 🇩🇪", ["bar"], ["compliance"], ["junior"])
+    ]
+}
+
+@pytest.fixture
+def fresh_app(tmp_path, monkeypatch) -> Callable[[str], Flask]:
+    """Create applications on empty SQLite databases of their own."""
+    import config
+    from app import create_app
+
+    def make(name: str) -> Flask:
+        monkeypatch.setattr(config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(str(tmp_path), name + '.sqlite')}")
+        monkeypatch.setattr(config, "EMBEDDING_INDEX_DIR", str(tmp_path / f"{name}_embedding_index"))
+        return create_app()
+    return make
+
+def _populate(app: Flask) -> None:
+    from db.database import add_cv, add_job_description, batch_transaction
+    with app.app_context(), batch_transaction():
+        for filename, text in DOCUMENTS["job"]:
+            add_job_description(filename, text)
+        for filename, text, qualifications, skills, experience in DOCUMENTS["cv"]:
+            add_cv(filename, text, qualifications, skills, experience)
+
+def _export(app: Flask, dump_format: str) -> str:
+    from db.transfer import export_documents
+    handle = io.StringIO(newline="")
+    with app.app_context():
+        export_documents(handle, dump_format, batch_size=2)
+    return handle.getvalue()
+
+@pytest.mark.parametrize("dump_format", ["ndjson", "csv"])
+def test_round_trip_keeps_documents_and_ids(fresh_app, dump_format):
+    from db.database import get_all_cvs, get_all_jobs
+    from db.transfer import import_documents, iter_dump_records
+    source = fresh_app("source")
+    _populate(source)
+    dump = _export(source, dump_format)
+
+    target = fresh_app("target")
+    with target.app_context():
+        counts = import_documents(iter_dump_records(io.StringIO(dump, newline=""), dump_format), batch_size=2)
+    assert counts == {"jobs": len(DOCUMENTS["job"]), "cvs": len(DOCUMENTS["cv"]), "skipped": 0, "invalid": 0}
+    assert _export(target, dump_format) == dump
+    with source.app_context():
+        source_documents = (get_all_jobs(), get_all_cvs())
+    with target.app_context():
+        assert (get_all_jobs(), get_all_cvs()) == source_documents
+        assert next(job for job in get_all_jobs() if job["filename"] == "juriste_droit_social.docx")["text"] == LONG_TEXT
+
+def test_import_skips_invalid_and_existing_records(fresh_app):
+    from db.transfer import import_documents, iter_dump_records
+    app = fresh_app("partial")
+    _populate(app)
+    dump = "\n".join([
+        '{"type": "job", "filename": "new_job.pdf", "text": "Legal counsel"}',
+        "not json",
+        '{"type": "memo", "filename": "memo.txt", "text": "?"}',
+        '{"type": "cv", "filename": "cv_avocat.png", "text": "Duplicate filename"}',
+        '{"type": "cv", "filename": "cv_new.png", "text": "Notaire", "skills": ["contracts"]}'
+    ]) + "\n"
+    with app.app_context():
+        counts = import_documents(iter_dump_records(io.StringIO(dump), "ndjson"), keep_ids=False)
+    assert counts == {"jobs": 1, "cvs": 1, "skipped": 1, "invalid": 1}
@@ -0,0 +1,49 @@
+from typing import Iterable, Optional
+import numpy as np
+
+WORD_BITS = 64
+BITSET_DTYPE = np.dtype("<u8")
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Count set bits over the last axis of a uint64 array.
+
+        Args:
+            words: Bitsets as uint64 words.
+
+        Returns:
+            np.ndarray: Number of set bits per bitset.
+        """
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNTS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Count set bits over the last axis of a uint64 array, with a byte lookup table on NumPy < 2.0.
+
+        Args:
+            words: Bitsets as uint64 words.
+
+        Returns:
+            np.ndarray: Number of set bits per bitset.
+        """
+        words = np.ascontiguousarray(words)
+        return _BYTE_POPCOUNTS[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def pack_bits(positions: Iterable[int], words: Optional[int] = None) -> np.ndarray:
+    """Pack bit positions into a bitset.
+
+    Args:
+        positions: Non-negative bit positions.
+        words: Length of the result in uint64 words; just long enough for the highest position if None.
+
+    Returns:
+        np.ndarray: Little-endian uint64 words; positions beyond `words` are dropped.
+    """
+    positions = np.fromiter(positions, dtype=np.int64)
+    if words is None:
+        words = int(positions.max()) // WORD_BITS + 1 if positions.size else 0
+    bits = np.zeros(words, dtype=BITSET_DTYPE)
+    positions = positions[positions < words * WORD_BITS]
+    np.bitwise_or.at(bits, positions // WORD_BITS, np.left_shift(np.uint64(1), (positions % WORD_BITS).astype(np.uint64)))
+    return bits
@@ -1,13 +1,50 @@
-from typing import List, Dict
-from PIL import Image, ImageEnhance, ImageFilter
+from typing import List, Dict, Optional
+from PIL import Image
 import pytesseract
 import nltk
 import logging
 import config
+from admission import StageTimeout, record_stage_timeout
+from utils.ocr_preprocessing import enhance_for_ocr, preprocess_for_ocr
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def tesseract_config(dpi: int) -> str:
+    """Tesseract command-line options: page segmentation mode OCR_PSM and the image resolution."""
+    return f"--psm {config.OCR_PSM} --dpi {dpi}"
+
+def ocr_image(image: Image.Image, dpi: Optional[float] = None, preprocessing: Optional[str] = None) -> str:
+    """Run Tesseract OCR on an image after preprocessing.
+
+    "enhance" boosts contrast and sharpens the image and leaves Tesseract's options at their
+    defaults. "normalize" converts to grayscale, resizes to OCR_TARGET_DPI, deskews and
+    binarizes, then passes OCR_PSM and the resolution to Tesseract.
+
+    Args:
+        image: Image to read.
+        dpi: Known resolution of the image, e.g. of a rendered PDF page; estimated if None.
+            Only used by "normalize".
+        preprocessing: "enhance" or "normalize"; OCR_PREPROCESSING if None.
+
+    Returns:
+        str: Recognized text, not stripped.
+
+    Raises:
+        StageTimeout: If Tesseract runs longer than OCR_TIMEOUT seconds; the process is killed.
+    """
+    if (preprocessing or config.OCR_PREPROCESSING) == "normalize":
+        prepared, prepared_dpi = preprocess_for_ocr(image, dpi)
+        options = tesseract_config(prepared_dpi)
+    else:
+        prepared, options = enhance_for_ocr(image), ""
+    try:
+        return pytesseract.image_to_string(prepared, config=options, timeout=config.OCR_TIMEOUT)
+    except RuntimeError as e:
+        if "timeout" in str(e).lower():
+            raise record_stage_timeout("ocr", config.OCR_TIMEOUT)
+        raise
+
 def extract_png_text(file_path: str) -> str:
     """Extract text from a PNG file using Tesseract OCR with preprocessing.
 
@@ -18,13 +55,12 @@ def extract_png_text(file_path: str) -> str:
         str: Extracted text, empty string if extraction fails.
     """
     try:
-        image = Image.open(file_path)
-        enhancer = ImageEnhance.Contrast(image)
-        enhanced_image = enhancer.enhance(2.0)
-        sharpened_image = enhanced_image.filter(ImageFilter.SHARPEN)
-        text = pytesseract.image_to_string(sharpened_image)
+        with Image.open(file_path) as image:
+            text = ocr_image(image)
         logger.info(f"Extracted PNG text from {file_path}: {text[:50]}...")
         return text.strip()
+    except StageTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error extracting PNG text from {file_path}: {str(e)}")
         return ""
@@ -40,16 +40,20 @@ def analyze_text(text_data: List[str]) -> Dict[str, Union[List[Tuple[str, int]],
         Dictionary containing top words and data understanding statistics.
     """
     try:
-        all_text = " ".join(text_data)
         stop_words = set(nltk.corpus.stopwords.words("english"))
-        words = nltk.word_tokenize(all_text.lower())
-        filtered_words = [word for word in words if word.isalpha() and word not in stop_words]
-        word_freq = Counter(filtered_words)
+        word_freq: Counter = Counter()
+        vocabulary = set()
+        total_words = 0
+        # Tokenize one document at a time rather than joining the corpus into one string.
+        for text in text_data:
+            words = nltk.word_tokenize(text.lower())
+            total_words += len(words)
+            vocabulary.update(words)
+            word_freq.update(word for word in words if word.isalpha() and word not in stop_words)
         top_words = word_freq.most_common(20)
 
         total_docs = len(text_data)
-        total_words = len(words)
-        unique_words = len(set(words))
+        unique_words = len(vocabulary)
         avg_words_per_doc = total_words / total_docs if total_docs > 0 else 0
 
         stats = {
@@ -0,0 +1,75 @@
+from typing import Dict, Iterator, List, Optional, Union
+import logging
+import os
+from utils.pdf_extractor import extract_pdf_text
+from utils.docx_extractor import extract_docx_text
+from utils.cv_processor import extract_png_text, parse_cv_text
+
+logger = logging.getLogger(__name__)
+
+JOB_EXTENSIONS = (".pdf", ".docx")
+CV_EXTENSIONS = (".png",)
+
+ImportResult = Dict[str, Union[str, Dict[str, List[str]], None]]
+
+def iter_import_files(root: str) -> Iterator[str]:
+    """Walk a directory tree and yield the job and CV files it contains.
+
+    Directories and files are visited in sorted order so repeated runs see the same
+    sequence; hidden entries are skipped.
+
+    Args:
+        root: Directory to walk.
+
+    Yields:
+        str: Path of each PDF, DOCX or PNG file relative to root, with "/" separators.
+    """
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith(".") or not filename.lower().endswith(JOB_EXTENSIONS + CV_EXTENSIONS):
+                continue
+            yield os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, "/")
+
+def document_type(path: str) -> Optional[str]:
+    """Classify a file as a job description ("job") or a CV ("cv") by its extension."""
+    name = path.lower()
+    if name.endswith(JOB_EXTENSIONS):
+        return "job"
+    if name.endswith(CV_EXTENSIONS):
+        return "cv"
+    return None
+
+def extract_import_file(root: str, path: str, pdf_engine: Optional[str] = None) -> ImportResult:
+    """Extract one file of a directory import; runs in a worker process.
+
+    Never raises, so a bad file cannot break the pool: failures are returned in "error".
+
+    Args:
+        root: Imported directory.
+        path: File path relative to root.
+        pdf_engine: PDF engine for PDF files; PDF_EXTRACTION_ENGINE by default.
+
+    Returns:
+        ImportResult: "path", "doc_type", "text", "parsed" (CV keywords) and "error".
+    """
+    doc_type = document_type(path)
+    result = {"path": path, "doc_type": doc_type, "text": None, "parsed": None, "error": None}
+    full_path = os.path.join(root, path)
+    try:
+        if doc_type == "cv":
+            text = extract_png_text(full_path)
+        elif path.lower().endswith(".pdf"):
+            text = extract_pdf_text(full_path, engine=pdf_engine)
+        else:
+            text = extract_docx_text(full_path)
+        if not text:
+            result["error"] = "No text extracted"
+            return result
+        result["text"] = text
+        if doc_type == "cv":
+            result["parsed"] = parse_cv_text(text)
+    except Exception as e:
+        logger.error(f"Error extracting {full_path}: {str(e)}")
+        result["error"] = str(e) or type(e).__name__
+    return result
@@ -1,25 +1,118 @@
-from typing import Optional
-from docx import Document
+from typing import Iterator, List, Optional, Set
 import logging
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from docx import Document
+import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def extract_docx_text(file_path: str) -> str:
-    """Extract text from a DOCX file using python-docx.
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MARKUP_COMPATIBILITY_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+PARAGRAPH = f"{{{WORD_NAMESPACE}}}p"
+TEXT = f"{{{WORD_NAMESPACE}}}t"
+SPACING_ELEMENTS = {f"{{{WORD_NAMESPACE}}}{name}" for name in ("tab", "br", "cr")}
+FALLBACK = f"{{{MARKUP_COMPATIBILITY_NAMESPACE}}}Fallback"
+HEADER_PART = re.compile(r"word/header\d*\.xml")
+FOOTER_PART = re.compile(r"word/footer\d*\.xml")
+BODY_PARTS = ("word/document.xml", "word/footnotes.xml", "word/endnotes.xml")
+
+def _document_parts(names: List[str]) -> List[str]:
+    """Order the text-bearing XML parts of a DOCX package: headers, body, notes, footers."""
+    headers = sorted(name for name in names if HEADER_PART.fullmatch(name))
+    footers = sorted(name for name in names if FOOTER_PART.fullmatch(name))
+    return headers + [name for name in BODY_PARTS if name in names] + footers
+
+def _iter_paragraphs(part: object) -> Iterator[str]:
+    """Stream the text of every paragraph in a WordprocessingML part.
+
+    Covers body paragraphs, table cells and text boxes. Paragraphs nested in a text box are
+    emitted separately from the paragraph anchoring it, and the legacy VML copy of a text box
+    (mc:Fallback) is skipped so its text is not repeated.
+
+    Args:
+        part: Open file object of the XML part.
+
+    Yields:
+        str: Stripped, non-empty paragraph text.
+    """
+    paragraphs: List[List[str]] = []
+    fallback_depth = 0
+    for event, element in ET.iterparse(part, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            if tag == PARAGRAPH:
+                paragraphs.append([])
+            elif tag == FALLBACK:
+                fallback_depth += 1
+            continue
+
+        if tag == FALLBACK:
+            fallback_depth -= 1
+        elif tag == PARAGRAPH:
+            paragraph = "".join(paragraphs.pop()).strip()
+            element.clear()
+            if paragraph and not fallback_depth:
+                yield paragraph
+        elif fallback_depth or not paragraphs:
+            continue
+        elif tag == TEXT:
+            paragraphs[-1].append(element.text or "")
+        elif tag in SPACING_ELEMENTS:
+            paragraphs[-1].append(" ")
+
+def _extract_streaming(file_path: str) -> str:
+    """Extract text by iterparsing the XML parts straight from the DOCX zip archive.
+
+    Repeated header and footer paragraphs (one copy per section) are kept only once.
+    """
+    text_parts: List[str] = []
+    seen_repeated: Set[str] = set()
+    with zipfile.ZipFile(file_path) as archive:
+        for name in _document_parts(archive.namelist()):
+            repeated = HEADER_PART.fullmatch(name) or FOOTER_PART.fullmatch(name)
+            with archive.open(name) as part:
+                for paragraph in _iter_paragraphs(part):
+                    if repeated:
+                        if paragraph in seen_repeated:
+                            continue
+                        seen_repeated.add(paragraph)
+                    text_parts.append(paragraph)
+    return " ".join(text_parts)
+
+def _extract_python_docx(file_path: str) -> str:
+    """Extract body paragraph text with python-docx's object model."""
+    doc = Document(file_path)
+    text_parts: List[str] = [paragraph.text.strip() for paragraph in doc.paragraphs if paragraph.text.strip()]
+    return " ".join(text_parts)
+
+def extract_docx_text(file_path: str, engine: Optional[str] = None) -> str:
+    """Extract text from a DOCX file.
+
+    The default streaming engine reads body paragraphs, tables, text boxes, headers, footers,
+    footnotes and endnotes without building a document model; "python-docx" keeps the former
+    body-paragraphs-only behaviour.
 
     Args:
         file_path: Path to the DOCX file.
+        engine: "streaming" or "python-docx"; DOCX_EXTRACTION_ENGINE by default.
 
     Returns:
         str: Extracted text, empty string if extraction fails.
     """
+    engine = engine or config.DOCX_EXTRACTION_ENGINE
     try:
-        doc = Document(file_path)
-        text_parts: List[str] = [paragraph.text.strip() for paragraph in doc.paragraphs if paragraph.text.strip()]
-        extracted = " ".join(text_parts)
+        if engine == "python-docx":
+            extracted = _extract_python_docx(file_path)
+        else:
+            extracted = _extract_streaming(file_path)
         logger.info(f"Extracted DOCX text from {file_path}: {extracted[:50]}...")
         return extracted
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        logger.error(f"Invalid DOCX file {file_path}: {str(e)}")
+        return ""
     except Exception as e:
         logger.error(f"Error extracting DOCX text from {file_path}: {str(e)}")
-        return ""
\ No newline at end of file
+        return ""
@@ -0,0 +1,170 @@
+from typing import Dict, List, Set, Tuple
+from collections import Counter
+from functools import lru_cache
+import hashlib
+import json
+import logging
+import math
+import unicodedata
+import numpy as np
+import nltk
+import config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DTYPE = np.dtype("<f4")
+NGRAM_SIZE = 3
+NGRAM_WEIGHT = 0.5
+STOPWORD_LANGUAGES = ("english", "french", "german", "spanish")
+
+# Terms of the same concept share one feature, so "attorney" and "lawyer" (or "avocat")
+# embed identically. Keys and terms are lower-case and accent-free.
+CONCEPT_SYNONYMS: Dict[str, List[str]] = {
+    "lawyer": [
+        "lawyer", "lawyers", "attorney", "attorneys", "counsel", "counsellor", "counselor", "solicitor",
+        "solicitors", "barrister", "barristers", "advocate", "advocates", "jurist", "jurists", "avocat",
+        "avocate", "avocats", "juriste", "juristes", "anwalt", "anwaltin", "rechtsanwalt", "rechtsanwaltin",
+        "syndikusrechtsanwalt", "wirtschaftsjurist", "abogado", "abogada", "abogados", "letrado", "letrada"
+    ],
+    "paralegal": ["paralegal", "paralegals", "legal assistant", "rechtsanwaltsfachangestellte", "rechtsanwaltsfachangestellter"],
+    "law": ["law", "laws", "legal", "juridique", "juridiques", "droit", "recht", "rechtlich", "juridico", "juridica", "derecho"],
+    "compliance": ["compliance", "regulatory", "conformite", "cumplimiento"],
+    "contract": ["contract", "contracts", "agreement", "agreements", "contrat", "contrats", "vertrag", "vertrage", "contrato", "contratos"],
+    "litigation": [
+        "litigation", "litigator", "litigators", "dispute", "disputes", "contentieux", "litige", "litiges",
+        "prozess", "prozessfuhrung", "litigio", "litigios"
+    ],
+    "negotiation": ["negotiation", "negotiations", "negociation", "negociations", "verhandlung", "verhandlungen", "negociacion", "negociaciones"],
+    "advice": ["advice", "advisory", "advising", "conseil", "beratung", "asesoramiento", "asesor"],
+    "client": ["client", "clients", "mandant", "mandanten", "cliente", "clientes"],
+    "firm": ["firm", "firms", "cabinet", "kanzlei", "despacho", "bufete"],
+    "experience": ["experience", "experienced", "experiencia", "erfahrung", "berufserfahrung"],
+    "year": ["year", "years", "ans", "annee", "annees", "jahr", "jahre", "jahren", "ano", "anos"],
+    "degree": ["degree", "degrees", "diploma", "diplome", "abschluss", "titulo", "licenciatura"],
+    "education": ["education", "formation", "ausbildung", "formacion"],
+    "skill": ["skill", "skills", "competence", "competences", "kenntnisse", "competencia", "competencias"]
+}
+
+def fold_token(token: str) -> str:
+    """Lower-case a token and strip its accents, so "conformité" matches "conformite".
+
+    Args:
+        token: Token to normalize.
+
+    Returns:
+        str: Normalized token.
+    """
+    decomposed = unicodedata.normalize("NFKD", token.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def _load_concepts() -> Dict[str, str]:
+    """Map every synonym to its concept, adding the groups from EMBEDDING_SYNONYMS_PATH if set."""
+    groups = {concept: list(terms) for concept, terms in CONCEPT_SYNONYMS.items()}
+    if config.EMBEDDING_SYNONYMS_PATH:
+        try:
+            with open(config.EMBEDDING_SYNONYMS_PATH, encoding="utf-8") as f:
+                for concept, terms in json.load(f).items():
+                    groups.setdefault(fold_token(concept), []).extend(terms)
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"Error loading embedding synonyms from {config.EMBEDDING_SYNONYMS_PATH}: {str(e)}")
+    # Multi-word synonyms are not folded because documents are embedded word by word.
+    return {fold_token(term): concept for concept, terms in groups.items() for term in terms if " " not in term}
+
+def _load_stopwords() -> Set[str]:
+    """Load the stopwords of the corpus languages; empty if the NLTK data is unavailable."""
+    stopwords: Set[str] = set()
+    for language in STOPWORD_LANGUAGES:
+        try:
+            stopwords.update(fold_token(word) for word in nltk.corpus.stopwords.words(language))
+        except (LookupError, OSError) as e:
+            logger.warning(f"NLTK stopwords for {language} are unavailable; embedding without them: {str(e)}")
+            break
+    return stopwords
+
+CONCEPTS: Dict[str, str] = _load_concepts()
+_stopwords: Set[str] = None
+
+def _feature_hash(feature: str) -> Tuple[int, float]:
+    """Hash a feature to a dimension and a sign, so collisions cancel out on average."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % config.EMBEDDING_DIM, (1.0 if digest >> 63 else -1.0)
+
+@lru_cache(maxsize=65536)
+def _token_features(token: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed features of one token: its concept or word, plus character n-grams of unknown words.
+
+    Args:
+        token: Folded token.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Feature dimensions and signed weights.
+    """
+    concept = CONCEPTS.get(token)
+    if concept is not None:
+        features = [(f"c:{concept}", 1.0)]
+    else:
+        features = [(f"w:{token}", 1.0)]
+        padded = f"<{token}>"
+        ngrams = [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+        # Shared n-grams make inflected forms ("negotiate", "negotiating") similar.
+        if len(token) > NGRAM_SIZE:
+            weight = NGRAM_WEIGHT / math.sqrt(len(ngrams))
+            features.extend((f"g:{ngram}", weight) for ngram in ngrams)
+    dimensions = np.empty(len(features), dtype=np.int64)
+    weights = np.empty(len(features), dtype=np.float64)
+    for i, (feature, weight) in enumerate(features):
+        dimensions[i], sign = _feature_hash(feature)
+        weights[i] = sign * weight
+    return dimensions, weights
+
+def embed_tokens(tokens: List[str]) -> np.ndarray:
+    """Embed a document as an L2-normalized feature-hashing vector.
+
+    Tokens are folded, stopwords and numbers dropped, synonyms mapped to shared concepts and
+    term frequencies dampened with 1 + log(tf). No model or network access is needed, and
+    the same tokens always give the same vector.
+
+    Args:
+        tokens: Preprocessed tokens of a document.
+
+    Returns:
+        np.ndarray: float32 vector of length EMBEDDING_DIM; all zeros if no token is usable.
+    """
+    global _stopwords
+    if _stopwords is None:
+        _stopwords = _load_stopwords()
+    counts = Counter(fold_token(token) for token in tokens)
+    dimension_parts, weight_parts = [], []
+    for token, count in counts.items():
+        if token in _stopwords or not token.isalpha():
+            continue
+        dimensions, weights = _token_features(token)
+        dimension_parts.append(dimensions)
+        weight_parts.append(weights * (1.0 + math.log(count)))
+    if not dimension_parts:
+        return np.zeros(config.EMBEDDING_DIM, dtype=EMBEDDING_DTYPE)
+    vector = np.bincount(np.concatenate(dimension_parts), weights=np.concatenate(weight_parts), minlength=config.EMBEDDING_DIM)
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.astype(EMBEDDING_DTYPE)
+
+def embedding_cosine_similarity(tokens1: List[str], tokens2: List[str]) -> float:
+    """Cosine similarity of the embeddings of two documents.
+
+    Args:
+        tokens1: Preprocessed tokens of the first document.
+        tokens2: Preprocessed tokens of the second document.
+
+    Returns:
+        float: Similarity between -1.0 and 1.0; 0.0 if either document has no usable token.
+    """
+    return float(np.dot(embed_tokens(tokens1), embed_tokens(tokens2)))
+
+def embedding_to_bytes(vector: np.ndarray) -> bytes:
+    """Serialize an embedding as little-endian float32 bytes."""
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+def embedding_from_bytes(data: bytes) -> np.ndarray:
+    """Deserialize an embedding stored with embedding_to_bytes."""
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE)
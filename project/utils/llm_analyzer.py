@@ -1,12 +1,52 @@
 from typing import Dict, List, Optional
+import asyncio
 import google.generativeai as genai
+import httpx
 import logging
 import config
+from admission import StageTimeout, record_stage_timeout, run_with_timeout
 
 logger = logging.getLogger(__name__)
 
 genai.configure(api_key=config.GEMINI_API_KEY)
 
+GEMINI_MODEL = "gemini-1.5-flash"
+
+def _build_prompt(text_data: List[str]) -> str:
+    """Fill LLM_ANALYSIS_PROMPT with the joined texts."""
+    return config.LLM_ANALYSIS_PROMPT.format(text=" ".join(text_data))
+
+def _parse_llm_response(extracted_text: str) -> Dict[str, List[str]]:
+    """Split Gemini's "Skills:", "Experiences:" and "Qualifications:" sections into de-duplicated lists."""
+    skills, experiences, qualifications = [], [], []
+    lines = extracted_text.split("\n")
+    current_section = None
+
+    for line in lines:
+        line = line.strip()
+        if line.startswith("Skills:"):
+            current_section = "skills"
+            skills = line.replace("Skills:", "").strip().split(", ")
+        elif line.startswith("Experiences:"):
+            current_section = "experiences"
+            experiences = line.replace("Experiences:", "").strip().split(", ")
+        elif line.startswith("Qualifications:"):
+            current_section = "qualifications"
+            qualifications = line.replace("Qualifications:", "").strip().split(", ")
+        elif line and current_section:
+            if current_section == "skills":
+                skills.extend(line.split(", "))
+            elif current_section == "experiences":
+                experiences.extend(line.split(", "))
+            elif current_section == "qualifications":
+                qualifications.extend(line.split(", "))
+
+    return {
+        "skills": list(set(skill.strip() for skill in skills if skill.strip())),
+        "experiences": list(set(exp.strip() for exp in experiences if exp.strip())),
+        "qualifications": list(set(qual.strip() for qual in qualifications if qual.strip()))
+    }
+
 def analyze_with_llm(text_data: List[str]) -> Dict[str, List[str]]:
     """Perform semantic analysis on text data using Google's Gemini API to extract skills, experiences, and qualifications.
 
@@ -15,48 +55,55 @@ def analyze_with_llm(text_data: List[str]) -> Dict[str, List[str]]:
 
     Returns:
         Dictionary containing semantically extracted skills, experiences, and qualifications, or empty lists on failure.
+
+    Raises:
+        StageTimeout: If Gemini does not answer within LLM_TIMEOUT seconds.
     """
     try:
-        all_text = " ".join(text_data)
-        prompt = config.LLM_ANALYSIS_PROMPT.format(text=all_text)
-        
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(prompt)
-        
-        extracted_text = response.text.strip()
-        skills, experiences, qualifications = [], [], []
-        lines = extracted_text.split("\n")
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("Skills:"):
-                current_section = "skills"
-                skills = line.replace("Skills:", "").strip().split(", ")
-            elif line.startswith("Experiences:"):
-                current_section = "experiences"
-                experiences = line.replace("Experiences:", "").strip().split(", ")
-            elif line.startswith("Qualifications:"):
-                current_section = "qualifications"
-                qualifications = line.replace("Qualifications:", "").strip().split(", ")
-            elif line and current_section:
-                if current_section == "skills":
-                    skills.extend(line.split(", "))
-                elif current_section == "experiences":
-                    experiences.extend(line.split(", "))
-                elif current_section == "qualifications":
-                    qualifications.extend(line.split(", "))
-
-        skills = list(set(skill.strip() for skill in skills if skill.strip()))
-        experiences = list(set(exp.strip() for exp in experiences if exp.strip()))
-        qualifications = list(set(qual.strip() for qual in qualifications if qual.strip()))
+        prompt = _build_prompt(text_data)
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        response = run_with_timeout("llm", model.generate_content, prompt)
+        result = _parse_llm_response(response.text.strip())
+        logger.info("Gemini LLM semantic analysis completed successfully")
+        return result
+    except StageTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error during Gemini LLM semantic analysis: {str(e)}")
+        return {"skills": [], "experiences": [], "qualifications": []}
+
+async def analyze_with_llm_async(text_data: List[str], client: httpx.AsyncClient) -> Dict[str, List[str]]:
+    """Non-blocking analyze_with_llm calling Gemini's REST API, for the ASGI entry point.
 
+    Waiting for Gemini holds no thread, so one event loop keeps many analyses in flight.
+
+    Args:
+        text_data: List of text strings from job descriptions or CVs.
+        client: Shared HTTP client; its pool bounds the open connections.
+
+    Returns:
+        Dictionary containing semantically extracted skills, experiences, and qualifications, or empty lists on failure.
+
+    Raises:
+        StageTimeout: If Gemini does not answer within LLM_TIMEOUT seconds.
+    """
+    try:
+        request = client.post(
+            f"{config.GEMINI_API_BASE_URL}/v1beta/models/{GEMINI_MODEL}:generateContent",
+            headers={"x-goog-api-key": config.GEMINI_API_KEY or ""},
+            json={"contents": [{"parts": [{"text": _build_prompt(text_data)}]}]}
+        )
+        try:
+            response = await asyncio.wait_for(request, config.LLM_TIMEOUT or None)
+        except asyncio.TimeoutError:
+            raise record_stage_timeout("llm", config.LLM_TIMEOUT)
+        response.raise_for_status()
+        parts = response.json()["candidates"][0]["content"]["parts"]
+        result = _parse_llm_response("".join(part.get("text", "") for part in parts).strip())
         logger.info("Gemini LLM semantic analysis completed successfully")
-        return {
-            "skills": skills,
-            "experiences": experiences,
-            "qualifications": qualifications
-        }
+        return result
+    except StageTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error during Gemini LLM semantic analysis: {str(e)}")
-        return {"skills": [], "experiences": [], "qualifications": []}
\ No newline at end of file
+        return {"skills": [], "experiences": [], "qualifications": []}
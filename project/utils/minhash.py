@@ -0,0 +1,97 @@
+from typing import List, Optional
+import hashlib
+import logging
+import numpy as np
+import config
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+SHINGLE_SIZE = 3
+SEED = 1
+
+_generator = np.random.RandomState(SEED)
+_permutations_a = _generator.randint(1, int(MERSENNE_PRIME), size=config.MINHASH_NUM_PERM, dtype=np.uint64)
+_permutations_b = _generator.randint(0, int(MERSENNE_PRIME), size=config.MINHASH_NUM_PERM, dtype=np.uint64)
+
+def shingle_tokens(tokens: List[str], size: int = SHINGLE_SIZE) -> List[str]:
+    """Build word shingles (contiguous word n-grams) from preprocessed tokens.
+
+    Args:
+        tokens: Preprocessed tokens of a document.
+        size: Number of words per shingle.
+
+    Returns:
+        List[str]: Shingles; the whole token list as one shingle if it is shorter than size.
+    """
+    if len(tokens) < size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+def compute_minhash(tokens: List[str]) -> Optional[np.ndarray]:
+    """Compute the MinHash signature of a document's word shingles.
+
+    Args:
+        tokens: Preprocessed tokens of a document.
+
+    Returns:
+        Optional[np.ndarray]: uint64 signature of length MINHASH_NUM_PERM; None for documents
+        without shingles, which would otherwise all share one signature and look identical.
+    """
+    shingles = set(shingle_tokens(tokens))
+    if not shingles:
+        logger.warning("No shingles available for MinHash; the document is not indexed for near-duplicates")
+        return None
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.sha1(shingle.encode("utf-8")).digest()[:4], "little") for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    permuted = np.bitwise_and((hashes[:, None] * _permutations_a + _permutations_b) % MERSENNE_PRIME, MAX_HASH)
+    return permuted.min(axis=0)
+
+def band_hashes(signature: np.ndarray, bands: int = None) -> List[int]:
+    """Hash each LSH band of a signature into a signed 64-bit bucket key.
+
+    Args:
+        signature: MinHash signature.
+        bands: Number of bands; MINHASH_BANDS by default. Must divide the signature length.
+
+    Returns:
+        List[int]: One bucket key per band.
+    """
+    bands = bands or config.MINHASH_BANDS
+    rows = len(signature) // bands
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(), "little", signed=True)
+        for band in range(bands)
+    ]
+
+def estimate_jaccard(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Estimate the Jaccard Index of two documents' shingle sets from their signatures.
+
+    Args:
+        signature1: First MinHash signature.
+        signature2: Second MinHash signature.
+
+    Returns:
+        float: Fraction of equal signature positions, between 0 and 1.
+    """
+    if len(signature1) != len(signature2):
+        logger.warning("MinHash signatures have different lengths; returning 0 similarity")
+        return 0.0
+    return float(np.mean(signature1 == signature2))
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    """Serialize a signature for storage."""
+    return signature.astype("<u8").tobytes()
+
+def empty_signature() -> np.ndarray:
+    """Return the signature compute_minhash gave documents without shingles before it returned None."""
+    return np.full(config.MINHASH_NUM_PERM, MAX_HASH, dtype=np.uint64)
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    """Deserialize a stored signature."""
+    return np.frombuffer(data, dtype="<u8").astype(np.uint64)
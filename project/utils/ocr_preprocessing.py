@@ -0,0 +1,197 @@
+from typing import Optional, Tuple
+import logging
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+import config
+
+logger = logging.getLogger(__name__)
+
+PAGE_WIDTH_INCHES = 8.27
+PLAUSIBLE_PAGE_WIDTH_INCHES = (3.0, 17.0)
+MIN_RESIZE_CHANGE = 0.1
+ADAPTIVE_WINDOW_FRACTION = 1 / 24
+ADAPTIVE_OFFSET = 0.12
+SKEW_STEP_DEGREES = 0.25
+SKEW_COARSE_STEP_DEGREES = 1.0
+SKEW_ANALYSIS_WIDTH = 800
+MIN_SKEW_DEGREES = 0.3
+MAX_SKEW_SAMPLES = 200000
+MAX_COARSE_SKEW_SAMPLES = 20000
+
+def estimate_dpi(image: Image.Image) -> float:
+    """Estimate the resolution of a page image.
+
+    The DPI stored in the file is used when it gives a plausible page width; phone photos
+    and screenshots carry none or a meaningless one, so the page is then assumed to span
+    the image width.
+
+    Args:
+        image: Page image.
+
+    Returns:
+        float: Estimated dots per inch.
+    """
+    dpi = image.info.get("dpi")
+    if dpi:
+        try:
+            horizontal = float(dpi[0])
+            low, high = PLAUSIBLE_PAGE_WIDTH_INCHES
+            if horizontal > 0 and low <= image.width / horizontal <= high:
+                return horizontal
+        except (TypeError, ValueError, IndexError):
+            pass
+    return image.width / PAGE_WIDTH_INCHES
+
+def normalize_resolution(image: Image.Image, source_dpi: float, target_dpi: int) -> Image.Image:
+    """Resize an image to the target resolution, leaving it alone if already close.
+
+    Args:
+        image: Grayscale page image.
+        source_dpi: Resolution of the image.
+        target_dpi: Resolution Tesseract should see.
+
+    Returns:
+        Image.Image: Resized image.
+    """
+    scale = target_dpi / source_dpi
+    if abs(scale - 1.0) < MIN_RESIZE_CHANGE:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    # Downscaling large photos with reducing_gap first shrinks by an integer factor, which is much faster.
+    return image.resize(size, Image.LANCZOS, reducing_gap=3.0 if scale < 1 else None)
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """Compute the Otsu threshold of an 8-bit grayscale image.
+
+    Args:
+        pixels: uint8 grayscale pixels.
+
+    Returns:
+        int: Threshold maximizing the between-class variance; pixels above it are background.
+    """
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    weights = np.cumsum(histogram)
+    means = np.cumsum(histogram * np.arange(256))
+    total, total_mean = weights[-1], means[-1]
+    background = total - weights
+    valid = (weights > 0) & (background > 0)
+    between = np.zeros(256)
+    between[valid] = (total_mean * weights[valid] - means[valid] * total) ** 2 / (weights[valid] * background[valid])
+    return int(np.argmax(between))
+
+def _box_sums(values: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum of each pixel's (2 * radius + 1)-square neighbourhood, clipped at the borders, and its pixel count.
+
+    Rows then columns are summed with cumulative sums, which keeps intermediate values
+    within int32 for any page-sized image.
+    """
+    height, width = values.shape
+    x0 = np.clip(np.arange(width) - radius, 0, width)
+    x1 = np.clip(np.arange(width) + radius + 1, 0, width)
+    y0 = np.clip(np.arange(height) - radius, 0, height)
+    y1 = np.clip(np.arange(height) + radius + 1, 0, height)
+    columns = np.zeros((height, width + 1), dtype=np.int32)
+    np.cumsum(values, axis=1, dtype=np.int32, out=columns[:, 1:])
+    horizontal = columns[:, x1] - columns[:, x0]
+    del columns
+    rows = np.zeros((height + 1, width), dtype=np.int32)
+    np.cumsum(horizontal, axis=0, dtype=np.int32, out=rows[1:])
+    del horizontal
+    sums = rows[y1] - rows[y0]
+    counts = (y1 - y0)[:, None] * (x1 - x0)[None, :]
+    return sums, counts
+
+def binarize(pixels: np.ndarray, method: str) -> np.ndarray:
+    """Binarize a grayscale page to black text on white.
+
+    Args:
+        pixels: uint8 grayscale pixels.
+        method: "otsu" for one global threshold, "adaptive" for a threshold relative to the
+            local mean (robust to the uneven lighting of photos), "none" to keep grayscale.
+
+    Returns:
+        np.ndarray: uint8 pixels, 0 for text and 255 for background unless method is "none".
+    """
+    if method == "none":
+        return pixels
+    if method == "otsu":
+        background = pixels > otsu_threshold(pixels)
+    else:
+        radius = max(7, int(min(pixels.shape) * ADAPTIVE_WINDOW_FRACTION) // 2)
+        sums, counts = _box_sums(pixels, radius)
+        background = pixels.astype(np.int64) * counts > sums * (1.0 - ADAPTIVE_OFFSET)
+    return np.where(background, 255, 0).astype(np.uint8)
+
+def _projection_score(ys: np.ndarray, xs: np.ndarray, angle: float) -> float:
+    """Sharpness (sum of squared bin counts) of the row histogram of ink pixels projected along an angle."""
+    # Row a pixel falls in once the page is rotated by -angle; lines rising to the right have y decreasing with x.
+    offsets = np.rint(ys + xs * np.float32(np.tan(np.radians(angle)))).astype(np.int32)
+    profile = np.bincount(offsets - offsets.min())
+    return float(np.dot(profile, profile))
+
+def estimate_skew(pixels: np.ndarray, max_degrees: float, method: str = "adaptive") -> float:
+    """Estimate the rotation of text lines with a projection profile.
+
+    Ink pixels of a downsampled, binarized copy are projected along candidate angles; text
+    lines produce the sharpest row histogram when the projection follows them. A coarse pass
+    over a subsample finds the neighbourhood of the angle and a fine pass over all samples
+    refines it. Angles are scored one at a time, so memory stays proportional to the samples.
+
+    Args:
+        pixels: uint8 grayscale pixels.
+        max_degrees: Largest skew considered, in either direction.
+        method: Binarization used to find ink pixels; "none" falls back to "otsu".
+
+    Returns:
+        float: Skew in degrees, positive when lines rise to the right.
+    """
+    step = max(1, pixels.shape[1] // SKEW_ANALYSIS_WIDTH)
+    small = pixels[::step, ::step]
+    ys, xs = np.nonzero(binarize(small, "otsu" if method == "none" else method) == 0)
+    if len(ys) < 100:
+        return 0.0
+    # Shuffled, so that any prefix is a uniform subsample of the ink.
+    keep = np.random.default_rng(0).choice(len(ys), min(len(ys), MAX_SKEW_SAMPLES), replace=False)
+    ys, xs = ys[keep].astype(np.float32), xs[keep].astype(np.float32)
+
+    coarse = np.arange(-max_degrees, max_degrees + SKEW_COARSE_STEP_DEGREES / 2, SKEW_COARSE_STEP_DEGREES)
+    sample_ys, sample_xs = ys[:MAX_COARSE_SKEW_SAMPLES], xs[:MAX_COARSE_SKEW_SAMPLES]
+    best = max(coarse, key=lambda angle: _projection_score(sample_ys, sample_xs, angle))
+    fine = np.arange(best - SKEW_COARSE_STEP_DEGREES, best + SKEW_COARSE_STEP_DEGREES + SKEW_STEP_DEGREES / 2, SKEW_STEP_DEGREES)
+    fine = fine[np.abs(fine) <= max_degrees + SKEW_STEP_DEGREES / 2]
+    return float(max(fine, key=lambda angle: _projection_score(ys, xs, angle)))
+
+def enhance_for_ocr(image: Image.Image) -> Image.Image:
+    """Boost contrast and sharpen an image at its original resolution and colour, the default preparation."""
+    return ImageEnhance.Contrast(image).enhance(2.0).filter(ImageFilter.SHARPEN)
+
+def preprocess_for_ocr(image: Image.Image, dpi: Optional[float] = None) -> Tuple[Image.Image, int]:
+    """Prepare a page image for Tesseract.
+
+    Applies EXIF orientation, converts to grayscale, resizes to OCR_TARGET_DPI, corrects skew
+    up to OCR_MAX_SKEW_DEGREES and binarizes with OCR_BINARIZATION.
+
+    Args:
+        image: Page image in any mode.
+        dpi: Known resolution of the image (e.g. a rendered PDF page); estimated if None.
+
+    Returns:
+        Tuple[Image.Image, int]: Preprocessed grayscale image and its resolution.
+    """
+    image = ImageOps.exif_transpose(image)
+    source_dpi = dpi or estimate_dpi(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent areas would turn black when the alpha channel is dropped.
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    gray = normalize_resolution(image.convert("L"), source_dpi, config.OCR_TARGET_DPI)
+    pixels = np.asarray(gray)
+    if config.OCR_MAX_SKEW_DEGREES > 0:
+        skew = estimate_skew(pixels, config.OCR_MAX_SKEW_DEGREES, config.OCR_BINARIZATION)
+        if abs(skew) >= MIN_SKEW_DEGREES:
+            logger.debug(f"Deskewing OCR image by {skew:.2f} degrees")
+            # Filling the exposed corners with the typical paper tone keeps them from reading as ink.
+            paper = int(np.median(pixels[::8, ::8]))
+            pixels = np.asarray(gray.rotate(-skew, resample=Image.BICUBIC, expand=True, fillcolor=paper))
+    return Image.fromarray(binarize(pixels, config.OCR_BINARIZATION)), config.OCR_TARGET_DPI
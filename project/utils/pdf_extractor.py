@@ -1,25 +1,184 @@
-from typing import Optional
-import pdfplumber
+from typing import Dict, List, Optional, Union
 import logging
+import threading
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+import config
+from utils.cv_processor import ocr_image
+from admission import StageBusy, StageTimeout, stage_slot
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def extract_pdf_text(file_path: str) -> str:
-    """Extract text from a PDF file using pdfplumber.
+PDF_ENGINES = ("fast", "layout", "auto")
+SHORT_LINE_CHARS = 25
+SHORT_LINE_RATIO = 0.6
+MIN_LINES_FOR_RATIO = 12
+
+# PDFium is not thread-safe; every call into it goes through this lock.
+_pdfium_lock = threading.Lock()
+
+def _needs_layout(text: str, path_objects: int) -> bool:
+    """Decide whether a page's plain text layer is likely to be scrambled.
+
+    Tables and multi-column layouts are drawn with many vector rules and produce mostly
+    short lines in content-stream order; those pages are worth pdfplumber's layout analysis.
+
+    Args:
+        text: Text extracted from the page's text layer.
+        path_objects: Number of vector path objects on the page.
+
+    Returns:
+        bool: True if the page should be re-extracted with pdfplumber.
+    """
+    if path_objects >= config.PDF_LAYOUT_MIN_PATHS:
+        return True
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < MIN_LINES_FOR_RATIO:
+        return False
+    short_lines = sum(1 for line in lines if len(line.strip()) < SHORT_LINE_CHARS)
+    return short_lines / len(lines) >= SHORT_LINE_RATIO
+
+def _read_text_layer(file_path: str, engine: str) -> List[Dict[str, Union[int, str]]]:
+    """Read every page's text layer with PDFium and classify how each page must be finished.
+
+    Args:
+        file_path: Path to the PDF file.
+        engine: One of PDF_ENGINES.
+
+    Returns:
+        List[Dict[str, Union[int, str]]]: Per page: page number, text and method
+        ("fast", "layout", "ocr" or "empty").
+    """
+    pages = []
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(file_path)
+        try:
+            for index in range(len(document)):
+                page = document[index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range().replace("\r\n", "\n").strip()
+                textpage.close()
+                counts = {pdfium_c.FPDF_PAGEOBJ_PATH: 0, pdfium_c.FPDF_PAGEOBJ_IMAGE: 0}
+                for page_object in page.get_objects(filter=list(counts)):
+                    counts[page_object.type] += 1
+
+                entry = {"page": index + 1, "text": text, "method": "fast"}
+                if len(text) < config.PDF_MIN_TEXT_CHARS:
+                    if counts[pdfium_c.FPDF_PAGEOBJ_IMAGE]:
+                        entry["method"] = "ocr"
+                    elif not text:
+                        entry["method"] = "empty"
+                elif engine == "layout" or (engine == "auto" and _needs_layout(text, counts[pdfium_c.FPDF_PAGEOBJ_PATH])):
+                    entry["method"] = "layout"
+                page.close()
+                pages.append(entry)
+        finally:
+            document.close()
+    return pages
+
+def _ocr_pages(file_path: str, ocr_pages: List[Dict[str, Union[int, str]]]) -> None:
+    """OCR pages without a text layer one at a time, filling in their text.
+
+    Each page is rendered at PDF_OCR_DPI (about 26 MB at 300 dpi), read and released before
+    the next one is rendered, so a long scan never holds more than one page image. PDFium
+    calls take the lock; Tesseract runs without it. Each page holds a slot of the "ocr"
+    admission class, so OCR inside /upload-jobs is bounded by OCR_CONCURRENCY too.
 
     Args:
         file_path: Path to the PDF file.
+        ocr_pages: Page entries from _read_text_layer with method "ocr".
+
+    Raises:
+        StageTimeout: If Tesseract runs longer than OCR_TIMEOUT seconds on a page.
+        StageBusy: If no OCR slot frees up in time.
+    """
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(file_path)
+    try:
+        for entry in ocr_pages:
+            image = None
+            try:
+                with stage_slot("ocr"):
+                    with _pdfium_lock:
+                        page = document[entry["page"] - 1]
+                        try:
+                            image = page.render(scale=config.PDF_OCR_DPI / 72).to_pil()
+                        finally:
+                            page.close()
+                    entry["text"] = ocr_image(image, dpi=config.PDF_OCR_DPI).strip()
+            except (StageTimeout, StageBusy):
+                raise
+            except Exception as e:
+                logger.error(f"OCR failed for page {entry['page']} of {file_path}: {str(e)}")
+            finally:
+                if image is not None:
+                    image.close()
+    finally:
+        with _pdfium_lock:
+            document.close()
+
+def extract_pdf_pages(file_path: str, engine: Optional[str] = None) -> List[Dict[str, Union[int, str]]]:
+    """Extract the text of each PDF page with the cheapest method that handles it.
+
+    - fast: PDFium's text layer for every page.
+    - layout: pdfplumber's layout analysis for every page with a text layer.
+    - auto: PDFium first, pdfplumber only for pages that look like tables or columns.
+    In every mode, pages without a text layer but with images are OCR'd.
+
+    Args:
+        file_path: Path to the PDF file.
+        engine: One of PDF_ENGINES; PDF_EXTRACTION_ENGINE by default.
+
+    Returns:
+        List[Dict[str, Union[int, str]]]: Per page: page number, text and the method used.
+
+    Raises:
+        ValueError: If engine is not one of PDF_ENGINES.
+    """
+    engine = engine or config.PDF_EXTRACTION_ENGINE
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+    pages = _read_text_layer(file_path, engine)
+
+    layout_pages = [entry for entry in pages if entry["method"] == "layout"]
+    if layout_pages:
+        with pdfplumber.open(file_path, pages=[entry["page"] for entry in layout_pages]) as pdf:
+            for entry, page in zip(layout_pages, pdf.pages):
+                entry["text"] = (page.extract_text() or "").strip()
+                # Drop the page's parsed layout objects, which the document otherwise keeps until closed.
+                page.flush_cache()
+
+    ocr_pages = [entry for entry in pages if entry["method"] == "ocr"]
+    if ocr_pages:
+        logger.warning(f"{file_path} has {len(ocr_pages)} pages without a text layer; running OCR on pages {[e['page'] for e in ocr_pages]}")
+        _ocr_pages(file_path, ocr_pages)
+
+    return pages
+
+def extract_pdf_text(file_path: str, engine: Optional[str] = None) -> str:
+    """Extract text from a PDF file with the tiered engine.
+
+    Args:
+        file_path: Path to the PDF file.
+        engine: "fast", "layout" or "auto"; PDF_EXTRACTION_ENGINE by default.
 
     Returns:
         str: Extracted text, empty string if extraction fails.
+
+    Raises:
+        StageTimeout: If OCR of a scanned page runs longer than OCR_TIMEOUT seconds.
+        StageBusy: If no OCR slot frees up in time, so callers can report it per file.
     """
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text_parts: List[str] = [page.extract_text() or "" for page in pdf.pages]
-            extracted = " ".join(filter(None, text_parts)).strip()
-            logger.info(f"Extracted PDF text from {file_path}: {extracted[:50]}...")
-            return extracted
+        pages = extract_pdf_pages(file_path, engine)
+        extracted = " ".join(entry["text"] for entry in pages if entry["text"]).strip()
+        methods = {method: sum(1 for entry in pages if entry["method"] == method) for method in ("fast", "layout", "ocr", "empty")}
+        logger.info(f"Extracted PDF text from {file_path} (pages by method: {methods}): {extracted[:50]}...")
+        return extracted
+    except (StageTimeout, StageBusy):
+        raise
     except Exception as e:
         logger.error(f"Error extracting PDF text from {file_path}: {str(e)}")
-        return ""
\ No newline at end of file
+        return ""
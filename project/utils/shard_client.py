@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+import heapq
+import http.client
+import logging
+import threading
+import time
+import numpy as np
+import config
+from utils.embeddings import embedding_to_bytes
+
+logger = logging.getLogger(__name__)
+
+# One thread per shard for each scatter-gather in flight; with fewer, concurrent /nearest
+# requests would queue behind each other's shard calls.
+_executor = ThreadPoolExecutor(max_workers=max(len(config.SHARD_URLS) * config.SHARD_CONCURRENCY, 1), thread_name_prefix="shard")
+_stats_lock = threading.Lock()
+_shard_stats: Dict[int, Dict[str, float]] = {}
+# Keep-alive connection per shard URL for each executor thread, so a query costs no TCP handshake.
+_connections = threading.local()
+
+# POST /search answers with one record per hit, most similar first.
+HIT_DTYPE = np.dtype([("doc_id", "<i8"), ("score", "<f4")])
+
+class ShardError(Exception):
+    """Raised when a shard worker cannot answer; a ranking without it would miss part of the corpus."""
+
+def search_path(doc_type: str, k: int, exclude_id: Optional[int] = None) -> str:
+    """Build the POST /search path of a shard worker; the query vector is the raw request body."""
+    params = {"doc_type": doc_type, "k": k}
+    if exclude_id is not None:
+        params["exclude_id"] = exclude_id
+    return f"/search?{urlencode(params)}"
+
+def encode_hits(hits: List[Tuple[int, float]]) -> bytes:
+    """Serialize (document ID, score) pairs as HIT_DTYPE records."""
+    return np.array(hits, dtype=HIT_DTYPE).tobytes()
+
+def decode_hits(body: bytes) -> List[Tuple[int, float]]:
+    """Read (document ID, score) pairs from HIT_DTYPE records."""
+    return [(int(doc_id), float(score)) for doc_id, score in np.frombuffer(body, dtype=HIT_DTYPE).tolist()]
+
+def _record(shard: int, seconds: float, failed: bool) -> None:
+    with _stats_lock:
+        stats = _shard_stats.setdefault(shard, {"requests": 0, "errors": 0, "seconds": 0.0})
+        stats["requests"] += 1
+        stats["errors"] += failed
+        stats["seconds"] += seconds
+
+def shard_stats() -> Dict[int, Dict[str, float]]:
+    """Snapshot of request counts, failures and cumulative latency per shard."""
+    with _stats_lock:
+        return {shard: dict(stats) for shard, stats in _shard_stats.items()}
+
+def _connection(url: str) -> Tuple[http.client.HTTPConnection, bool]:
+    """Return this thread's connection to a shard worker and whether it was used before."""
+    connections = _connections.__dict__
+    if url in connections:
+        return connections[url], True
+    parts = urlsplit(url)
+    connections[url] = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=config.SHARD_TIMEOUT)
+    return connections[url], False
+
+def _post(url: str, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """POST over the thread's keep-alive connection, reconnecting once if the worker closed it."""
+    while True:
+        connection, reused = _connection(url)
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": "application/octet-stream"})
+            response = connection.getresponse()
+            payload = response.read()
+        except (ConnectionError, http.client.HTTPException):
+            connection.close()
+            del _connections.__dict__[url]
+            if reused:
+                continue
+            raise
+        except OSError:
+            connection.close()
+            del _connections.__dict__[url]
+            raise
+        if response.will_close:
+            connection.close()
+            del _connections.__dict__[url]
+        return response.status, dict(response.getheaders()), payload
+
+def _query_shard(shard: int, url: str, path: str, body: bytes) -> List[Tuple[int, float]]:
+    """Send a query to one shard worker and check it serves the expected slice of the corpus."""
+    started = time.perf_counter()
+    try:
+        status, headers, payload = _post(url, path, body)
+        if status != 200:
+            raise ValueError(f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}")
+        position = (headers.get("X-Shard"), headers.get("X-Shards"))
+        if position != (str(shard), str(len(config.SHARD_URLS))):
+            raise ShardError(
+                f"Shard at {url} serves shard {position[0]} of {position[1]}, "
+                f"expected {shard} of {len(config.SHARD_URLS)}; check SHARD_URLS order"
+            )
+        hits = decode_hits(payload)
+    except ShardError:
+        _record(shard, time.perf_counter() - started, True)
+        raise
+    except (OSError, ValueError, KeyError, TypeError, http.client.HTTPException) as e:
+        _record(shard, time.perf_counter() - started, True)
+        raise ShardError(f"Shard {shard} at {url} failed: {str(e)}") from e
+    _record(shard, time.perf_counter() - started, False)
+    return hits
+
+def search_shards(query: np.ndarray, doc_type: str, k: int, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Scatter a top-k query to every shard in SHARD_URLS and merge their partial results.
+
+    Each shard returns its own exact top k, so the k best of the union are the exact top k
+    of the whole corpus.
+
+    Args:
+        query: L2-normalized query embedding.
+        doc_type: Either "job" or "cv".
+        k: Number of neighbours to return.
+        exclude_id: Document ID to leave out, e.g. the query document itself.
+
+    Returns:
+        List[Tuple[int, float]]: (document ID, cosine similarity) pairs, most similar first.
+
+    Raises:
+        ShardError: If any shard fails or times out (SHARD_TIMEOUT).
+    """
+    path, body = search_path(doc_type, k, exclude_id), embedding_to_bytes(query)
+    futures = [_executor.submit(_query_shard, shard, url, path, body) for shard, url in enumerate(config.SHARD_URLS)]
+    partial = [future.result() for future in futures]
+    return heapq.nlargest(k, (hit for hits in partial for hit in hits), key=lambda hit: hit[1])
@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import logging
+import config
+from utils.similarity_calculator import SIMILARITY_ALGORITHM_VERSION, METRIC_DEFAULTS
+from db.database import get_similarity_cache_entry, store_similarity_cache_entry
+
+logger = logging.getLogger(__name__)
+
+_lru: "OrderedDict[Tuple[str, str], Dict[str, float]]" = OrderedDict()
+_lru_lock = threading.Lock()
+
+def build_cache_key(job_id: int, cv_id: int, metrics: List[str], version: str = SIMILARITY_ALGORITHM_VERSION, corpus_version: Optional[str] = None) -> str:
+    """Build the cache key for a job/CV pair, metric set and algorithm version.
+
+    Args:
+        job_id: ID of the job description.
+        cv_id: ID of the CV.
+        metrics: Names of the requested metrics.
+        version: Version of the similarity algorithms.
+        corpus_version: Version of the corpus statistics, for metrics that depend on them.
+
+    Returns:
+        str: Hex-encoded SHA-256 cache key.
+    """
+    raw = f"{job_id}|{cv_id}|{','.join(sorted(metrics))}|{version}"
+    if corpus_version is not None:
+        raw += f"|corpus:{corpus_version}"
+    if "bm25_score" in metrics:
+        # BM25 scores depend on the configured parameters, which may change between deployments.
+        raw += f"|bm25:{config.BM25_K1!r}:{config.BM25_B!r}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _lru_get(key: Tuple[str, str]) -> Optional[Dict[str, float]]:
+    """Look up a result in the in-process LRU tier."""
+    with _lru_lock:
+        result = _lru.get(key)
+        if result is not None:
+            _lru.move_to_end(key)
+        return result
+
+def _lru_put(key: Tuple[str, str], result: Dict[str, float]) -> None:
+    """Store a result in the in-process LRU tier, evicting the oldest entries."""
+    if config.SIMILARITY_CACHE_SIZE <= 0:
+        return
+    with _lru_lock:
+        _lru[key] = result
+        _lru.move_to_end(key)
+        while len(_lru) > config.SIMILARITY_CACHE_SIZE:
+            _lru.popitem(last=False)
+
+def get_cached_similarities(job_id: int, job_hash: Optional[str], cv_id: int, cv_hash: Optional[str], metrics: List[str], corpus_version: Optional[str] = None) -> Optional[Dict[str, float]]:
+    """Return cached similarity metrics if they match the current content of both documents.
+
+    The in-process LRU is checked first, then the shared database tier, whose hits are
+    promoted into the LRU.
+
+    Args:
+        job_id: ID of the job description.
+        job_hash: Current text hash of the job description.
+        cv_id: ID of the CV.
+        cv_hash: Current text hash of the CV.
+        metrics: Names of the requested metrics.
+        corpus_version: Version of the corpus statistics, for metrics that depend on them.
+
+    Returns:
+        Optional[Dict[str, float]]: Cached metrics, or None on a miss.
+    """
+    if not job_hash or not cv_hash:
+        return None
+    try:
+        cache_key = build_cache_key(job_id, cv_id, metrics, corpus_version=corpus_version)
+        lru_key = (cache_key, f"{job_hash}:{cv_hash}")
+
+        result = _lru_get(lru_key)
+        if result is not None:
+            logger.debug(f"Similarity cache hit (memory) for job_id={job_id}, cv_id={cv_id}")
+            return result
+
+        if not config.SIMILARITY_CACHE_PERSISTENT:
+            return None
+        entry = get_similarity_cache_entry(cache_key)
+        if entry is None or entry["job_hash"] != job_hash or entry["cv_hash"] != cv_hash:
+            return None
+
+        result = json.loads(entry["result"])
+        _lru_put(lru_key, result)
+        logger.debug(f"Similarity cache hit (database) for job_id={job_id}, cv_id={cv_id}")
+        return result
+    except Exception as e:
+        logger.warning(f"Error reading similarity cache: {str(e)}")
+        return None
+
+def cache_similarities(job_id: int, job_hash: Optional[str], cv_id: int, cv_hash: Optional[str], metrics: List[str], result: Dict[str, float], corpus_version: Optional[str] = None, corpus_available: bool = True) -> None:
+    """Store similarity metrics in both cache tiers.
+
+    The metric functions return a default value (0.0, or -1 for the Levenshtein distance)
+    instead of raising, so a result holding a metric's default, or computed without corpus
+    statistics, is not cached: a transient failure would otherwise be served until the
+    documents change. A genuine score equal to the default is simply recomputed next time.
+
+    Args:
+        job_id: ID of the job description.
+        job_hash: Text hash of the job description the result was computed from.
+        cv_id: ID of the CV.
+        cv_hash: Text hash of the CV the result was computed from.
+        metrics: Names of the requested metrics.
+        result: Computed similarity metrics.
+        corpus_version: Version of the corpus statistics, for metrics that depend on them.
+        corpus_available: False if the corpus statistics could not be read.
+    """
+    if not job_hash or not cv_hash:
+        return
+    defaults = [metric for metric in metrics if result.get(metric) == METRIC_DEFAULTS.get(metric)]
+    if defaults or not corpus_available:
+        logger.debug(f"Not caching similarities of job {job_id} and CV {cv_id}: default values for {defaults}, corpus available: {corpus_available}")
+        return
+    try:
+        cache_key = build_cache_key(job_id, cv_id, metrics, corpus_version=corpus_version)
+        _lru_put((cache_key, f"{job_hash}:{cv_hash}"), result)
+        if config.SIMILARITY_CACHE_PERSISTENT:
+            store_similarity_cache_entry(cache_key, job_id, cv_id, job_hash, cv_hash, json.dumps(result))
+    except Exception as e:
+        logger.warning(f"Error writing similarity cache: {str(e)}")
+
+def clear_similarity_cache() -> None:
+    """Empty the in-process LRU tier."""
+    with _lru_lock:
+        _lru.clear()
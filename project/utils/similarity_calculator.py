@@ -1,15 +1,33 @@
-from typing import Dict, List, Set
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
 import nltk
 from nltk.tokenize import word_tokenize
 import logging
 from collections import Counter
 import math
+from utils.embeddings import embedding_cosine_similarity
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 nltk.download('punkt', quiet=True)
 
+# Part of every similarity cache key: bump it whenever a metric's formula changes, such as the
+# TF-IDF weighting or the IDF smoothing, so scores cached by the previous code are not served.
+SIMILARITY_ALGORITHM_VERSION = "1"
+DEFAULT_METRICS: List[str] = ["cosine_similarity", "levenshtein_distance", "jaccard_index"]
+CORPUS_METRICS: List[str] = ["tfidf_cosine_similarity", "bm25_score"]
+AVAILABLE_METRICS: List[str] = DEFAULT_METRICS + CORPUS_METRICS + ["embedding_cosine_similarity"]
+METRIC_DEFAULTS: Dict[str, float] = {
+    "cosine_similarity": 0.0,
+    "levenshtein_distance": -1.0,
+    "jaccard_index": 0.0,
+    "tfidf_cosine_similarity": 0.0,
+    "bm25_score": 0.0,
+    "embedding_cosine_similarity": 0.0
+}
+
+CorpusStatistics = Dict[str, Union[int, float, Dict[str, int]]]
+
 def preprocess_text(text: str) -> List[str]:
     """Preprocess text by tokenizing, keeping all meaningful words.
 
@@ -160,16 +178,108 @@ def jaccard_index(set1: Set[str], set2: Set[str]) -> float:
         logger.error(f"Error calculating Jaccard Index: {str(e)}")
         return 0.0
 
-def calculate_similarities(job_text: str, cv_text: str) -> Dict[str, float]:
-    """Calculate all similarities between job description and CV.
+def inverse_document_frequency(document_frequency: int, document_count: int) -> float:
+    """Calculate the smoothed inverse document frequency of a term.
+
+    Args:
+        document_frequency: Number of documents containing the term.
+        document_count: Number of documents in the corpus.
+
+    Returns:
+        float: IDF weight, at least 1 for terms present in every document.
+    """
+    return math.log((1 + document_count) / (1 + document_frequency)) + 1.0
+
+def tfidf_cosine_similarity(words1: List[str], words2: List[str], corpus: CorpusStatistics) -> float:
+    """Calculate cosine similarity between TF-IDF weighted word vectors.
+
+    Args:
+        words1: First list of processed words.
+        words2: Second list of processed words.
+        corpus: Corpus statistics with document_count and document_frequencies.
+
+    Returns:
+        float: TF-IDF cosine similarity value between 0 and 1.
+    """
+    try:
+        document_count = corpus.get("document_count", 0)
+        frequencies = corpus.get("document_frequencies", {})
+        vector1 = create_word_vector(words1)
+        vector2 = create_word_vector(words2)
+        weights = {
+            word: inverse_document_frequency(frequencies.get(word, 0), document_count)
+            for word in set(vector1) | set(vector2)
+        }
+        weighted1 = {word: count * weights[word] for word, count in vector1.items()}
+        weighted2 = {word: count * weights[word] for word, count in vector2.items()}
+        similarity = cosine_similarity(weighted1, weighted2)
+        logger.debug(f"TF-IDF cosine similarity calculated: {similarity}")
+        return similarity
+    except Exception as e:
+        logger.error(f"Error calculating TF-IDF cosine similarity: {str(e)}")
+        return 0.0
+
+def bm25_score(query_words: List[str], document_words: List[str], corpus: CorpusStatistics, k1: float = 1.5, b: float = 0.75) -> float:
+    """Calculate the Okapi BM25 relevance of a document for a query.
+
+    Args:
+        query_words: Processed words of the query (the job description).
+        document_words: Processed words of the scored document (the CV).
+        corpus: Corpus statistics with document_count, average_document_length and document_frequencies.
+        k1: Term frequency saturation parameter.
+        b: Document length normalization parameter.
+
+    Returns:
+        float: BM25 score, 0 when no query term occurs in the document.
+    """
+    try:
+        if not query_words or not document_words:
+            logger.warning("Empty query or document provided for BM25; returning 0 score")
+            return 0.0
+
+        document_count = corpus.get("document_count", 0)
+        frequencies = corpus.get("document_frequencies", {})
+        average_length = corpus.get("average_document_length") or len(document_words)
+        length_norm = k1 * (1 - b + b * len(document_words) / average_length)
+        term_counts = Counter(document_words)
+
+        score = 0.0
+        for word in set(query_words):
+            tf = term_counts.get(word, 0)
+            if not tf:
+                continue
+            df = frequencies.get(word, 0)
+            idf = math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + length_norm)
+
+        logger.debug(f"BM25 score calculated: {score}")
+        return score
+    except Exception as e:
+        logger.error(f"Error calculating BM25 score: {str(e)}")
+        return 0.0
+
+def calculate_similarities(
+    job_text: str,
+    cv_text: str,
+    metrics: Optional[List[str]] = None,
+    corpus_lookup: Optional[Callable[[Iterable[str]], CorpusStatistics]] = None,
+    k1: float = 1.5,
+    b: float = 0.75
+) -> Dict[str, float]:
+    """Calculate the requested similarities between job description and CV.
 
     Args:
         job_text: Text from a job description.
         cv_text: Text from a CV.
+        metrics: Names of the metrics to compute (see AVAILABLE_METRICS); DEFAULT_METRICS if None.
+        corpus_lookup: Returns corpus statistics for a set of terms; required by CORPUS_METRICS.
+        k1: BM25 term frequency saturation parameter.
+        b: BM25 document length normalization parameter.
 
     Returns:
-        Dict[str, float]: Dictionary with cosine similarity, Levenshtein distance, and Jaccard Index.
+        Dict[str, float]: Dictionary with the requested metrics, e.g. cosine similarity, Levenshtein distance, and Jaccard Index.
     """
+    metrics = metrics or DEFAULT_METRICS
     try:
         logger.debug(f"Input job text: {job_text}")
         logger.debug(f"Input CV text: {cv_text}")
@@ -177,31 +287,32 @@ def calculate_similarities(job_text: str, cv_text: str) -> Dict[str, float]:
         job_words = preprocess_text(job_text)
         cv_words = preprocess_text(cv_text)
 
-        job_vector = create_word_vector(job_words)
-        cv_vector = create_word_vector(cv_words)
-        job_set = set(job_words)
-        cv_set = set(cv_words)
-
-        logger.debug(f"Job vector: {job_vector}")
-        logger.debug(f"CV vector: {cv_vector}")
-        logger.debug(f"Job set: {job_set}")
-        logger.debug(f"CV set: {cv_set}")
+        result = {}
+        if "cosine_similarity" in metrics:
+            job_vector = create_word_vector(job_words)
+            cv_vector = create_word_vector(cv_words)
+            logger.debug(f"Job vector: {job_vector}")
+            logger.debug(f"CV vector: {cv_vector}")
+            result["cosine_similarity"] = cosine_similarity(job_vector, cv_vector)
+        if "levenshtein_distance" in metrics:
+            result["levenshtein_distance"] = float(levenshtein_distance(job_text, cv_text))
+        if "jaccard_index" in metrics:
+            job_set = set(job_words)
+            cv_set = set(cv_words)
+            logger.debug(f"Job set: {job_set}")
+            logger.debug(f"CV set: {cv_set}")
+            result["jaccard_index"] = jaccard_index(job_set, cv_set)
+        if any(metric in metrics for metric in CORPUS_METRICS):
+            corpus = corpus_lookup(set(job_words) | set(cv_words)) if corpus_lookup else {}
+            if "tfidf_cosine_similarity" in metrics:
+                result["tfidf_cosine_similarity"] = tfidf_cosine_similarity(job_words, cv_words, corpus)
+            if "bm25_score" in metrics:
+                result["bm25_score"] = bm25_score(job_words, cv_words, corpus, k1, b)
+        if "embedding_cosine_similarity" in metrics:
+            result["embedding_cosine_similarity"] = embedding_cosine_similarity(job_words, cv_words)
 
-        cosine_sim = cosine_similarity(job_vector, cv_vector)
-        levenshtein_dist = float(levenshtein_distance(job_text, cv_text))
-        jaccard_idx = jaccard_index(job_set, cv_set)
-
-        result = {
-            "cosine_similarity": cosine_sim,
-            "levenshtein_distance": levenshtein_dist,
-            "jaccard_index": jaccard_idx
-        }
         logger.info(f"Similarity results: {result}")
         return result
     except Exception as e:
         logger.error(f"Error in similarity calculations: {str(e)}")
-        return {
-            "cosine_similarity": 0.0,
-            "levenshtein_distance": -1.0,
-            "jaccard_index": 0.0
-        }
\ No newline at end of file
+        return {metric: METRIC_DEFAULTS[metric] for metric in metrics}
@@ -0,0 +1,225 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import Counter, deque
+import logging
+import numpy as np
+from scipy import sparse
+from utils.similarity_calculator import preprocess_text
+
+logger = logging.getLogger(__name__)
+
+ChunkResult = Dict[str, np.ndarray]
+
+TOKENIZE_CHUNK_SIZE = 64
+# Texts submitted to the pool per batch, per worker; at most two batches are held at once.
+TOKENIZE_BATCH_CHUNKS = 4
+
+_worker_state: Dict[str, object] = {}
+
+def build_count_matrix(token_lists: Iterable[List[str]], vocabulary: Dict[str, int]) -> sparse.csr_matrix:
+    """Build a sparse document-term count matrix, growing the shared vocabulary as needed.
+
+    Args:
+        token_lists: Preprocessed tokens of each document.
+        vocabulary: Mapping of term to column index, updated in place.
+
+    Returns:
+        sparse.csr_matrix: Matrix of shape (documents, len(vocabulary)) with term counts.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    data: List[int] = []
+    for tokens in token_lists:
+        for term, count in Counter(tokens).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, max(len(vocabulary), 1))
+    )
+
+def _resize_columns(matrix: sparse.csr_matrix, n_columns: int) -> sparse.csr_matrix:
+    """Pad a CSR matrix with empty columns so all matrices share the final vocabulary size."""
+    matrix.resize((matrix.shape[0], n_columns))
+    return matrix
+
+def _l2_normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Scale each row to unit L2 norm; all-zero rows stay zero."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+
+def _binarize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Turn a count matrix into a 0/1 term presence matrix."""
+    binary = matrix.copy()
+    binary.data[:] = 1.0
+    return binary
+
+def _init_worker(cv_normalized_t: sparse.csc_matrix, cv_binary_t: sparse.csc_matrix, cv_sizes: np.ndarray, top_k: Optional[int]) -> None:
+    """Receive the CV-side matrices once per worker process."""
+    _worker_state["cv_normalized_t"] = cv_normalized_t
+    _worker_state["cv_binary_t"] = cv_binary_t
+    _worker_state["cv_sizes"] = cv_sizes
+    _worker_state["top_k"] = top_k
+
+def _score_chunk(job_ids: np.ndarray, job_counts: sparse.csr_matrix) -> ChunkResult:
+    """Score one chunk of jobs against every CV with sparse matrix products.
+
+    Args:
+        job_ids: IDs of the jobs in the chunk.
+        job_counts: Term-count rows of the jobs in the chunk.
+
+    Returns:
+        ChunkResult: job_ids, cv_index, cosine_similarity and jaccard_index arrays. The score
+        arrays have shape (jobs, CVs) with a 1-D cv_index, or (jobs, top_k) with a per-row
+        cv_index giving the CV positions.
+    """
+    cv_normalized_t = _worker_state["cv_normalized_t"]
+    cv_binary_t = _worker_state["cv_binary_t"]
+    cv_sizes = _worker_state["cv_sizes"]
+    top_k = _worker_state["top_k"]
+
+    cosine = _l2_normalize_rows(job_counts).dot(cv_normalized_t).toarray().astype(np.float32)
+
+    job_binary = _binarize(job_counts)
+    intersection = job_binary.dot(cv_binary_t).toarray().astype(np.float32)
+    job_sizes = np.asarray(job_binary.sum(axis=1), dtype=np.float32).ravel()
+    union = job_sizes[:, None] + cv_sizes[None, :] - intersection
+    empty = (job_sizes[:, None] == 0) | (cv_sizes[None, :] == 0)
+    jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=(union > 0) & ~empty)
+
+    n_cvs = cosine.shape[1]
+    if top_k and top_k < n_cvs:
+        cv_index = np.argpartition(-cosine, top_k - 1, axis=1)[:, :top_k]
+        rows = np.arange(cosine.shape[0])[:, None]
+        order = np.argsort(-cosine[rows, cv_index], axis=1)
+        cv_index = cv_index[rows, order]
+        cosine = cosine[rows, cv_index]
+        jaccard = jaccard[rows, cv_index]
+    else:
+        cv_index = np.arange(n_cvs)
+
+    return {
+        "job_ids": job_ids,
+        "cv_index": np.ascontiguousarray(cv_index, dtype=np.int32),
+        "cosine_similarity": cosine,
+        "jaccard_index": jaccard.astype(np.float32)
+    }
+
+def tokenize_corpus(texts: Iterable[str], workers: int = 1) -> Iterator[List[str]]:
+    """Preprocess texts with the same tokenizer as the per-pair endpoint, optionally in parallel.
+
+    Texts are pulled from the iterable in bounded batches, so a streamed corpus is never held
+    in memory whole.
+
+    Args:
+        texts: Document texts.
+        workers: Number of processes to use.
+
+    Yields:
+        List[str]: Preprocessed tokens of each document, in input order.
+    """
+    if workers <= 1:
+        for text in texts:
+            yield preprocess_text(text)
+        return
+    batch_size = TOKENIZE_CHUNK_SIZE * TOKENIZE_BATCH_CHUNKS * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Optional[Iterator[List[str]]] = None
+        batch: List[str] = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == batch_size:
+                # Submit this batch before collecting the previous one, so workers stay busy.
+                submitted = executor.map(preprocess_text, batch, chunksize=TOKENIZE_CHUNK_SIZE)
+                if pending is not None:
+                    yield from pending
+                pending, batch = submitted, []
+        if pending is not None:
+            yield from pending
+        if batch:
+            yield from executor.map(preprocess_text, batch, chunksize=TOKENIZE_CHUNK_SIZE)
+
+def compute_similarity_matrix(
+    jobs: List[Tuple[int, List[str]]],
+    cvs: List[Tuple[int, List[str]]],
+    chunk_size: int,
+    workers: int = 1,
+    top_k: Optional[int] = None
+) -> Iterator[ChunkResult]:
+    """Compute cosine similarity and Jaccard Index for every job against every CV.
+
+    Jobs are scored in chunks of `chunk_size` rows so at most `chunk_size x len(cvs)` scores
+    per in-flight chunk are held in memory. Chunks run on a process pool, with no more than
+    two chunks per worker queued at once.
+
+    Args:
+        jobs: (job_id, tokens) pairs.
+        cvs: (cv_id, tokens) pairs.
+        chunk_size: Number of jobs scored per chunk.
+        workers: Number of worker processes.
+        top_k: Keep only the k best CVs (by cosine similarity) per job, if set.
+
+    Yields:
+        ChunkResult: Scores of one chunk, in job order, with cv_index mapped to CV IDs.
+    """
+    if not jobs or not cvs:
+        logger.warning("No job descriptions or CVs to compare")
+        return
+
+    vocabulary: Dict[str, int] = {}
+    job_counts = build_count_matrix((tokens for _, tokens in jobs), vocabulary)
+    cv_counts = build_count_matrix((tokens for _, tokens in cvs), vocabulary)
+    n_terms = max(len(vocabulary), 1)
+    job_counts = _resize_columns(job_counts, n_terms)
+    cv_counts = _resize_columns(cv_counts, n_terms)
+    logger.info(f"Built term matrices: {len(jobs)} jobs, {len(cvs)} CVs, {n_terms} terms")
+
+    job_ids = np.asarray([job_id for job_id, _ in jobs], dtype=np.int64)
+    cv_ids = np.asarray([cv_id for cv_id, _ in cvs], dtype=np.int64)
+    cv_binary = _binarize(cv_counts)
+    init_args = (
+        _l2_normalize_rows(cv_counts).T.tocsc(),
+        cv_binary.T.tocsc(),
+        np.asarray(cv_binary.sum(axis=1), dtype=np.float32).ravel(),
+        top_k
+    )
+
+    chunks = ((job_ids[start:start + chunk_size], job_counts[start:start + chunk_size]) for start in range(0, len(jobs), chunk_size))
+
+    if workers <= 1:
+        _init_worker(*init_args)
+        for chunk_ids, chunk_counts in chunks:
+            result = _score_chunk(chunk_ids, chunk_counts)
+            result["cv_ids"] = cv_ids[result.pop("cv_index")]
+            yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+        pending: "deque[Future]" = deque()
+        for chunk_ids, chunk_counts in chunks:
+            pending.append(executor.submit(_score_chunk, chunk_ids, chunk_counts))
+            if len(pending) >= workers * 2:
+                result = pending.popleft().result()
+                result["cv_ids"] = cv_ids[result.pop("cv_index")]
+                yield result
+        while pending:
+            result = pending.popleft().result()
+            result["cv_ids"] = cv_ids[result.pop("cv_index")]
+            yield result
+
+def iter_score_rows(result: ChunkResult) -> Iterator[Tuple[int, int, float, float]]:
+    """Flatten a chunk result into (job_id, cv_id, cosine_similarity, jaccard_index) rows.
+
+    Args:
+        result: Scores of one chunk.
+
+    Yields:
+        Tuple[int, int, float, float]: One row per scored pair.
+    """
+    cv_ids = result["cv_ids"]
+    for row, job_id in enumerate(result["job_ids"]):
+        row_cv_ids = cv_ids if cv_ids.ndim == 1 else cv_ids[row]
+        for cv_id, cosine, jaccard in zip(row_cv_ids, result["cosine_similarity"][row], result["jaccard_index"][row]):
+            yield int(job_id), int(cv_id), float(cosine), float(jaccard)
@@ -1,10 +1,19 @@
 from typing import Optional
+import asyncio
+from bs4 import BeautifulSoup
 from deep_translator import GoogleTranslator
+import httpx
 import logging
+import config
+from admission import StageTimeout, record_stage_timeout, run_with_timeout
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Same limit and result elements as deep_translator's GoogleTranslator.
+MAX_TRANSLATION_CHARS = 5000
+RESULT_ELEMENT_CLASSES = ("t0", "result-container")
+
 def translate_to_english(text: str, source_lang: str = "auto") -> Optional[str]:
     """Translate the given text to English using Google Translate.
 
@@ -14,6 +23,9 @@ def translate_to_english(text: str, source_lang: str = "auto") -> Optional[str]:
 
     Returns:
         Optional[str]: Translated text in English, or None if translation fails.
+
+    Raises:
+        StageTimeout: If Google Translate does not answer within TRANSLATION_TIMEOUT seconds.
     """
     try:
         if not text or not text.strip():
@@ -21,9 +33,56 @@ def translate_to_english(text: str, source_lang: str = "auto") -> Optional[str]:
             return None
 
         translator = GoogleTranslator(source=source_lang, target="en")
-        translated_text = translator.translate(text)
+        translated_text = run_with_timeout("translation", translator.translate, text)
+        logger.debug(f"Translated text from '{source_lang}' to English: {translated_text[:200]}...")
+        return translated_text
+    except StageTimeout:
+        raise
+    except Exception as e:
+        logger.error(f"Error translating text: {str(e)}")
+        return None
+
+async def translate_to_english_async(text: str, client: httpx.AsyncClient, source_lang: str = "auto") -> Optional[str]:
+    """Non-blocking translate_to_english, for the ASGI entry point.
+
+    Queries the same Google Translate page as deep_translator and extracts the result
+    the same way, without holding a thread while Google answers.
+
+    Args:
+        text: The text to translate.
+        client: Shared HTTP client; its pool bounds the open connections.
+        source_lang: The source language code (default 'auto' for auto-detection).
+
+    Returns:
+        Optional[str]: Translated text in English, or None if translation fails.
+
+    Raises:
+        StageTimeout: If Google Translate does not answer within TRANSLATION_TIMEOUT seconds.
+    """
+    try:
+        if not text or not text.strip():
+            logger.warning("Empty or whitespace-only text provided for translation")
+            return None
+        if len(text) > MAX_TRANSLATION_CHARS:
+            logger.error(f"Text of {len(text)} characters exceeds the {MAX_TRANSLATION_CHARS}-character translation limit")
+            return None
+
+        request = client.get(f"{config.TRANSLATION_BASE_URL}/m", params={"tl": "en", "sl": source_lang, "q": text.strip()})
+        try:
+            response = await asyncio.wait_for(request, config.TRANSLATION_TIMEOUT or None)
+        except asyncio.TimeoutError:
+            raise record_stage_timeout("translation", config.TRANSLATION_TIMEOUT)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = next((found for found in (soup.find("div", {"class": name}) for name in RESULT_ELEMENT_CLASSES) if found), None)
+        if element is None:
+            logger.error("No translation found in Google Translate response")
+            return None
+        translated_text = element.get_text(strip=True)
         logger.debug(f"Translated text from '{source_lang}' to English: {translated_text[:200]}...")
         return translated_text
+    except StageTimeout:
+        raise
     except Exception as e:
         logger.error(f"Error translating text: {str(e)}")
-        return None
\ No newline at end of file
+        return None